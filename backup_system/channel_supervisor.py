@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Multi-Channel Supervisor
+Watches every messaging channel (WhatsApp, Lark/Feishu, Teams) from one
+asyncio process. Each channel has its own check interval, reconnects with
+jittered exponential backoff behind a circuit breaker, and a shared limit
+on concurrent reconnects keeps a network blip from turning into a
+reconnect storm against the gateway.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+from gateway_watcher import GATEWAY_STATUS_URL, GatewayWatcher, parse_status_output
+from heartbeat import HEARTBEAT_MODE, HEARTBEAT_TARGET, HEARTBEAT_TIMEOUT, AdaptiveScheduler, heartbeat_command
+from metrics import (CHECK_INTERVAL, CIRCUIT_OPEN, HEARTBEAT_DEGRADED, HEARTBEAT_SECONDS, RECONNECTS,
+                     TCP_CONNECT_FAILURES, TCP_CONNECT_SECONDS, HealthClock, record_check)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'connection_troubleshooting'))
+
+try:
+    from connection_diagnostics import NETWORK_PROBES, tcp_connect_time
+except ImportError:  # Installed without the troubleshooting tools: no network probes
+    NETWORK_PROBES, tcp_connect_time = (), None
+
+# Channel definitions; override or extend with --config channels.json
+#   check: {"gateway": "<channel name in gateway status>"} or {"tcp": "host:port"}
+#   reconnect: command run after `max_failed_checks` failed checks in a row
+#   heartbeat: "noop", "self", "off" or a command; gateway channels default to --heartbeat
+CHANNELS = {
+    'whatsapp': {
+        'interval': 60,
+        'check': {'gateway': 'whatsapp'},
+        'reconnect': ['whatsapp_login', 'action=start'],
+    },
+    'lark': {
+        # The webhook bridge started by start_lark_bridge.js (WEBHOOK_PORT)
+        'interval': 60,
+        'check': {'tcp': '127.0.0.1:3000'},
+        'reconnect': ['pm2', 'restart', 'lark-bridge'],
+    },
+    'teams': {
+        'interval': 120,
+        'check': {'gateway': 'msteams'},
+        'reconnect': ['openclaw', 'gateway', 'restart'],
+    },
+}
+# Same as the original keep-alive; add lark/teams with --channels
+DEFAULT_CHANNELS = ('whatsapp',)
+
+CHECK_TIMEOUT = 10
+RECONNECT_TIMEOUT = 30
+# Time a reconnect gets to take effect before it is judged by the next check
+RECONNECT_SETTLE = 10
+# While a channel is down, re-check this often instead of waiting a full interval
+DISCONNECTED_RECHECK_INTERVAL = 5
+MAX_FAILED_CHECKS = 3
+BACKOFF_BASE = 5
+BACKOFF_MAX = 300
+# Consecutive failed reconnects that open the circuit, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 600
+MAX_CONCURRENT_RECONNECTS = 1
+# How often the diagnostics TCP probes run for the connect latency metrics
+NETWORK_PROBE_INTERVAL = 60
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with equal jitter: half fixed, half random"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """
+    Stops reconnect attempts for a cooldown after repeated failures, then
+    lets a single trial attempt through (half-open) before closing again
+    """
+
+    def __init__(self, threshold=None, cooldown=None):
+        self.threshold = threshold or BREAKER_THRESHOLD
+        self.cooldown = cooldown or BREAKER_COOLDOWN
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        return self.state != 'open'
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold or self.opened_at is not None:
+            # A failed half-open trial re-opens for another full cooldown
+            self.opened_at = time.monotonic()
+
+
+class Channel:
+    """One supervised channel and its reconnect bookkeeping"""
+
+    def __init__(self, name, interval=60, check=None, reconnect=None,
+                 max_failed_checks=MAX_FAILED_CHECKS, heartbeat=None):
+        self.name = name
+        self.interval = interval
+        self.check_spec = check or {'gateway': name}
+        self.reconnect_command = reconnect
+        self.max_failed_checks = max_failed_checks
+        self.heartbeat_spec = heartbeat
+        # Set up by the supervisor once the interval and heartbeat mode are final
+        self.schedule = None
+        self.heartbeat_command = None
+
+        self.status = {'connected': None, 'state': 'unknown', 'detail': ''}
+        self.failed_checks = 0
+        self.reconnect_attempts = 0
+        self.breaker = CircuitBreaker()
+        self.watcher = None
+        self.wakeup = asyncio.Event()
+        self.health = HealthClock(name)
+        CIRCUIT_OPEN.set_function(lambda: 1 if self.breaker.state == 'open' else 0, channel=name)
+
+    @property
+    def gateway_channel(self):
+        return self.check_spec.get('gateway')
+
+
+async def run_command(command, timeout):
+    """Run a command without blocking the loop; (returncode, stdout, stderr)"""
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, stdout.decode(errors='replace'), stderr.decode(errors='replace')
+
+
+async def check_gateway_channel(channel):
+    """Status of a gateway-hosted channel, from its watcher stream or the CLI"""
+    if channel.watcher is not None and channel.watcher.supported:
+        return channel.watcher.status
+    try:
+        returncode, stdout, stderr = await run_command(['openclaw', 'gateway', 'status'], CHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {'connected': False, 'state': 'timeout', 'detail': 'gateway status check timed out'}
+    except OSError as e:
+        return {'connected': False, 'state': 'error', 'detail': str(e)}
+    status = parse_status_output(stdout, channel.gateway_channel)
+    if returncode != 0 and status['connected'] is not False:
+        status = {'connected': False, 'state': 'error', 'detail': (stderr or stdout).strip()[:200]}
+    return status
+
+
+async def check_tcp(address):
+    """A channel process is up if it accepts connections on its port"""
+    host, port = address.rsplit(':', 1)
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), CHECK_TIMEOUT)
+    except (OSError, asyncio.TimeoutError) as e:
+        return {'connected': False, 'state': 'unreachable', 'detail': str(e) or e.__class__.__name__}
+    writer.close()
+    await writer.wait_closed()
+    return {'connected': True, 'state': 'listening', 'detail': address}
+
+
+class ChannelSupervisor:
+    """Supervises several channels concurrently from one event loop"""
+
+    def __init__(self, channels, watch=False, status_url=GATEWAY_STATUS_URL,
+                 max_concurrent_reconnects=MAX_CONCURRENT_RECONNECTS, probe_network=True,
+                 heartbeat=HEARTBEAT_MODE, heartbeat_target=HEARTBEAT_TARGET):
+        self.channels = channels
+        self.watch = watch
+        self.network_probes = NETWORK_PROBES if probe_network and tcp_connect_time else ()
+        self.status_url = status_url
+        self.max_concurrent_reconnects = max_concurrent_reconnects
+        # Created up front so a signal arriving before run() starts can still stop it
+        self._stopping = asyncio.Event()
+        self._reconnect_slots = None
+        for channel in channels:
+            channel.schedule = AdaptiveScheduler(channel.interval)
+            CHECK_INTERVAL.set_function(lambda ch=channel: ch.schedule.interval, channel=channel.name)
+            spec = channel.heartbeat_spec
+            if isinstance(spec, list):
+                channel.heartbeat_command = spec
+            elif spec is not None:
+                channel.heartbeat_command = heartbeat_command(spec, channel.gateway_channel or channel.name,
+                                                              heartbeat_target)
+            elif channel.gateway_channel:
+                # TCP-checked channels have nothing to round-trip beyond the check itself
+                channel.heartbeat_command = heartbeat_command(heartbeat, channel.gateway_channel,
+                                                              heartbeat_target)
+
+    def stop(self):
+        """Ask every channel task to finish; safe to call from a signal handler"""
+        self._stopping.set()
+        for channel in self.channels:
+            channel.wakeup.set()
+
+    async def check(self, channel):
+        """True if the channel is up, False if down, None if its status is not known yet"""
+        start = time.monotonic()
+        if channel.gateway_channel:
+            status = await check_gateway_channel(channel)
+        elif 'tcp' in channel.check_spec:
+            status = await check_tcp(channel.check_spec['tcp'])
+        else:
+            status = {'connected': None, 'state': 'unknown', 'detail': 'no check configured'}
+
+        if (status['connected'], status['state']) != (channel.status['connected'], channel.status['state']):
+            logger.info(f"[{channel.name}] status: {status['state']}"
+                        + (f" ({status['detail']})" if status['detail'] else ""))
+        channel.status = status
+        if status['connected'] is None and status['state'] == 'unknown':
+            # No data yet, e.g. the watcher has not received its first status line
+            return None
+        connected = status['connected'] is True
+        record_check(channel.name, connected, time.monotonic() - start, channel.health)
+        channel.schedule.record_check(connected)
+        return connected
+
+    async def heartbeat(self, channel):
+        """Send one heartbeat and feed its round trip to the channel's schedule"""
+        start = time.monotonic()
+        ok = False
+        try:
+            if callable(channel.heartbeat_command):
+                # Gateway round trip in a worker thread; it times out on its own
+                error = await asyncio.get_running_loop().run_in_executor(
+                    None, channel.heartbeat_command, HEARTBEAT_TIMEOUT)
+            else:
+                returncode, _, stderr = await run_command(channel.heartbeat_command, HEARTBEAT_TIMEOUT)
+                error = stderr if returncode != 0 else None
+            ok = error is None
+            if not ok:
+                logger.warning(f"[{channel.name}] heartbeat failed: {error.strip()[:200]}")
+        except asyncio.TimeoutError:
+            logger.warning(f"[{channel.name}] heartbeat timed out")
+        except OSError as e:
+            logger.warning(f"[{channel.name}] heartbeat failed: {e}")
+        rtt = time.monotonic() - start
+        HEARTBEAT_SECONDS.observe(rtt, channel=channel.name, result='success' if ok else 'failure')
+        if channel.schedule.record_heartbeat(ok, rtt):
+            HEARTBEAT_DEGRADED.inc(channel=channel.name)
+            logger.warning(f"[{channel.name}] heartbeat round trip degraded: {rtt:.2f}s "
+                           f"(recent median {channel.schedule.rtt_baseline:.2f}s)")
+        return ok
+
+    async def reconnect(self, channel):
+        """Run the channel's reconnect command; True if it exited cleanly"""
+        if not channel.reconnect_command:
+            logger.warning(f"[{channel.name}] no reconnect command configured")
+            return False
+        async with self._reconnect_slots:
+            logger.info(f"[{channel.name}] reconnecting (attempt #{channel.reconnect_attempts}): "
+                        f"{' '.join(channel.reconnect_command)}")
+            try:
+                returncode, _, stderr = await run_command(channel.reconnect_command, RECONNECT_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.error(f"[{channel.name}] reconnect timed out")
+                return False
+            except OSError as e:
+                logger.error(f"[{channel.name}] reconnect failed: {e}")
+                return False
+        if returncode != 0:
+            logger.error(f"[{channel.name}] reconnect exited with {returncode}: {stderr.strip()[:200]}")
+            return False
+        return True
+
+    async def sleep(self, channel, timeout):
+        """Wait for the timeout, a status change, or shutdown"""
+        try:
+            await asyncio.wait_for(channel.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def supervise(self, channel):
+        logger.info(f"[{channel.name}] supervising every {channel.interval}s "
+                    f"(adaptive, {channel.schedule.min_interval:g}-{channel.schedule.max_interval:g}s)")
+        while not self._stopping.is_set():
+            channel.wakeup.clear()
+            try:
+                connected = await self.check(channel)
+            except Exception as e:
+                logger.error(f"[{channel.name}] check failed: {e}")
+                connected = False
+
+            if connected is None:
+                # Not a failed check: look again soon without counting it
+                await self.sleep(channel, min(channel.schedule.interval, DISCONNECTED_RECHECK_INTERVAL))
+                continue
+
+            if connected:
+                if channel.reconnect_attempts:
+                    logger.info(f"[{channel.name}] recovered after {channel.reconnect_attempts} reconnect(s)")
+                channel.failed_checks = 0
+                channel.reconnect_attempts = 0
+                channel.breaker.record_success()
+                if channel.heartbeat_command and channel.schedule.heartbeat_due():
+                    await self.heartbeat(channel)
+                await self.sleep(channel, channel.schedule.interval)
+                continue
+
+            channel.failed_checks += 1
+            logger.warning(f"[{channel.name}] connection lost (check #{channel.failed_checks})")
+            if channel.failed_checks < channel.max_failed_checks:
+                await self.sleep(channel, min(channel.schedule.interval, DISCONNECTED_RECHECK_INTERVAL))
+                continue
+
+            if not channel.breaker.allow():
+                logger.warning(f"[{channel.name}] circuit open after {channel.breaker.failures} failed "
+                               f"reconnects; not reconnecting until the cooldown ends")
+                await self.sleep(channel, channel.interval)
+                continue
+
+            channel.reconnect_attempts += 1
+            if await self.reconnect(channel):
+                # Judge the reconnect by the channel coming back, not the exit code
+                await self.sleep(channel, RECONNECT_SETTLE)
+                if self._stopping.is_set():
+                    break
+                channel.wakeup.clear()
+                if await self.check(channel):
+                    RECONNECTS.inc(channel=channel.name, result='success')
+                    continue
+            RECONNECTS.inc(channel=channel.name, result='failure')
+            channel.breaker.record_failure()
+            delay = backoff_delay(channel.reconnect_attempts - 1)
+            logger.info(f"[{channel.name}] next reconnect attempt in {delay:.0f}s "
+                        f"(circuit {channel.breaker.state})")
+            await self.sleep(channel, delay)
+
+    async def probe_network(self):
+        """Time TCP connects to the diagnostics hosts for the latency metrics"""
+        loop = asyncio.get_running_loop()
+        while not self._stopping.is_set():
+            results = await asyncio.gather(*(
+                loop.run_in_executor(None, tcp_connect_time, host, port) for host, port in self.network_probes
+            ))
+            for (host, _), seconds in zip(self.network_probes, results):
+                if seconds is None:
+                    TCP_CONNECT_FAILURES.inc(host=host)
+                else:
+                    TCP_CONNECT_SECONDS.observe(seconds, host=host)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), NETWORK_PROBE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def start_watchers(self, loop):
+        for channel in self.channels:
+            if self.watch and channel.gateway_channel:
+                channel.watcher = GatewayWatcher(
+                    self.status_url, channel.gateway_channel,
+                    on_change=lambda status, ch=channel: loop.call_soon_threadsafe(ch.wakeup.set),
+                ).start()
+
+    async def run(self):
+        self._reconnect_slots = asyncio.Semaphore(self.max_concurrent_reconnects)
+        self.start_watchers(asyncio.get_running_loop())
+        try:
+            tasks = [self.supervise(channel) for channel in self.channels]
+            if self.network_probes:
+                tasks.append(self.probe_network())
+            await asyncio.gather(*tasks)
+        finally:
+            for channel in self.channels:
+                if channel.watcher is not None:
+                    channel.watcher.stop()
+
+
+def load_channels(names, config_path=None):
+    """Channel objects for `names`, from CHANNELS merged with a JSON config file"""
+    definitions = {name: dict(spec) for name, spec in CHANNELS.items()}
+    if config_path:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            for name, spec in json.load(f).items():
+                definitions.setdefault(name, {}).update(spec)
+
+    channels = []
+    for name in names:
+        if name not in definitions:
+            raise ValueError(f"Unknown channel: {name} (known: {', '.join(sorted(definitions))})")
+        channels.append(Channel(name, **definitions[name]))
+    return channels
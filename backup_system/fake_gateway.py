@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Fake OpenClaw Gateway
+Local stand-in for the gateway's status endpoints, for testing the
+keep-alive watcher without a real WhatsApp session.
+
+    GET  /status          current status as JSON
+    GET  /status/stream   newline-delimited JSON: the status on connect and
+                          on every change, heartbeats in between
+    POST /control         merge a JSON object into the status, e.g.
+                          {"channels": {"whatsapp": {"status": "disconnected"}}},
+                          {"hang": true} to stop heartbeats or
+                          {"message_status": 503} to fail outbound messages
+    POST /messages        accept an outbound message
+                          ({"channel", "target", "message"}, optional "id")
+                          and count it; a repeated id is acknowledged only
+    GET  /messages        received message count, bytes and the latest few
+
+Example:
+    python3 fake_gateway.py --port 18789 --flap 10
+    python3 keep_alive.py --watch --status-url http://127.0.0.1:18789/status/stream
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 18789
+HEARTBEAT_INTERVAL = 1
+RECENT_MESSAGES = 20
+
+
+class GatewayState:
+    def __init__(self):
+        self.status = {'status': 'running', 'channels': {'whatsapp': {'status': 'connected'}}}
+        self.hang = False
+        self.version = 0
+        self.changed = threading.Condition()
+        self.message_status = 200
+        self.messages = {'count': 0, 'bytes': 0, 'duplicates': 0, 'recent': []}
+        self.seen_ids = set()
+
+    def update(self, changes):
+        with self.changed:
+            self.hang = bool(changes.pop('hang', self.hang))
+            self.message_status = int(changes.pop('message_status', self.message_status))
+            channels = changes.pop('channels', {})
+            self.status.update(changes)
+            for name, fields in channels.items():
+                self.status['channels'].setdefault(name, {}).update(fields)
+            self.version += 1
+            self.changed.notify_all()
+
+    def snapshot(self):
+        with self.changed:
+            return self.version, json.loads(json.dumps(self.status))
+
+    def receive(self, message):
+        """Record an outbound message; returns the HTTP status to answer with"""
+        with self.changed:
+            if self.message_status != 200:
+                return self.message_status
+            if message.get('id') in self.seen_ids:
+                self.messages['duplicates'] += 1
+                return 200
+            if message.get('id'):
+                self.seen_ids.add(message['id'])
+            self.messages['count'] += 1
+            self.messages['bytes'] += len(message.get('message', ''))
+            self.messages['recent'] = (self.messages['recent'] + [message])[-RECENT_MESSAGES:]
+            return 200
+
+
+def make_handler(state, heartbeat):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so the message dispatcher can reuse its connection
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; avoid Nagle stalls
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if self.path == '/status':
+                self.send_json(200, state.snapshot()[1])
+            elif self.path == '/messages':
+                with state.changed:
+                    self.send_json(200, state.messages)
+            elif self.path == '/status/stream':
+                self.stream()
+            else:
+                self.send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/control':
+                state.update(body)
+                self.send_json(200, state.snapshot()[1])
+            elif self.path == '/messages':
+                status = state.receive(body)
+                self.send_json(status, {'ok': status == 200})
+            else:
+                self.send_json(404, {'error': 'not found'})
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            sent_version = None
+            try:
+                while True:
+                    with state.changed:
+                        if state.version == sent_version:
+                            state.changed.wait(heartbeat)
+                        version, status = state.version, json.loads(json.dumps(state.status))
+                        hang = state.hang
+                    if version != sent_version:
+                        line = status
+                        sent_version = version
+                    elif hang:
+                        continue
+                    else:
+                        line = {'type': 'heartbeat'}
+                    self.wfile.write(json.dumps(line).encode('utf-8') + b'\n')
+                    self.wfile.flush()
+            except OSError:
+                pass  # Watcher went away
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def flap(state, period):
+    """Toggle the WhatsApp channel between connected and disconnected"""
+    connected = True
+    while True:
+        time.sleep(period)
+        connected = not connected
+        state.update({'channels': {'whatsapp': {'status': 'connected' if connected else 'disconnected'}}})
+        print(f"whatsapp -> {'connected' if connected else 'disconnected'}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenClaw gateway status server")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--heartbeat', type=float, default=HEARTBEAT_INTERVAL,
+                        help="seconds between stream heartbeats")
+    parser.add_argument('--flap', type=float, default=0,
+                        help="toggle the WhatsApp channel every N seconds")
+    args = parser.parse_args()
+
+    state = GatewayState()
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(state, args.heartbeat))
+    server.daemon_threads = True
+    if args.flap:
+        threading.Thread(target=flap, args=(state, args.flap), daemon=True).start()
+    print(f"Fake gateway listening on http://127.0.0.1:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
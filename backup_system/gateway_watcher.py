@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Gateway Status Watcher
+Keeps one long-lived connection to the gateway's status stream and parses
+each structured status update, so a dropped channel or a dead gateway is
+noticed as soon as it happens instead of at the next poll.
+
+The stream is newline-delimited JSON over HTTP. Each line is either a
+status object such as
+    {"status": "running", "channels": {"whatsapp": {"status": "connected"}}}
+or a heartbeat ({"type": "heartbeat"}) sent while nothing changes.
+"""
+
+import http.client
+import json
+import os
+import re
+import socket
+import subprocess
+import threading
+import time
+import urllib.parse
+
+GATEWAY_STATUS_URL = os.environ.get('OPENCLAW_GATEWAY_STATUS_URL',
+                                    'http://127.0.0.1:18789/status/stream')
+CONNECT_TIMEOUT = 2
+# The gateway sends a heartbeat at least this often; longer silence means it hung
+STREAM_IDLE_TIMEOUT = 5
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 5
+
+CONNECTED_STATES = {'connected', 'running', 'active', 'up', 'online', 'ok', 'healthy', 'ready'}
+DISCONNECTED_STATES = {
+    'disconnected', 'stopped', 'down', 'offline', 'inactive', 'failed', 'error',
+    'dead', 'exited', 'closed', 'unreachable', 'logged_out', 'unpaired',
+}
+NEGATIONS = {'not', 'no', 'never'}
+
+
+def _status(connected, state, detail=''):
+    return {'connected': connected, 'state': state, 'detail': detail}
+
+
+def _state_from_fields(fields):
+    """Status for one JSON object carrying `connected` and/or a state string"""
+    state = ''
+    for key in ('state', 'status'):
+        if isinstance(fields.get(key), str):
+            state = fields[key].strip().lower()
+            break
+
+    if isinstance(fields.get('connected'), bool):
+        return _status(fields['connected'], state or ('connected' if fields['connected'] else 'disconnected'))
+    if state in CONNECTED_STATES:
+        return _status(True, state)
+    if state in DISCONNECTED_STATES:
+        return _status(False, state)
+    return _status(None, state or 'unknown')
+
+
+def parse_status(payload, channel=None):
+    """
+    Connection status from a structured gateway status object. A channel
+    entry, when present, decides; otherwise the gateway-wide status does.
+    """
+    if not isinstance(payload, dict):
+        return _status(None, 'unknown', 'status is not a JSON object')
+
+    overall = _state_from_fields(payload)
+    if overall['connected'] is False:
+        # Channels can't be up while the gateway itself is down
+        return overall
+
+    channels = payload.get('channels')
+    if channel and isinstance(channels, dict) and isinstance(channels.get(channel), dict):
+        status = _state_from_fields(channels[channel])
+        status['detail'] = f'channel {channel}'
+        return status
+    return overall
+
+
+def parse_status_text(output):
+    """
+    Connection status from human-readable CLI output. Words are matched
+    whole ("up" no longer matches "startup" or "backup"), and a failure word
+    or a negated success word ("not running") wins over a success word.
+    """
+    words = re.findall(r'[a-z_]+', output.lower())
+    connected = False
+    for i, word in enumerate(words):
+        if word in DISCONNECTED_STATES:
+            return _status(False, word)
+        if word in CONNECTED_STATES:
+            if i > 0 and words[i - 1] in NEGATIONS:
+                return _status(False, f'not {word}')
+            connected = True
+    if connected:
+        return _status(True, 'connected')
+    return _status(None, 'unknown', output.strip()[:200])
+
+
+def parse_status_output(output, channel=None):
+    """Status from `openclaw gateway status` output, JSON if it is JSON"""
+    try:
+        payload = json.loads(output)
+    except ValueError:
+        return parse_status_text(output)
+    return parse_status(payload, channel)
+
+
+def check_status_once(channel=None, timeout=10):
+    """One-shot status check through the CLI (forks a process)"""
+    try:
+        result = subprocess.run(
+            ['openclaw', 'gateway', 'status'],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return _status(False, 'timeout', 'gateway status check timed out')
+    except OSError as e:
+        return _status(False, 'error', str(e))
+
+    status = parse_status_output(result.stdout, channel)
+    if result.returncode != 0 and status['connected'] is not False:
+        status = _status(False, 'error', (result.stderr or result.stdout).strip()[:200])
+    return status
+
+
+class StreamUnsupported(Exception):
+    """The gateway doesn't serve a status stream at the configured URL"""
+
+
+class GatewayWatcher:
+    """Follows the gateway status stream on a background thread"""
+
+    def __init__(self, url=GATEWAY_STATUS_URL, channel='whatsapp', on_change=None,
+                 idle_timeout=STREAM_IDLE_TIMEOUT):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f'unsupported status stream URL: {url}')
+        self.url = url
+        self._parts = parts
+        self.channel = channel
+        self.on_change = on_change
+        self.idle_timeout = idle_timeout
+
+        self.status = _status(None, 'unknown', 'watcher not started')
+        self.changed_at = time.monotonic()
+        # False once the gateway has said it has no status stream
+        self.supported = True
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._conn = None
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='gateway-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                # Unblocks the reader thread
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _set(self, status):
+        with self._lock:
+            previous = self.status
+            self.status = status
+            changed = (previous['connected'], previous['state']) != (status['connected'], status['state'])
+            if changed:
+                self.changed_at = time.monotonic()
+        if changed and self.on_change is not None:
+            self.on_change(status)
+
+    def _run(self):
+        delay = RECONNECT_DELAY
+        while not self._stopped.is_set():
+            try:
+                if self._follow():
+                    delay = RECONNECT_DELAY
+                reason = 'status stream closed by gateway'
+            except StreamUnsupported as e:
+                self.supported = False
+                self._set(_status(None, 'unsupported', str(e)))
+                return
+            except socket.timeout:
+                reason = f'no status from gateway for {self.idle_timeout}s'
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                reason = str(e) or e.__class__.__name__
+            finally:
+                conn, self._conn, self._sock = self._conn, None, None
+                if conn is not None:
+                    conn.close()
+
+            if self._stopped.is_set():
+                break
+            self._set(_status(False, 'unreachable', reason))
+            self._stopped.wait(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _follow(self):
+        """Read status updates until the stream ends; True if any arrived"""
+        parts = self._parts
+        connection_class = (http.client.HTTPSConnection if parts.scheme == 'https'
+                            else http.client.HTTPConnection)
+        self._conn = conn = connection_class(parts.hostname, parts.port, timeout=CONNECT_TIMEOUT)
+        conn.connect()
+        # From here on every read must see a status or heartbeat in time
+        self._sock = conn.sock
+        self._sock.settimeout(self.idle_timeout)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        conn.request('GET', path, headers={'Accept': 'application/x-ndjson'})
+        response = conn.getresponse()
+        if response.status in (404, 405, 501):
+            raise StreamUnsupported(f'{self.url} answered HTTP {response.status}')
+        if response.status != 200:
+            raise http.client.HTTPException(f'HTTP {response.status} from {self.url}')
+
+        received = False
+        for line in response:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json.loads(line)
+            except ValueError:
+                if not received:
+                    # An HTML page or plain text: no status stream at this URL
+                    raise StreamUnsupported(f'{self.url} did not answer with a JSON status stream: '
+                                            f'{line[:80].decode("utf-8", "replace")!r}')
+                raise  # Garbled mid-stream: reconnect
+            received = True
+            if isinstance(payload, dict) and payload.get('type') == 'heartbeat':
+                continue
+            self._set(parse_status(payload, self.channel))
+        return received
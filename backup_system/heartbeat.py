@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Adaptive Heartbeat Scheduling
+Decides how often a channel is checked and heartbeated from its recent
+stability: intervals stretch while the channel stays healthy and snap back
+to the minimum when it flaps, a heartbeat fails, or heartbeat round trips
+slow down. All timing uses the monotonic clock.
+"""
+
+import http.client
+import os
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+
+# noop: a gateway round trip that sends nothing; self: a real message to
+# HEARTBEAT_TARGET (your own number); off: no heartbeats
+HEARTBEAT_MODES = ('noop', 'self', 'off')
+HEARTBEAT_MODE = os.environ.get('OPENCLAW_HEARTBEAT', 'noop')
+HEARTBEAT_TARGET = os.environ.get('OPENCLAW_HEARTBEAT_TARGET', '')
+HEARTBEAT_TIMEOUT = 10
+# Gateway endpoint fetched by a noop heartbeat
+GATEWAY_PING_URL = os.environ.get('OPENCLAW_GATEWAY_PING_URL', 'http://127.0.0.1:18789/status')
+
+# Healthy checks stretch the interval by this factor, up to MAX_STRETCH x the configured interval
+STRETCH_FACTOR = 1.25
+MAX_STRETCH = 4
+# Unstable channels are checked at least this often (or interval / MAX_STRETCH if smaller)
+MIN_INTERVAL = 15
+# Heartbeats go out every HEARTBEAT_RATIO check intervals
+HEARTBEAT_RATIO = 2
+# This many up/down transitions within the window count as flapping
+FLAP_TRANSITIONS = 3
+FLAP_WINDOW = 600
+# A heartbeat slower than DEGRADED_RATIO x the median of recent ones (and at
+# least DEGRADED_MIN_SECONDS) means the connection is degrading
+RTT_SAMPLES = 50
+RTT_MIN_SAMPLES = 5
+DEGRADED_RATIO = 3
+DEGRADED_MIN_SECONDS = 1.0
+
+
+class GatewayPing:
+    """Noop heartbeat: one HTTP round trip to the gateway, without forking the CLI"""
+
+    def __init__(self, url=GATEWAY_PING_URL):
+        self.url = url
+
+    def __call__(self, timeout=HEARTBEAT_TIMEOUT):
+        """None if the gateway answered at all, else an error message"""
+        try:
+            with urllib.request.urlopen(self.url, timeout=timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            # Any HTTP answer proves the gateway is alive, even a 404 from one
+            # without this endpoint; the ping measures liveness, not status
+            e.close()
+        except (OSError, http.client.HTTPException) as e:
+            return f"{self.url}: {e}"
+        return None
+
+
+def heartbeat_command(mode, channel, target=''):
+    """
+    What sends one heartbeat on the channel: a GatewayPing (call it), a
+    command list (run it), or None when disabled
+    """
+    if mode == 'off':
+        return None
+    if mode == 'noop':
+        return GatewayPing()
+    if mode == 'self':
+        if not target:
+            raise ValueError("heartbeat mode 'self' needs a target (--heartbeat-target or OPENCLAW_HEARTBEAT_TARGET)")
+        return ['openclaw', 'message', 'action=send', f'channel={channel}',
+                f'target={target}', 'message=Heartbeat check']
+    raise ValueError(f"Unknown heartbeat mode: {mode} (choose from {', '.join(HEARTBEAT_MODES)})")
+
+
+class AdaptiveScheduler:
+    """Check and heartbeat intervals for one channel, adjusted by its recent stability"""
+
+    def __init__(self, interval, min_interval=None, max_interval=None, clock=time.monotonic):
+        self.base_interval = interval
+        self.min_interval = min_interval or min(interval, max(MIN_INTERVAL, interval / MAX_STRETCH))
+        self.max_interval = max_interval or interval * MAX_STRETCH
+        self.interval = interval
+        self.clock = clock
+        self.connected = None
+        self.transitions = deque()
+        self.rtts = deque(maxlen=RTT_SAMPLES)
+        self.last_rtt = None
+        # First heartbeat right after the first healthy check, to seed the RTT baseline
+        self.next_heartbeat = clock()
+
+    @property
+    def heartbeat_interval(self):
+        return self.interval * HEARTBEAT_RATIO
+
+    @property
+    def flapping(self):
+        return len(self.transitions) >= FLAP_TRANSITIONS
+
+    def tighten(self):
+        self.interval = self.min_interval
+        self.next_heartbeat = min(self.next_heartbeat, self.clock() + self.heartbeat_interval)
+
+    def record_check(self, connected):
+        """Feed a check result; returns the delay until the next check"""
+        now = self.clock()
+        if self.connected is not None and connected != self.connected:
+            self.transitions.append(now)
+        self.connected = connected
+        while self.transitions and now - self.transitions[0] > FLAP_WINDOW:
+            self.transitions.popleft()
+
+        if not connected or self.flapping:
+            self.tighten()
+        else:
+            self.interval = min(self.max_interval, self.interval * STRETCH_FACTOR)
+        return self.interval
+
+    def heartbeat_due(self):
+        return self.connected is True and self.clock() >= self.next_heartbeat
+
+    def record_heartbeat(self, ok, rtt):
+        """Feed a heartbeat result; returns True if the round trip looks degraded"""
+        self.next_heartbeat = self.clock() + self.heartbeat_interval
+        if not ok:
+            self.tighten()
+            return False
+        degraded = (len(self.rtts) >= RTT_MIN_SAMPLES
+                    and rtt > max(DEGRADED_RATIO * statistics.median(self.rtts), DEGRADED_MIN_SECONDS))
+        self.rtts.append(rtt)
+        self.last_rtt = rtt
+        if degraded:
+            self.tighten()
+        return degraded
+
+    @property
+    def rtt_baseline(self):
+        return statistics.median(self.rtts) if self.rtts else None
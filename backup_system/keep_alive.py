@@ -2,79 +2,124 @@
 """
 WhatsApp Gateway Keep-Alive Service
 This script maintains stable connection to WhatsApp gateway by implementing
-periodic checks and automatic reconnection mechanisms.
+periodic checks and automatic reconnection mechanisms. By default it runs
+the asyncio channel supervisor (channel_supervisor.py), which watches every
+configured channel from one process; --single runs the original
+WhatsApp-only loop.
 """
 
+import argparse
+import asyncio
+import gzip
+import os
+import shutil
 import time
 import subprocess
 import logging
+import logging.handlers
 import signal
 import sys
 from datetime import datetime
 import threading
-import requests
+
+from channel_supervisor import DEFAULT_CHANNELS, MAX_CONCURRENT_RECONNECTS, ChannelSupervisor, load_channels
+from gateway_watcher import GATEWAY_STATUS_URL, GatewayWatcher, check_status_once
+from heartbeat import (HEARTBEAT_MODE, HEARTBEAT_MODES, HEARTBEAT_TARGET, HEARTBEAT_TIMEOUT, AdaptiveScheduler,
+                       heartbeat_command)
+from metrics import (CHECK_INTERVAL, HEARTBEAT_DEGRADED, HEARTBEAT_SECONDS, METRICS_HOST, METRICS_PORT, RECONNECTS,
+                     HealthClock, record_check, start_metrics_server)
+
+LOG_FILE = '/tmp/whatsapp_keepalive.log'
+# Rotated to whatsapp_keepalive.log.1.gz ... .5.gz once it reaches this size
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# While disconnected, re-check this often instead of waiting a full interval
+DISCONNECTED_RECHECK_INTERVAL = 5
+
+def compress_rotated_log(source, dest):
+    """Rotator for the log handler: gzip the full log into its backup name"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+def setup_logging():
+    """Log to the size-rotated keep-alive log file and stdout"""
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+    file_handler.namer = lambda name: name + '.gz'
+    file_handler.rotator = compress_rotated_log
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            file_handler,
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
 
 class WhatsAppKeepAlive:
-    def __init__(self, check_interval=60):
+    def __init__(self, check_interval=60, watch=False, status_url=GATEWAY_STATUS_URL,
+                 channel='whatsapp', heartbeat=HEARTBEAT_MODE, heartbeat_target=HEARTBEAT_TARGET):
         self.check_interval = check_interval
         self.running = True
         self.connection_status = "unknown"
         self.last_check = None
         self.failed_attempts = 0
         self.max_failed_attempts = 3
+        self.channel = channel
+        # In watch mode status comes from one long-lived stream instead of a
+        # forked CLI per check; changes wake the main loop immediately
+        self.watcher = GatewayWatcher(status_url, channel, on_change=self.on_status_change) if watch else None
+        self.wakeup = threading.Event()
+        self.health = HealthClock(channel)
+        # Stretches the check/heartbeat interval while stable, tightens it when flapping
+        self.schedule = AdaptiveScheduler(check_interval)
+        CHECK_INTERVAL.set_function(lambda: self.schedule.interval, channel=channel)
+        self.heartbeat_command = heartbeat_command(heartbeat, channel, heartbeat_target)
         
         # Set up logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('/tmp/whatsapp_keepalive.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        setup_logging()
         self.logger = logging.getLogger(__name__)
         
     def signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully"""
         self.logger.info("Received shutdown signal, stopping keep-alive service...")
         self.running = False
+        self.wakeup.set()
+
+    def on_status_change(self, status):
+        """Called from the watcher thread whenever the gateway status changes"""
+        self.logger.info(f"Gateway status changed: {status['state']}"
+                         + (f" ({status['detail']})" if status['detail'] else ""))
+        self.wakeup.set()
         
     def check_connection(self):
         """Check the current connection status"""
+        start = time.monotonic()
         try:
-            # Try to get gateway status
-            result = subprocess.run(
-                ['openclaw', 'gateway', 'status'], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            
-            output = result.stdout.lower()
-            
-            # Check for various indicators of connection status
-            is_connected = (
-                'connected' in output or 
-                'running' in output or 
-                'active' in output or
-                'up' in output
-            )
+            if self.watcher is not None and self.watcher.supported:
+                status = self.watcher.status
+            else:
+                # Poll mode, or the gateway has no status stream: fork the CLI
+                status = check_status_once(self.channel)
             
             self.last_check = datetime.now()
             
-            if is_connected:
+            if status['connected'] is True:
                 self.failed_attempts = 0  # Reset failure count on success
                 self.connection_status = "connected"
+                record_check(self.channel, True, time.monotonic() - start, self.health)
                 return True
             else:
                 self.connection_status = "disconnected"
+                if status['state'] in ('timeout', 'error'):
+                    self.logger.error(f"Gateway status check failed: {status['detail']}")
+                record_check(self.channel, False, time.monotonic() - start, self.health)
                 return False
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error("Gateway status check timed out")
-            return False
         except Exception as e:
             self.logger.error(f"Error checking connection: {e}")
+            record_check(self.channel, False, time.monotonic() - start, self.health)
             return False
     
     def reconnect(self):
@@ -110,48 +155,66 @@ class WhatsAppKeepAlive:
     
     def heartbeat_check(self):
         """Perform a heartbeat check to maintain connection"""
+        start = time.monotonic()
+        ok = False
         try:
-            # Send a simple test message to ensure connection is alive
-            result = subprocess.run([
-                'openclaw', 'message', 
-                'action=send', 
-                'channel=whatsapp', 
-                'target=+85294851476', 
-                'message=Heartbeat check'
-            ], capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0:
+            if callable(self.heartbeat_command):
+                # No-op gateway round trip (see heartbeat.py)
+                error = self.heartbeat_command(HEARTBEAT_TIMEOUT)
+            else:
+                # A message to our own number
+                result = subprocess.run(self.heartbeat_command, capture_output=True, text=True,
+                                        timeout=HEARTBEAT_TIMEOUT)
+                error = result.stderr if result.returncode != 0 else None
+
+            ok = error is None
+            if ok:
                 self.logger.debug("Heartbeat check successful")
-                return True
             else:
-                self.logger.warning(f"Heartbeat check failed: {result.stderr}")
-                return False
+                self.logger.warning(f"Heartbeat check failed: {error}")
+            return ok
         except Exception as e:
             self.logger.warning(f"Heartbeat check error: {e}")
             return False
+        finally:
+            rtt = time.monotonic() - start
+            HEARTBEAT_SECONDS.observe(rtt, channel=self.channel, result='success' if ok else 'failure')
+            if self.schedule.record_heartbeat(ok, rtt):
+                HEARTBEAT_DEGRADED.inc(channel=self.channel)
+                self.logger.warning(f"Heartbeat round trip degraded: {rtt:.2f}s "
+                                    f"(recent median {self.schedule.rtt_baseline:.2f}s)")
     
     def run(self):
         """Main keep-alive loop"""
         self.logger.info("Starting WhatsApp Gateway Keep-Alive Service")
-        self.logger.info(f"Check interval: {self.check_interval} seconds")
+        self.logger.info(f"Check interval: {self.check_interval} seconds "
+                         f"(adaptive, {self.schedule.min_interval:g}-{self.schedule.max_interval:g}s)")
         
         # Register signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
+
+        if self.watcher is not None:
+            self.logger.info(f"Watching gateway status stream: {self.watcher.url}")
+            self.watcher.start()
+            # Let the stream deliver its first status before the first check
+            self.wakeup.wait(timeout=3)
         
         while self.running:
             try:
+                # Cleared before the check so a change during it still wakes the wait below
+                self.wakeup.clear()
                 # Check current connection status
                 is_connected = self.check_connection()
+                self.schedule.record_check(is_connected)
                 
                 if is_connected:
                     self.logger.debug("Connection is healthy")
                     # Reset failure counter
                     self.failed_attempts = 0
                     
-                    # Perform heartbeat check occasionally
-                    if self.last_check and \
-                       (datetime.now() - self.last_check).seconds > self.check_interval * 2:
+                    # Heartbeat every couple of (adaptive) check intervals
+                    if self.heartbeat_command and self.schedule.heartbeat_due():
                         self.heartbeat_check()
                 else:
                     self.failed_attempts += 1
@@ -161,33 +224,105 @@ class WhatsAppKeepAlive:
                     if self.failed_attempts >= self.max_failed_attempts:
                         self.logger.info("Too many failed attempts, initiating reconnection...")
                         if self.reconnect():
+                            RECONNECTS.inc(channel=self.channel, result='success')
                             self.failed_attempts = 0  # Reset after successful reconnection
                         else:
+                            RECONNECTS.inc(channel=self.channel, result='failure')
                             self.logger.error("Reconnection failed, will retry later")
                 
-                # Wait before next check
-                for _ in range(self.check_interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # Wait before next check; status changes and signals end the wait early
+                if self.connection_status == "connected":
+                    self.wakeup.wait(timeout=self.schedule.interval)
+                else:
+                    self.wakeup.wait(timeout=min(self.schedule.interval, DISCONNECTED_RECHECK_INTERVAL))
                     
             except Exception as e:
                 self.logger.error(f"Unexpected error in keep-alive loop: {e}")
-                time.sleep(self.check_interval)
+                self.wakeup.wait(timeout=self.check_interval)
         
+        if self.watcher is not None:
+            self.watcher.stop()
         self.logger.info("Keep-Alive Service stopped")
 
+def run_supervisor(args):
+    """Supervise every requested channel from one asyncio event loop"""
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    try:
+        channels = load_channels(args.channels.split(','), args.config)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+    if args.interval is not None:
+        for channel in channels:
+            channel.interval = args.interval
+
+    try:
+        supervisor = ChannelSupervisor(channels, watch=args.watch, status_url=args.status_url,
+                                       max_concurrent_reconnects=args.max_reconnects,
+                                       heartbeat=args.heartbeat, heartbeat_target=args.heartbeat_target)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        run_task = asyncio.ensure_future(supervisor.run())
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, supervisor.stop)
+        await run_task
+
+    logger.info(f"Supervising channels: {', '.join(channel.name for channel in channels)}")
+    asyncio.run(run())
+    logger.info("Keep-Alive Service stopped")
+
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="WhatsApp Gateway Keep-Alive Service")
+    parser.add_argument('--interval', type=int,
+                        help="seconds between status checks (default: per channel, 60 for WhatsApp)")
+    parser.add_argument('--watch', action='store_true',
+                        help="follow the gateway status stream instead of polling the CLI")
+    parser.add_argument('--status-url', default=GATEWAY_STATUS_URL,
+                        help="gateway status stream URL (default: %(default)s)")
+    parser.add_argument('--channels', default=','.join(DEFAULT_CHANNELS),
+                        help="comma-separated channels to supervise (default: %(default)s)")
+    parser.add_argument('--config', help="JSON file overriding or adding channel definitions")
+    parser.add_argument('--max-reconnects', type=int, default=MAX_CONCURRENT_RECONNECTS,
+                        help="reconnects allowed to run at the same time (default: %(default)s)")
+    parser.add_argument('--single', action='store_true',
+                        help="run the original single-channel WhatsApp loop")
+    parser.add_argument('--heartbeat', choices=HEARTBEAT_MODES, default=HEARTBEAT_MODE,
+                        help="noop: gateway round trip, self: message to --heartbeat-target, off (default: %(default)s)")
+    parser.add_argument('--heartbeat-target', default=HEARTBEAT_TARGET,
+                        help="number to message in --heartbeat self mode, normally your own")
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT,
+                        help="port for the Prometheus /metrics endpoint, 0 to disable (default: %(default)s)")
+    args = parser.parse_args()
+
     print("WhatsApp Gateway Keep-Alive Service")
     print("===================================")
     print(f"Started at: {datetime.now()}")
     print("Monitoring connection and maintaining stability...")
     print("")
+
+    if args.metrics_port:
+        try:
+            start_metrics_server(args.metrics_port)
+            print(f"Metrics: http://{METRICS_HOST}:{args.metrics_port}/metrics")
+        except OSError as e:
+            print(f"Metrics endpoint disabled: {e}")
     
+    if not args.single:
+        run_supervisor(args)
+        return
+
     # Create and run keep-alive service
-    keepalive = WhatsAppKeepAlive(check_interval=60)  # Check every minute
+    try:
+        keepalive = WhatsAppKeepAlive(check_interval=args.interval or 60, watch=args.watch,
+                                      status_url=args.status_url, heartbeat=args.heartbeat,
+                                      heartbeat_target=args.heartbeat_target)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
     keepalive.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
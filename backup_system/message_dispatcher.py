@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Outbound Message Dispatcher
+Sends messages to the gateway over one persistent connection instead of
+forking `openclaw message action=send` per message. Messages wait in a
+bounded in-memory queue. Small ones to the same target are coalesced into
+size-limited batches. Each channel is rate limited, and failed sends are
+retried with backoff. Every accepted message is written to an append-only
+journal first. Anything still queued when the process stops is sent after
+the next start, and when the memory queue is full new messages wait on
+disk instead of blocking the caller.
+
+    python3 message_dispatcher.py send --channel whatsapp --target +85212345678 < digest.txt
+    python3 message_dispatcher.py status
+"""
+
+import argparse
+import collections
+import http.client
+import json
+import logging
+import os
+import random
+import select
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+
+from metrics import MESSAGE_QUEUE, MESSAGES_SENT
+
+GATEWAY_MESSAGE_URL = os.environ.get('OPENCLAW_GATEWAY_MESSAGE_URL', 'http://127.0.0.1:18789/messages')
+JOURNAL_PATH = os.environ.get('OPENCLAW_MESSAGE_JOURNAL',
+                              os.path.expanduser('~/.openclaw/outbound_journal.jsonl'))
+SEND_TIMEOUT = 10
+
+# Messages held in memory; beyond this they wait in the journal
+MAX_QUEUE = 1000
+# A batch (or a part of a long message) never exceeds this many characters
+MAX_BATCH_CHARS = 4000
+BATCH_SEPARATOR = '\n\n'
+# How long the first message to a target waits for others to join its batch
+LINGER = 0.2
+# (batches per second, burst) per channel
+CHANNEL_RATE_LIMITS = {
+    'whatsapp': (1.0, 5),
+    'lark': (5.0, 10),
+    'teams': (2.0, 5),
+}
+DEFAULT_RATE_LIMIT = (2.0, 5)
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 1
+BACKOFF_MAX = 300
+# The journal is rewritten with only the pending messages once it grows past this
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryError(Exception):
+    """A batch the gateway did not accept; `retryable` says whether to try again"""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def retry_delay(attempt):
+    """Exponential backoff with equal jitter: half fixed, half random"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def split_text(text, limit=MAX_BATCH_CHARS):
+    """Split a long message into parts of at most `limit` characters, at line breaks where possible"""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip('\n')
+    if text or not parts:
+        parts.append(text)
+    return parts
+
+
+class TokenBucket:
+    """Allows `rate` sends per second with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.updated = clock()
+
+    def wait_time(self):
+        """Seconds until a token is available, 0 if one is available now"""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class GatewayTransport:
+    """
+    POSTs each batch as JSON over one keep-alive HTTP connection to the gateway
+
+    A batch with an idempotency key carries it as an `Idempotency-Key`
+    header and an `id` field, so the gateway can drop a retried batch it
+    already delivered.
+    """
+
+    def __init__(self, url=GATEWAY_MESSAGE_URL, timeout=SEND_TIMEOUT):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f'unsupported gateway message URL: {url}')
+        self.url = url
+        self.connection_class = (http.client.HTTPSConnection if parts.scheme == 'https'
+                                 else http.client.HTTPConnection)
+        self.host = parts.hostname
+        # None picks the scheme's default port
+        self.port = parts.port
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.timeout = timeout
+        self.conn = None
+
+    def send(self, channel, target, text, idempotency_key=None):
+        payload = {'channel': channel, 'target': target, 'message': text}
+        headers = {'Content-Type': 'application/json'}
+        if idempotency_key:
+            payload['id'] = idempotency_key
+            headers['Idempotency-Key'] = idempotency_key
+        body = json.dumps(payload).encode('utf-8')
+        if self.conn is not None and self._peer_closed():
+            self.close()
+        for attempt in range(2):
+            reused = self.conn is not None
+            if not reused:
+                self.conn = self.connection_class(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request('POST', self.path, body, headers)
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                # The request never got out, so a keep-alive connection the
+                # gateway had closed is retried once on a new one
+                if reused and not attempt:
+                    continue
+                raise DeliveryError(f"gateway unreachable: {e}")
+            try:
+                response = self.conn.getresponse()
+                detail = response.read(200).decode('utf-8', 'replace')
+                response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                # The gateway may have delivered it; only the dispatcher's
+                # backoff retries it, with the same idempotency key
+                self.close()
+                raise DeliveryError(f"no answer from the gateway: {e}")
+        if response.status >= 300:
+            # Throttling and server errors pass; other client errors won't succeed on retry
+            raise DeliveryError(f"gateway answered {response.status}: {detail.strip()}",
+                                retryable=response.status == 429 or response.status >= 500)
+
+    def _peer_closed(self):
+        """True if the gateway closed the idle connection (it only turns readable at EOF)"""
+        sock = self.conn.sock
+        if sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class CLITransport:
+    """The original path: forks `openclaw message action=send` for every batch"""
+
+    def __init__(self, command=('openclaw',), timeout=SEND_TIMEOUT):
+        self.command = list(command)
+        self.timeout = timeout
+
+    def send(self, channel, target, text, idempotency_key=None):
+        # The CLI has no way to pass an idempotency key
+        try:
+            result = subprocess.run(self.command + ['message', 'action=send', f'channel={channel}',
+                                                    f'target={target}', f'message={text}'],
+                                    capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise DeliveryError(f"openclaw message failed: {e}")
+        if result.returncode != 0:
+            raise DeliveryError(f"openclaw message exited with {result.returncode}: {result.stderr.strip()}")
+
+    def close(self):
+        pass
+
+
+class MessageJournal:
+    """
+    Append-only JSON-lines record of accepted and finished messages
+
+    A message line is {"id", "channel", "target", "text", "ts"}; a
+    {"done": [ids]} line marks messages sent or given up on. Whatever has
+    no done line is still pending.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = open(path, 'ab+')
+
+    def pending(self):
+        """Messages without a done line, oldest first"""
+        messages = {}
+        self.file.seek(0)
+        for line in self.file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from a crash mid-write
+            if 'done' in record:
+                for message_id in record['done']:
+                    messages.pop(message_id, None)
+            else:
+                messages[record['id']] = record
+        return list(messages.values())
+
+    def append(self, record):
+        """Write a line and return its offset"""
+        self.file.seek(0, os.SEEK_END)
+        offset = self.file.tell()
+        self.file.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+        self.file.flush()
+        # An accepted message, or a done mark, must survive a crash
+        os.fsync(self.file.fileno())
+        return offset
+
+    def read(self, offset):
+        self.file.seek(offset)
+        return json.loads(self.file.readline())
+
+    def size(self):
+        return self.file.seek(0, os.SEEK_END)
+
+    def rewrite(self, records):
+        """Replace the journal with just `records`; returns their new offsets"""
+        tmp_path = self.path + '.tmp'
+        offsets = []
+        with open(tmp_path, 'wb') as f:
+            for record in records:
+                offsets.append(f.tell())
+                f.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.file.close()
+        self.file = open(self.path, 'ab+')
+        return offsets
+
+    def close(self):
+        self.file.close()
+
+
+class MessageDispatcher:
+    """Queues, batches, rate limits and delivers outbound messages on a background thread"""
+
+    def __init__(self, transport=None, journal_path=JOURNAL_PATH, max_queue=MAX_QUEUE,
+                 max_batch_chars=MAX_BATCH_CHARS, linger=LINGER, rate_limits=None,
+                 default_rate_limit=DEFAULT_RATE_LIMIT, max_attempts=MAX_ATTEMPTS):
+        self.transport = transport or GatewayTransport()
+        self.journal = MessageJournal(journal_path)
+        self.max_queue = max_queue
+        self.max_batch_chars = max_batch_chars
+        self.linger = linger
+        self.rate_limits = CHANNEL_RATE_LIMITS if rate_limits is None else rate_limits
+        # None: channels without an entry in rate_limits are not limited
+        self.default_rate_limit = default_rate_limit
+        self.max_attempts = max_attempts
+
+        self.queues = collections.OrderedDict()  # (channel, target) -> deque of messages
+        self.queued = 0
+        self.spilled = collections.deque()  # Journal offsets of messages not yet in memory
+        self.attempts = {}  # (channel, target) -> failed attempts of the batch at its head
+        self.retry_sizes = {}  # (channel, target) -> message count of the batch at its head
+        self.not_before = {}  # (channel, target) -> monotonic time of the next retry
+        self.buckets = {}
+        self.in_flight = False
+        self.flushing = False
+        self.stopping = False
+        self.stats = collections.Counter()
+        self._changed = threading.Condition()
+        self._thread = None
+
+        MESSAGE_QUEUE.set_function(lambda: self.queued, location='memory')
+        MESSAGE_QUEUE.set_function(lambda: len(self.spilled), location='journal')
+        self._restore()
+
+    def _restore(self):
+        """Requeue the messages a previous run left in the journal, compacting it"""
+        pending = self.journal.pending()
+        offsets = self.journal.rewrite(pending)
+        for record, offset in zip(pending, offsets):
+            if self.queued < self.max_queue:
+                self._enqueue(record, queued_at=0)
+            else:
+                self.spilled.append(offset)
+        if pending:
+            logger.info(f"Restored {len(pending)} queued messages from {self.journal.path}")
+            self.stats['restored'] += len(pending)
+
+    def _enqueue(self, record, queued_at):
+        message = dict(record, queued_at=queued_at)
+        self.queues.setdefault((record['channel'], record['target']), collections.deque()).append(message)
+        self.queued += 1
+
+    def _refill(self):
+        while self.spilled and self.queued < self.max_queue:
+            self._enqueue(self.journal.read(self.spilled.popleft()), queued_at=0)
+
+    def send(self, channel, target, text):
+        """Queue a message; long messages are split into parts. Returns the message ids"""
+        ids = []
+        with self._changed:
+            if self.stopping:
+                raise RuntimeError("dispatcher is stopped")
+            now = time.monotonic()
+            for part in split_text(text, self.max_batch_chars):
+                record = {'id': uuid.uuid4().hex, 'channel': channel, 'target': target,
+                          'text': part, 'ts': round(time.time(), 3)}
+                offset = self.journal.append(record)
+                if self.spilled or self.queued >= self.max_queue:
+                    self.spilled.append(offset)
+                else:
+                    self._enqueue(record, queued_at=now)
+                ids.append(record['id'])
+            self.stats['accepted'] += len(ids)
+            self._changed.notify_all()
+        return ids
+
+    def bucket(self, channel):
+        if channel not in self.buckets:
+            limit = self.rate_limits.get(channel, self.default_rate_limit)
+            self.buckets[channel] = TokenBucket(*limit) if limit else None
+        return self.buckets[channel]
+
+    def _batch_full(self, queue):
+        size = -len(BATCH_SEPARATOR)
+        for message in queue:
+            size += len(BATCH_SEPARATOR) + len(message['text'])
+            if size >= self.max_batch_chars:
+                return True
+        return False
+
+    def _next_batch(self):
+        """(key, messages) of the batch to send now, or (None, seconds until one may be ready)"""
+        now = time.monotonic()
+        wait = None
+        for key, queue in self.queues.items():
+            # Waiting out a retry backoff, or for more messages to join a batch
+            ready_at = self.not_before.get(key, 0)
+            if not self.flushing and not self._batch_full(queue):
+                ready_at = max(ready_at, queue[0]['queued_at'] + self.linger)
+            if ready_at > now:
+                wait = ready_at - now if wait is None else min(wait, ready_at - now)
+                continue
+            bucket = self.bucket(key[0])
+            if bucket is not None:
+                delay = bucket.wait_time()
+                if delay:
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+                bucket.take()
+
+            batch = [queue.popleft()]
+            size = len(batch[0]['text'])
+            # A retried batch is sent as it was, so its idempotency key still matches
+            retry_size = self.retry_sizes.get(key)
+            while queue and (len(batch) < retry_size if retry_size else
+                             size + len(BATCH_SEPARATOR) + len(queue[0]['text']) <= self.max_batch_chars):
+                size += len(BATCH_SEPARATOR) + len(queue[0]['text'])
+                batch.append(queue.popleft())
+            if queue:
+                # Round robin: this target goes to the back of the line
+                self.queues.move_to_end(key)
+            else:
+                del self.queues[key]
+            self.queued -= len(batch)
+            return key, batch
+        return None, wait
+
+    def _deliver(self, key, batch):
+        channel, target = key
+        text = BATCH_SEPARATOR.join(message['text'] for message in batch)
+        # Batches are taken in queue order, so the first id and the size identify one
+        idempotency_key = f"{batch[0]['id']}-{len(batch)}"
+        try:
+            self.transport.send(channel, target, text, idempotency_key)
+            error = None
+        except DeliveryError as e:
+            error = e
+        except Exception as e:
+            error = DeliveryError(f"{type(e).__name__}: {e}")
+
+        with self._changed:
+            self.in_flight = False
+            if error is None:
+                self.attempts.pop(key, None)
+                self.not_before.pop(key, None)
+                self.retry_sizes.pop(key, None)
+                self.stats['sent'] += len(batch)
+                self.stats['batches'] += 1
+                MESSAGES_SENT.inc(len(batch), channel=channel, result='sent')
+                self._finish(batch)
+            else:
+                attempts = self.attempts.get(key, 0) + 1
+                if not error.retryable or attempts >= self.max_attempts:
+                    logger.error(f"Dropping {len(batch)} message(s) to {channel}:{target} "
+                                 f"after {attempts} attempt(s): {error}")
+                    self.attempts.pop(key, None)
+                    self.not_before.pop(key, None)
+                    self.retry_sizes.pop(key, None)
+                    self.stats['dropped'] += len(batch)
+                    MESSAGES_SENT.inc(len(batch), channel=channel, result='dropped')
+                    self._finish(batch)
+                else:
+                    delay = retry_delay(attempts - 1)
+                    logger.warning(f"Send to {channel}:{target} failed ({error}), retry {attempts} in {delay:.1f}s")
+                    self.attempts[key] = attempts
+                    self.retry_sizes[key] = len(batch)
+                    self.not_before[key] = time.monotonic() + delay
+                    self.queues.setdefault(key, collections.deque()).extendleft(reversed(batch))
+                    self.queued += len(batch)
+                    self.stats['retries'] += 1
+            self._changed.notify_all()
+
+    def _finish(self, batch):
+        """Journal a finished batch, pull spilled messages into memory, compact when idle"""
+        self.journal.append({'done': [message['id'] for message in batch]})
+        self._refill()
+        if not self.spilled and self.journal.size() > JOURNAL_COMPACT_BYTES:
+            pending = [{k: v for k, v in message.items() if k != 'queued_at'}
+                       for queue in self.queues.values() for message in queue]
+            self.journal.rewrite(pending)
+
+    def _run(self):
+        while True:
+            with self._changed:
+                key, batch = self._next_batch()
+                while key is None:
+                    if self.stopping:
+                        return
+                    self._changed.wait(batch)
+                    key, batch = self._next_batch()
+                self.in_flight = True
+            self._deliver(key, batch)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='message-dispatcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def pending(self):
+        with self._changed:
+            return self.queued + len(self.spilled) + (1 if self.in_flight else 0)
+
+    def flush(self, timeout=None):
+        """Send everything queued without waiting out the linger; False if the timeout passed first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            self.flushing = True
+            self._changed.notify_all()
+            try:
+                while self.queued or self.spilled or self.in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._changed.wait(remaining)
+                return True
+            finally:
+                self.flushing = False
+
+    def stop(self, timeout=10):
+        """Flush for up to `timeout` seconds, then stop; unsent messages stay in the journal"""
+        if self._thread is not None:
+            self.flush(timeout)
+        with self._changed:
+            self.stopping = True
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.transport.close()
+        self.journal.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbound message dispatcher")
+    parser.add_argument('--journal', default=JOURNAL_PATH, help="default: %(default)s")
+    parser.add_argument('--gateway', default=GATEWAY_MESSAGE_URL, help="gateway message URL (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    send_parser = subparsers.add_parser('send', help="send stdin (or --message) plus anything left in the journal")
+    send_parser.add_argument('--channel', default='whatsapp')
+    send_parser.add_argument('--target', required=True)
+    send_parser.add_argument('--message', help="message text (default: read stdin)")
+    send_parser.add_argument('--timeout', type=float, default=60, help="seconds to keep retrying")
+    subparsers.add_parser('status', help="messages waiting in the journal")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == 'status':
+        journal = MessageJournal(args.journal)
+        pending = journal.pending()
+        journal.close()
+        print(f"{len(pending)} message(s) pending in {args.journal}")
+        for record in pending[:20]:
+            print(f"  {record['channel']}:{record['target']}  {record['text'][:60]!r}")
+        return
+
+    text = args.message if args.message is not None else sys.stdin.read()
+    if not text.strip():
+        sys.exit("Error: nothing to send")
+    try:
+        transport = GatewayTransport(args.gateway)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+    dispatcher = MessageDispatcher(transport, args.journal).start()
+    dispatcher.send(args.channel, args.target, text)
+    if dispatcher.flush(args.timeout):
+        print(f"✓ Sent {dispatcher.stats['sent']} message(s) in {dispatcher.stats['batches']} batch(es)")
+    else:
+        print(f"✗ {dispatcher.pending()} message(s) not sent yet; they stay in {args.journal}")
+    dropped = dispatcher.stats['dropped']
+    dispatcher.stop(timeout=0)
+    if dropped or dispatcher.pending():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Keep-Alive Metrics
+Minimal Prometheus-style metrics (counters, gauges, histograms) and a
+/metrics HTTP endpoint in the text exposition format, so flapping and
+check latency can be graphed instead of grepped out of the log.
+"""
+
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_HOST = os.environ.get('OPENCLAW_KEEPALIVE_METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.environ.get('OPENCLAW_KEEPALIVE_METRICS_PORT', '9105'))
+
+# Seconds; status checks fork a CLI or read a stream, so both ends matter
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value):
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, label values, extra labels, value) for every series"""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield '', key, (), value() if callable(value) else value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        for suffix, key, extra, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} '
+                         f'{_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function, **labels):
+        """Compute the value at scrape time, e.g. an age"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = function
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, dict(series, counts=list(series['counts']))) for key, series in self._values.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                yield '_bucket', key, (('le', _format_value(bound)),), cumulative
+            yield '_bucket', key, (('le', '+Inf'),), series['count']
+            yield '_sum', key, (), series['sum']
+            yield '_count', key, (), series['count']
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.monotonic() - self.start
+        self.histogram.observe(self.elapsed, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f'metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+REGISTRY = Registry()
+
+# Keep-alive metrics, labelled by channel
+CHECKS = REGISTRY.counter(
+    'openclaw_keepalive_checks_total', 'Connection status checks', ['channel'])
+CHECK_FAILURES = REGISTRY.counter(
+    'openclaw_keepalive_check_failures_total', 'Status checks that found the channel down', ['channel'])
+RECONNECTS = REGISTRY.counter(
+    'openclaw_keepalive_reconnects_total', 'Reconnect attempts by result', ['channel', 'result'])
+CHECK_SECONDS = REGISTRY.histogram(
+    'openclaw_keepalive_status_check_seconds', 'Status check latency', ['channel'])
+HEARTBEAT_SECONDS = REGISTRY.histogram(
+    'openclaw_keepalive_heartbeat_seconds', 'Heartbeat latency', ['channel', 'result'])
+CONNECTED = REGISTRY.gauge(
+    'openclaw_keepalive_connected', '1 if the last check found the channel connected', ['channel'])
+SECONDS_SINCE_HEALTHY = REGISTRY.gauge(
+    'openclaw_keepalive_seconds_since_healthy',
+    'Seconds since the channel was last seen connected (since start if never)', ['channel'])
+CHECK_INTERVAL = REGISTRY.gauge(
+    'openclaw_keepalive_check_interval_seconds', 'Current adaptive check interval', ['channel'])
+HEARTBEAT_DEGRADED = REGISTRY.counter(
+    'openclaw_keepalive_heartbeat_degraded_total',
+    'Heartbeats whose round trip was well above the recent median', ['channel'])
+CIRCUIT_OPEN = REGISTRY.gauge(
+    'openclaw_keepalive_circuit_open', '1 while reconnects are suspended by the circuit breaker', ['channel'])
+
+# Outbound messages from message_dispatcher.py
+MESSAGES_SENT = REGISTRY.counter(
+    'openclaw_messages_total', 'Outbound messages by result (sent or dropped)', ['channel', 'result'])
+MESSAGE_QUEUE = REGISTRY.gauge(
+    'openclaw_message_queue_depth', 'Outbound messages waiting, in memory or only in the journal', ['location'])
+
+# Network probes from connection_diagnostics.check_network_connectivity
+TCP_CONNECT_SECONDS = REGISTRY.histogram(
+    'openclaw_network_tcp_connect_seconds', 'TCP connect latency per host', ['host'])
+TCP_CONNECT_FAILURES = REGISTRY.counter(
+    'openclaw_network_tcp_connect_failures_total', 'TCP connects that failed or timed out', ['host'])
+
+
+class HealthClock:
+    """Tracks when a channel was last healthy for the seconds-since gauge"""
+
+    def __init__(self, channel):
+        self.last_healthy = time.monotonic()
+        SECONDS_SINCE_HEALTHY.set_function(self.age, channel=channel)
+
+    def healthy(self):
+        self.last_healthy = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.last_healthy
+
+
+def record_check(channel, connected, seconds, clock=None):
+    """Record one status check result"""
+    CHECKS.inc(channel=channel)
+    CHECK_SECONDS.observe(seconds, channel=channel)
+    CONNECTED.set(1 if connected else 0, channel=channel)
+    if connected:
+        if clock is not None:
+            clock.healthy()
+    else:
+        CHECK_FAILURES.inc(channel=channel)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the keep-alive log
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST, registry=REGISTRY):
+    """Serve /metrics on a daemon thread; returns the server"""
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -26,27 +26,24 @@ $SUDO_CMD mkdir -p "/opt/openclaw/keepalive"
 
 echo "Copying files..."
 $SUDO_CMD cp "$SCRIPT_DIR/keep_alive.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/gateway_watcher.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/channel_supervisor.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/metrics.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/heartbeat.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/message_dispatcher.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/../connection_troubleshooting/connection_diagnostics.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/../connection_troubleshooting/diagnostics_history.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/../connection_troubleshooting/log_scanner.py" "$KEEPALIVE_DIR/"
+$SUDO_CMD cp "$SCRIPT_DIR/../connection_troubleshooting/session_index.py" "$KEEPALIVE_DIR/"
 $SUDO_CMD chmod +x "$KEEPALIVE_DIR/keep_alive.py"
 
 # Copy the service file to systemd directory
 $SUDO_CMD cp "$SCRIPT_DIR/whatsapp-keepalive.service" "$SYSTEMD_SERVICE_PATH"
 $SUDO_CMD chmod 644 "$SYSTEMD_SERVICE_PATH"
 
-# Create logrotate configuration
-cat > /tmp/whatsapp_keepalive_logrotate << EOF
-/tmp/whatsapp_keepalive.log {
-    daily
-    missingok
-    rotate 10
-    compress
-    delaycompress
-    copytruncate
-    notifempty
-}
-EOF
-
-$SUDO_CMD mv /tmp/whatsapp_keepalive_logrotate "$LOGROTATE_PATH"
-$SUDO_CMD chmod 644 "$LOGROTATE_PATH"
+# keep_alive.py rotates and compresses its own log by size; drop the logrotate
+# config installed by earlier versions so the two don't rotate the same file
+$SUDO_CMD rm -f "$LOGROTATE_PATH"
 
 # Reload systemd to recognize the new service
 echo "Reloading systemd daemon..."
@@ -86,4 +83,4 @@ echo ""
 echo "Configuration files location:"
 echo "  Service:   $SYSTEMD_SERVICE_PATH"
 echo "  Script:    $KEEPALIVE_DIR/keep_alive.py"
-echo "  Logs:      /tmp/whatsapp_keepalive.log (rotated via $LOGROTATE_PATH)"
\ No newline at end of file
+echo "  Logs:      /tmp/whatsapp_keepalive.log (rotated at 10 MB, 5 compressed backups)"
\ No newline at end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: outbound message dispatcher vs a forked CLI per message
+Sends the same messages to a local fake gateway three ways and reports
+messages/sec and gateway requests:
+
+    fork       one process per message, like `openclaw message action=send`
+    persistent the dispatcher with coalescing off (one request per message)
+    batched    the dispatcher coalescing messages per target
+
+The forked stand-in is a small Python script, so the fork path here is
+much faster than the real Node CLI.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backup_system'))
+
+from fake_gateway import GatewayState, make_handler
+from message_dispatcher import CLITransport, GatewayTransport, MessageDispatcher
+
+# Posts one message the way the CLI would: <url> message action=send channel=... target=... message=...
+FORKED_CLI = (
+    "import json, sys, urllib.request\n"
+    "fields = dict(arg.split('=', 1) for arg in sys.argv[3:])\n"
+    "body = json.dumps({'channel': fields['channel'], 'target': fields['target'], 'message': fields['message']})\n"
+    "urllib.request.urlopen(urllib.request.Request(sys.argv[1], body.encode(), {'Content-Type': 'application/json'})).read()\n"
+)
+
+
+def start_gateway():
+    state = GatewayState()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state, 1))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def make_messages(count, targets):
+    return [('whatsapp', f'+8529000{i % targets:04d}', f'Update {i}: typhoon signal no. 3 is in force')
+            for i in range(count)]
+
+
+def run_fork(url, messages):
+    transport = CLITransport(command=[sys.executable, '-c', FORKED_CLI, url])
+    start = time.perf_counter()
+    for channel, target, text in messages:
+        transport.send(channel, target, text)
+    return time.perf_counter() - start
+
+
+def run_dispatcher(url, messages, batched):
+    with tempfile.TemporaryDirectory() as workdir:
+        dispatcher = MessageDispatcher(
+            GatewayTransport(url), os.path.join(workdir, 'journal.jsonl'),
+            # Unlimited rate; without coalescing a batch only has room for one message
+            rate_limits={}, default_rate_limit=None,
+            max_batch_chars=4000 if batched else max(len(text) for _, _, text in messages),
+            linger=0.05 if batched else 0)
+        dispatcher.start()
+        start = time.perf_counter()
+        for message in messages:
+            dispatcher.send(*message)
+        dispatcher.flush()
+        elapsed = time.perf_counter() - start
+        dispatcher.stop()
+    return elapsed
+
+
+def run(messages=2000, fork_messages=100, targets=10):
+    """messages/sec and gateway requests for each path"""
+    server, state = start_gateway()
+    url = f'http://127.0.0.1:{server.server_address[1]}/messages'
+    results = {}
+    try:
+        for mode in ('fork', 'persistent', 'batched'):
+            count = fork_messages if mode == 'fork' else messages
+            batch = make_messages(count, targets)
+            before = state.messages['count']
+            if mode == 'fork':
+                elapsed = run_fork(url, batch)
+            else:
+                elapsed = run_dispatcher(url, batch, batched=mode == 'batched')
+            results[mode] = {
+                'messages': count,
+                'messages_per_sec': round(count / elapsed, 1),
+                'gateway_requests': state.messages['count'] - before,
+            }
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000, help="messages per dispatcher run")
+    parser.add_argument('--fork-messages', type=int, default=100, help="messages for the (slow) fork path")
+    parser.add_argument('--targets', type=int, default=10, help="distinct recipients")
+    args = parser.parse_args()
+    print(json.dumps(run(args.messages, args.fork_messages, args.targets), indent=2))
+
+
+if __name__ == "__main__":
+    main()
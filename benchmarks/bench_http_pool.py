@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled keep-alive fetches vs a fresh urlopen per feed
+Serves a recorded-size RSS feed from several local keep-alive servers (one
+per simulated host, like rthk.hk / scmp.com / news.gov.hk) and fetches a
+24-source batch both ways, reporting wall time, connections and bytes.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'skills', 'common'))
+
+from feed_parser import parse_feed_bytes
+from http_pool import ConnectionPool
+
+# Same host split as hk_news_skill.HK_NEWS_SOURCES
+HOST_SOURCE_COUNTS = (10, 5, 7, 2)
+
+
+def make_feed(item_count):
+    """RSS document with `item_count` items"""
+    items = ''.join(
+        f'<item><title>Story {i}</title><link>https://example.test/{i}</link>'
+        f'<guid>example-{i}</guid><description>&lt;p&gt;Body of story {i} '
+        f'with some text to compress.&lt;/p&gt;</description>'
+        f'<pubDate>Mon, 01 Jan 2024 10:{i % 60:02d}:00 GMT</pubDate></item>'
+        for i in range(item_count)
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?><rss><channel>{items}</channel></rss>'.encode('utf-8')
+
+
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.bytes_sent = 0
+
+    def add(self, connections=0, bytes_sent=0):
+        with self.lock:
+            self.connections += connections
+            self.bytes_sent += bytes_sent
+
+
+def start_server(body, counters, latency):
+    """Keep-alive feed server on an ephemeral port; honours Accept-Encoding: gzip"""
+    gzipped = gzip.compress(body)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; avoid Nagle stalls
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            counters.add(connections=1)
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+            payload = gzipped if use_gzip else body
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.send_header('Content-Length', str(len(payload)))
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            self.wfile.write(payload)
+            counters.add(bytes_sent=len(payload))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch_urlopen(url, limit):
+    """The pre-pool code path: new connection and uncompressed body per feed"""
+    req = urllib.request.Request(url, headers={'User-Agent': 'bench'})
+    with urllib.request.urlopen(req, timeout=10) as response:
+        return parse_feed_bytes(response.read(), limit)
+
+
+def fetch_pooled(pool, url, limit):
+    with pool.get(url, headers={'User-Agent': 'bench'}, timeout=10) as response:
+        chunks = iter(lambda: response.read(), b'')
+        return parse_feed_bytes(b''.join(chunks), limit)
+
+
+def run_batch(urls, fetch, rounds):
+    """Fetch every URL `rounds` times, sequentially to isolate per-request cost"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url in urls:
+            items = fetch(url)
+            assert items, url
+    return time.perf_counter() - start
+
+
+def run(items=50, rounds=5, latency=0.0):
+    """Fetch the batch both ways; results keyed by mode"""
+    body = make_feed(items)
+    results = {}
+    for mode in ('urlopen', 'pooled'):
+        counters = Counters()
+        servers = [start_server(body, counters, latency) for _ in HOST_SOURCE_COUNTS]
+        urls = [
+            f'http://127.0.0.1:{server.server_address[1]}/feed/{i}'
+            for server, count in zip(servers, HOST_SOURCE_COUNTS)
+            for i in range(count)
+        ]
+
+        if mode == 'urlopen':
+            elapsed = run_batch(urls, lambda url: fetch_urlopen(url, 3), rounds)
+        else:
+            pool = ConnectionPool()
+            elapsed = run_batch(urls, lambda url: fetch_pooled(pool, url, 3), rounds)
+            pool.close()
+
+        requests = len(urls) * rounds
+        results[mode] = {
+            'requests': requests,
+            'seconds': round(elapsed, 4),
+            'ms_per_request': round(elapsed / requests * 1000, 3),
+            'tcp_connections': counters.connections,
+            'body_bytes': counters.bytes_sent,
+        }
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=50, help='items per feed')
+    parser.add_argument('--rounds', type=int, default=5, help='batches per mode')
+    parser.add_argument('--latency', type=float, default=0.0, help='server think time per request (s)')
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.items, args.rounds, args.latency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Fixture feed server for the benchmarks
+Serves generated RSS 2.0 and Atom feeds of fixed sizes from a local
+keep-alive HTTP server, with configurable latency, error rate and
+conditional-GET (ETag / Last-Modified -> 304) behaviour, so skill and
+parser benchmarks run without touching the network.
+
+    GET /rss/<size>/<name>    RSS 2.0 feed with <size> items
+    GET /atom/<size>/<name>   Atom feed with <size> items
+
+Query parameters override the server defaults per request:
+latency (seconds), error_rate (0-1), status (force a status code) and
+not_modified=0 (always send a full body).
+"""
+
+import argparse
+import gzip
+import random
+import threading
+import time
+import urllib.parse
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Item counts of the standard fixtures: a government bulletin, a typical news
+# site, a large aggregator, and a pathological full-archive feed
+FEED_SIZES = {'small': 10, 'medium': 100, 'large': 1000, 'huge': 5000}
+
+LAST_MODIFIED = formatdate(1704103200, usegmt=True)  # 2024-01-01 10:00 GMT
+
+
+def make_feed(item_count, flavour='rss', seed=0):
+    """Feed document with `item_count` items, shaped like the real sources"""
+    rng = random.Random(seed)
+    words = ('Hong Kong', 'government', 'announces', 'weather', 'warning', 'traffic', 'market',
+             'council', 'health', 'update', 'district', 'transport', 'typhoon', 'signal', 'policy')
+    entries = []
+    for i in range(item_count):
+        title = ' '.join(rng.choice(words) for _ in range(8))
+        body = ' '.join(rng.choice(words) for _ in range(60))
+        minute = i % 60
+        if flavour == 'atom':
+            entries.append(
+                f'<entry><title>{title} #{i}</title><link href="https://example.test/{seed}/{i}"/>'
+                f'<id>urn:example:{seed}:{i}</id><updated>2024-01-01T10:{minute:02d}:00Z</updated>'
+                f'<summary type="html">&lt;p&gt;{body}&lt;/p&gt;</summary></entry>')
+        else:
+            entries.append(
+                f'<item><title>{title} #{i}</title><link>https://example.test/{seed}/{i}</link>'
+                f'<guid isPermaLink="false">example-{seed}-{i}</guid>'
+                f'<description><![CDATA[<p>{body}</p><img src="https://example.test/{i}.jpg"/>]]></description>'
+                f'<pubDate>Mon, 01 Jan 2024 10:{minute:02d}:00 GMT</pubDate></item>')
+    if flavour == 'atom':
+        return ('<?xml version="1.0" encoding="utf-8"?>'
+                '<feed xmlns="http://www.w3.org/2005/Atom"><title>Fixture</title>'
+                + ''.join(entries) + '</feed>').encode('utf-8')
+    return ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            '<title>Fixture</title><link>https://example.test/</link>'
+            + ''.join(entries) + '</channel></rss>').encode('utf-8')
+
+
+class FixtureStats:
+    """Request counters by outcome, shared by all handler threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.bytes_sent = 0
+
+    def add(self, outcome, bytes_sent=0):
+        with self.lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            self.bytes_sent += bytes_sent
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts, bytes_sent=self.bytes_sent)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, error_rate=0.0, not_modified=True, seed=0):
+        super().__init__(address, FixtureHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.not_modified = not_modified
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats = FixtureStats()
+        self._feeds = {}
+        self._feeds_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, size='medium', name='feed', flavour='rss', **params):
+        query = f'?{urllib.parse.urlencode(params)}' if params else ''
+        return f'{self.base_url}/{flavour}/{size}/{name}{query}'
+
+    def feed(self, flavour, size, name):
+        """(body, gzipped body, etag) for a fixture, generated once"""
+        key = (flavour, size, name)
+        with self._feeds_lock:
+            if key not in self._feeds:
+                body = make_feed(FEED_SIZES[size], flavour, seed=sum(map(ord, name)))
+                self._feeds[key] = (body, gzip.compress(body), f'"{flavour}-{size}-{name}-{len(body)}"')
+            return self._feeds[key]
+
+    def roll_error(self, rate):
+        with self.random_lock:
+            return self.random.random() < rate
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='fixture-server', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(parts.query))
+        segments = parts.path.strip('/').split('/')
+        if len(segments) != 3 or segments[0] not in ('rss', 'atom') or segments[1] not in FEED_SIZES:
+            self.send_plain(404, b'unknown fixture\n', 'not_found')
+            return
+        flavour, size, name = segments
+
+        latency = float(params.get('latency', self.server.latency))
+        if latency:
+            time.sleep(latency)
+
+        if 'status' in params:
+            self.send_plain(int(params['status']), b'forced status\n', 'forced')
+            return
+        if self.server.roll_error(float(params.get('error_rate', self.server.error_rate))):
+            self.send_plain(500, b'fixture error\n', 'error')
+            return
+
+        body, gzipped, etag = self.server.feed(flavour, size, name)
+        not_modified = params.get('not_modified', '1' if self.server.not_modified else '0') != '0'
+        if not_modified and (self.headers.get('If-None-Match') == etag
+                             or self.headers.get('If-Modified-Since') == LAST_MODIFIED):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            self.server.stats.add('not_modified')
+            return
+
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        payload = gzipped if use_gzip else body
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/atom+xml' if flavour == 'atom' else 'application/rss+xml')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.stats.add('ok', len(payload))
+
+    def send_plain(self, status, body, outcome):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.stats.add(outcome)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(port=0, **options):
+    """Start a fixture server on a daemon thread; returns the server"""
+    return FixtureServer(('127.0.0.1', port), **options).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixture RSS/Atom feed server")
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds of think time per request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument('--no-304', action='store_true', help="ignore conditional request headers")
+    args = parser.parse_args()
+
+    server = FixtureServer(('127.0.0.1', args.port), latency=args.latency, error_rate=args.error_rate,
+                           not_modified=not args.no_304)
+    print(f"Serving fixtures at {server.base_url}/<rss|atom>/<{'|'.join(FEED_SIZES)}>/<name>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
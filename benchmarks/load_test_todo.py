@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load test for the todo-app static server
+Starts the legacy single-threaded server (socketserver.TCPServer with
+SimpleHTTPRequestHandler) and the current todo-app/server.py, drives each
+with concurrent keep-alive clients, and reports requests/sec and latency
+percentiles. Optional slow clients hold connections open without sending
+a full request, which stalls a single-threaded server.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TODO_DIR = os.path.join(REPO_DIR, 'todo-app')
+
+ASSET_PATHS = ('/', '/css/style.css', '/js/app.js')
+# (method, path, body) cycled through by every client
+ASSET_REQUESTS = tuple(('GET', path, None) for path in ASSET_PATHS)
+
+LEGACY_SERVER = (
+    "import functools, http.server, socketserver, sys\n"
+    "handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=sys.argv[2])\n"
+    "handler.log_message = lambda *a: None\n"
+    "http.server.SimpleHTTPRequestHandler.log_message = lambda *a: None\n"
+    "with socketserver.TCPServer(('', int(sys.argv[1])), handler) as httpd:\n"
+    "    httpd.serve_forever()\n"
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, data_dir=None):
+    """Launch a server subprocess and wait until it accepts connections"""
+    if mode == 'legacy':
+        cmd = [sys.executable, '-c', LEGACY_SERVER, str(port), TODO_DIR]
+    else:
+        cmd = [sys.executable, os.path.join(TODO_DIR, 'server.py'), '--port', str(port), '--dir', TODO_DIR]
+        if data_dir:
+            cmd += ['--data-dir', data_dir]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def client_worker(port, stop_at, latencies, errors, headers, requests=ASSET_REQUESTS):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    i = 0
+    while time.monotonic() < stop_at:
+        method, path, body = requests[i % len(requests)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body,
+                         headers=dict(headers, **({'Content-Type': 'application/json'} if body else {})))
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def open_slow_clients(port, count):
+    """Connections that send half a request line and then go quiet"""
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'GET / HT')
+        sockets.append(sock)
+    return sockets
+
+
+def run_load(port, clients, duration, slow_clients, headers, requests=ASSET_REQUESTS):
+    slow = open_slow_clients(port, slow_clients)
+    latencies = []
+    errors = []
+    stop_at = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=client_worker, args=(port, stop_at, latencies, errors, headers, requests))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    for sock in slow:
+        sock.close()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+    }
+
+
+def run(modes=('legacy', 'current'), clients=8, duration=5.0, slow_clients=0, gzip_ok=True):
+    """Load-test each server mode; returns {mode: stats}"""
+    headers = {'Accept-Encoding': 'gzip, br'} if gzip_ok else {}
+    results = {}
+    for mode in modes:
+        port = free_port()
+        proc = start_server(mode, port)
+        try:
+            results[mode] = run_load(port, clients, duration, slow_clients, headers)
+        finally:
+            proc.terminate()
+            proc.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8, help='concurrent client threads')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per server')
+    parser.add_argument('--slow-clients', type=int, default=0,
+                        help='idle connections holding a partial request')
+    parser.add_argument('--mode', choices=('legacy', 'current', 'both'), default='both')
+    args = parser.parse_args()
+
+    modes = ('legacy', 'current') if args.mode == 'both' else (args.mode,)
+    results = run(modes, args.clients, args.duration, args.slow_clients)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite
+Runs the news skills, the skill worker pool, the feed parser, the todo
+server and the connection diagnostics against local fixtures, writes the
+results to a JSON file and optionally compares them with a stored baseline
+to catch regressions.
+
+    python3 benchmarks/run_benchmarks.py                      # all suites
+    python3 benchmarks/run_benchmarks.py --suite parse --suite skills
+    python3 benchmarks/run_benchmarks.py --save-baseline      # store as baseline
+    python3 benchmarks/run_benchmarks.py --compare            # exit 1 on regression
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'skills', 'common'))
+
+from fixture_server import FEED_SIZES, make_feed, start_fixture_server
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+# A metric this much worse than the baseline counts as a regression
+DEFAULT_THRESHOLD = 0.15
+
+# Direction of each metric, by name suffix; other metrics are informational
+LOWER_IS_BETTER = ('_ms', '_mb')
+HIGHER_IS_BETTER = ('_per_sec',)
+# Changes smaller than this in absolute terms are noise, whatever the percentage
+NOISE_FLOOR = {'_ms': 1.0, '_mb': 2.0}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def latency_summary(prefix, seconds):
+    """p50/p95/p99/max in milliseconds for a list of durations"""
+    ms = [s * 1000 for s in seconds]
+    return {
+        f'{prefix}_p50_ms': round(percentile(ms, 0.50), 3),
+        f'{prefix}_p95_ms': round(percentile(ms, 0.95), 3),
+        f'{prefix}_p99_ms': round(percentile(ms, 0.99), 3),
+        f'{prefix}_max_ms': round(max(ms), 3),
+    }
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Parser throughput -----------------------------------------------------------
+
+def parse_worker(size, flavour, repeat):
+    """Runs in a child process so peak RSS reflects only this feed size"""
+    from feed_fetcher import READ_CHUNK_SIZE
+    from feed_parser import parse_feed, parse_feed_bytes
+
+    body = make_feed(FEED_SIZES[size], flavour)
+    count = FEED_SIZES[size]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        items = parse_feed_bytes(body, count)
+    full = (time.perf_counter() - start) / repeat
+    assert len(items) == count, (len(items), count)
+
+    # What the skills actually do: read the response in chunks and stop after the top few items
+    chunks = [body[i:i + READ_CHUNK_SIZE] for i in range(0, len(body), READ_CHUNK_SIZE)]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse_feed(iter(chunks), 5)
+    top5 = (time.perf_counter() - start) / repeat
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux
+    return {
+        'items_per_sec': round(count / full),
+        'mb_per_sec': round(len(body) / full / 1024 ** 2, 2),
+        'full_parse_ms': round(full * 1000, 3),
+        'top5_parse_ms': round(top5 * 1000, 3),
+        'peak_rss_mb': round(peak / 1024, 1),
+        'rss_growth_mb': round((peak - rss_before) / 1024, 1),
+        'feed_kb': round(len(body) / 1024, 1),
+    }
+
+
+def bench_parse(args):
+    results = {}
+    for flavour in ('rss', 'atom'):
+        for size in FEED_SIZES:
+            repeat = max(1, args.parse_repeat * FEED_SIZES['small'] // FEED_SIZES[size])
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--parse-worker', size,
+                 '--flavour', flavour, '--parse-repeat', str(repeat)],
+                capture_output=True, text=True, check=True).stdout
+            for metric, value in json.loads(output).items():
+                results[f'{flavour}_{size}_{metric}'] = value
+    return results
+
+
+# Skills end to end -----------------------------------------------------------
+
+def time_calls(function, runs, before=None):
+    seconds = []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - start)
+    return seconds, result
+
+
+def bench_skills(args):
+    import load_test_todo
+
+    workdir = tempfile.mkdtemp(prefix='openclaw-bench-')
+    # Isolate the cache, feed health and article store, and make sure no running poller answers
+    os.environ['OPENCLAW_FEED_CACHE_DIR'] = os.path.join(workdir, 'cache')
+    os.environ['OPENCLAW_FEED_HEALTH'] = os.path.join(workdir, 'feed_health.json')
+    os.environ['OPENCLAW_ARTICLE_DB'] = os.path.join(workdir, 'articles.db')
+    os.environ['OPENCLAW_FEED_POLLER_PORT'] = str(load_test_todo.free_port())
+
+    server = start_fixture_server(latency=args.latency)
+    try:
+        news = load_module('news_skill', os.path.join(REPO_DIR, 'skills', 'news', 'news_skill.py'))
+        hk_news = load_module('hk_news_skill', os.path.join(REPO_DIR, 'skills', 'hk_news', 'hk_news_skill.py'))
+        import feed_cache
+        import feed_health
+        import tracing
+
+        # Point every source at a medium fixture feed
+        for sources in (news.NEWS_SOURCES, hk_news.HK_NEWS_SOURCES):
+            for i, name in enumerate(sources):
+                sources[name] = server.url('medium', f'source{i}')
+
+        cache = feed_cache.get_default_cache()
+        results = {'sources_news': len(news.NEWS_SOURCES), 'sources_hk_news': len(hk_news.HK_NEWS_SOURCES)}
+        skills = (('news', news.get_top_news, news.FEED_GROUPS, 'news'),
+                  ('hk_news', hk_news.get_hk_news, hk_news.FEED_GROUPS, 'hk_news'))
+
+        for label, function, groups, group in skills:
+            function()  # Warm up imports and the connection pool
+            seconds, items = time_calls(function, args.runs, before=cache.clear)
+            assert all(items.values()), f'{label}: empty results'
+            results.update(latency_summary(f'{label}_cold', seconds))
+
+            seconds, _ = time_calls(function, args.runs)
+            results.update(latency_summary(f'{label}_warm', seconds))
+
+            # Expired cache entries: every source revalidates and gets a 304
+            spec = groups[group]
+            groups[group] = dict(spec, intervals={source: 0 for source in spec['sources']})
+            try:
+                seconds, _ = time_calls(function, args.runs)
+            finally:
+                groups[group] = spec
+            results.update(latency_summary(f'{label}_revalidate', seconds))
+
+        # Cold calls again with every stage traced; compare with hk_news_cold for the overhead
+        tracing.enable()
+        try:
+            seconds, _ = time_calls(hk_news.get_hk_news, args.runs, before=cache.clear)
+        finally:
+            tracing.disable()
+        results.update(latency_summary('hk_news_traced', seconds))
+
+        # Failing sources must not slow the healthy ones down
+        server.error_rate = 0.2
+        try:
+            seconds, _ = time_calls(hk_news.get_hk_news, args.runs, before=cache.clear)
+        finally:
+            server.error_rate = 0.0
+            # Sources quarantined by the injected errors would skew later results
+            feed_health.get_default_health().reset()
+        results.update(latency_summary('hk_news_errors', seconds))
+
+        seconds, _ = time_calls(lambda: hk_news.search_hk_news('typhoon signal'), args.runs)
+        results.update(latency_summary('hk_search', seconds))
+
+        stats = server.stats.snapshot()
+        results['fixture_not_modified'] = stats.get('not_modified', 0)
+        results['fixture_errors'] = stats.get('error', 0)
+        return results
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# Todo server load ------------------------------------------------------------
+
+def bench_todo_server(args):
+    """Static and API load against todo-app/server.py, using load_test_todo.py"""
+    import load_test_todo
+
+    workdir = tempfile.mkdtemp(prefix='openclaw-bench-todo-')
+    port = load_test_todo.free_port()
+    process = load_test_todo.start_server('current', port, data_dir=workdir)
+    try:
+        results = {'clients': args.clients}
+        scenarios = (
+            ('static', load_test_todo.ASSET_REQUESTS),
+            ('api_list', (('GET', '/api/tasks', None),)),
+            ('api_create', (('POST', '/api/tasks', json.dumps({'text': 'benchmark task'}).encode()),)),
+        )
+        for label, requests in scenarios:
+            stats = load_test_todo.run_load(port, args.clients, args.duration, 0,
+                                            {'Accept-Encoding': 'gzip'}, requests)
+            results.update({f'{label}_{metric}': value for metric, value in stats.items()})
+        return results
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# Diagnostics -----------------------------------------------------------------
+
+def bench_diagnostics(args):
+    sys.path.insert(0, os.path.join(REPO_DIR, 'connection_troubleshooting'))
+    import connection_diagnostics
+
+    durations = []
+    timed_out = 0
+    for _ in range(args.runs):
+        diagnostics = connection_diagnostics.ConnectionDiagnostics().collect()
+        durations.append(diagnostics['duration_ms'] / 1000)
+        timed_out += sum(1 for check in diagnostics['checks'].values()
+                         if check.get('error') == 'deadline exceeded')
+    results = latency_summary('pass', durations)
+    results['checks_past_deadline'] = timed_out
+    return results
+
+
+# HTTP pool ---------------------------------------------------------------
+
+def bench_http_pool(args):
+    import bench_http_pool
+
+    results = bench_http_pool.run(items=50, rounds=3, latency=args.latency)
+    return {f'{mode}_{metric}': value for mode, metrics in results.items() for metric, value in metrics.items()
+            if metric in ('ms_per_request', 'tcp_connections', 'body_bytes')}
+
+
+# Skill worker pool -------------------------------------------------------
+
+def bench_skill_workers(args):
+    """Round trip to a pre-warmed skill worker vs starting an interpreter and importing the skill"""
+    import load_test_todo
+    from skill_workers import SkillClient
+
+    common_dir = os.path.join(REPO_DIR, 'skills', 'common')
+    workdir = tempfile.mkdtemp(prefix='openclaw-bench-workers-')
+    socket_path = os.path.join(workdir, 'skills.sock')
+    env = dict(os.environ, OPENCLAW_SKILL_SOCKET=socket_path,
+               OPENCLAW_FEED_CACHE_DIR=os.path.join(workdir, 'cache'),
+               OPENCLAW_FEED_HEALTH=os.path.join(workdir, 'feed_health.json'),
+               OPENCLAW_FEED_POLLER_PORT=str(load_test_todo.free_port()))
+
+    cold_start = [sys.executable, '-c',
+                  f'import sys; sys.path.insert(0, {common_dir!r}); '
+                  'from skill_registry import SkillRegistry; SkillRegistry().load("hk_news")']
+    seconds, _ = time_calls(lambda: subprocess.run(cold_start, check=True, env=env), args.runs)
+    results = latency_summary('cold_start', seconds)
+
+    server = start_fixture_server(latency=args.latency)
+    pool = subprocess.Popen([sys.executable, os.path.join(common_dir, 'skill_workers.py'), 'serve'],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    client = SkillClient(socket_path)
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                client.ping()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError('skill worker pool did not start')
+                time.sleep(0.05)
+
+        seconds, _ = time_calls(client.ping, max(args.runs, 1000))
+        results.update(latency_summary('ping', seconds))
+        # A cached feed: the worker answers without touching the network
+        url = server.url('medium', 'workers')
+        client.call('news', 'get_news_from_rss', url)
+        seconds, _ = time_calls(lambda: client.call('news', 'get_news_from_rss', url), max(args.runs, 200))
+        results.update(latency_summary('cached_call', seconds))
+        return results
+    finally:
+        client.close()
+        pool.terminate()
+        pool.wait(timeout=10)
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# Message dispatcher ------------------------------------------------------
+
+def bench_dispatcher(args):
+    import bench_dispatcher
+
+    results = bench_dispatcher.run(messages=2000, fork_messages=max(args.runs, 20))
+    return {f'{mode}_{metric}': value for mode, metrics in results.items() for metric, value in metrics.items()
+            if metric in ('messages_per_sec', 'gateway_requests')}
+
+
+SUITES = {
+    'parse': bench_parse,
+    'skills': bench_skills,
+    'skill_workers': bench_skill_workers,
+    'todo_server': bench_todo_server,
+    'diagnostics': bench_diagnostics,
+    'http_pool': bench_http_pool,
+    'dispatcher': bench_dispatcher,
+}
+
+
+# Results and comparison ------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(['git', '-C', REPO_DIR, 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def metric_direction(name):
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    return 0
+
+
+def compare(results, baseline, threshold):
+    """Rows of (suite, metric, baseline, current, change, regressed) for directional metrics"""
+    rows = []
+    for suite, metrics in results['suites'].items():
+        base_metrics = baseline.get('suites', {}).get(suite, {})
+        for name, value in metrics.items():
+            direction = metric_direction(name)
+            base = base_metrics.get(name)
+            if not direction or not isinstance(base, (int, float)) or not base:
+                continue
+            change = (value - base) / base
+            floor = next((floor for suffix, floor in NOISE_FLOOR.items() if name.endswith(suffix)), 0)
+            regressed = change * direction < -threshold and abs(value - base) > floor
+            rows.append((suite, name, base, value, change, regressed))
+    return rows
+
+
+def print_comparison(rows, threshold):
+    regressions = [row for row in rows if row[5]]
+    print(f"\nCompared {len(rows)} metrics against the baseline (threshold {threshold:.0%}):")
+    for suite, name, base, value, change, regressed in rows:
+        if regressed or abs(change) > threshold:
+            # Worse but within the noise floor gets '~'
+            mark = '✗' if regressed else '✓' if change * metric_direction(name) > 0 else '~'
+            print(f"  {mark} {suite}.{name}: {base:g} -> {value:g} ({change:+.1%})")
+    if regressions:
+        print(f"{len(regressions)} regression(s)")
+    else:
+        print("No regressions")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenClaw benchmark suite")
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES),
+                        help="suite to run; repeat for several (default: all)")
+    parser.add_argument('--runs', type=int, default=10, help="calls per skill/diagnostics scenario")
+    parser.add_argument('--latency', type=float, default=0.02, help="fixture server think time per request (s)")
+    parser.add_argument('--parse-repeat', type=int, default=200, help="parses of the small feed (scaled by size)")
+    parser.add_argument('--clients', type=int, default=8, help="todo server load-test clients")
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds per todo server scenario")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="result file (default: %(default)s)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline file (default: %(default)s)")
+    parser.add_argument('--compare', action='store_true', help="compare with the baseline; exit 1 on regression")
+    parser.add_argument('--save-baseline', action='store_true', help="also write the results as the baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative change counted as a regression (default: %(default)s)")
+    parser.add_argument('--parse-worker', help=argparse.SUPPRESS)
+    parser.add_argument('--flavour', default='rss', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.parse_worker:
+        print(json.dumps(parse_worker(args.parse_worker, args.flavour, args.parse_repeat)))
+        return
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'suites': {},
+    }
+    for name in args.suite or SUITES:
+        print(f"Running {name}...", flush=True)
+        start = time.perf_counter()
+        results['suites'][name] = SUITES[name](args)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+        for metric, value in results['suites'][name].items():
+            print(f"  {metric}: {value}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {args.output}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline saved to: {args.baseline}")
+    elif args.compare:
+        try:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        except OSError as e:
+            sys.exit(f"Error: cannot read baseline: {e}")
+        if print_comparison(compare(results, baseline, args.threshold), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,226 +3,381 @@
 Connection Diagnostics Tool
 This script diagnoses connection issues and provides detailed reports
 about the system's connection status and potential problems.
+
+All check groups run concurrently under one overall deadline. Resource and
+process data are read straight from /proc and statvfs; the only child
+process is the `openclaw gateway status` CLI.
 """
 
+import argparse
 import subprocess
 import socket
+import threading
 import time
 import json
 import platform
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 import os
 import sys
 
+from diagnostics_history import (DEFAULT_CAPACITY, FIELD_NAMES, HISTORY_PATH, DiagnosticsHistory,
+                                 parse_window, print_summary, sample_from_diagnostics, summarize)
+from log_scanner import LogAnalyzer, tail_lines
+from session_index import SessionIndex, format_age
+
+# Hosts probed by check_network_connectivity (also graphed by keep_alive.py)
+NETWORK_PROBES = (('google.com', 80), ('web.whatsapp.com', 443))
+DNS_PROBE_HOST = 'google.com'
+TCP_TIMEOUT = 5
+GATEWAY_STATUS_TIMEOUT = 10
+# Upper bound for a whole diagnostic pass; checks still running are reported as timed out
+DEFAULT_DEADLINE = 6
+
+# Paths whose filesystems are reported in the resource check
+DISK_PATHS = ('/', os.path.expanduser('~/.openclaw'))
+LOW_MEMORY_PERCENT = 10
+LOW_DISK_PERCENT = 5
+CPU_SAMPLE_INTERVAL = 0.1
+
+WHATSAPP_SESSION_PATH = os.path.expanduser('~/.openclaw/whatsapp_session/')
+KEEPALIVE_LOG_PATH = '/tmp/whatsapp_keepalive.log'
+
+# Seconds between samples in --watch mode
+WATCH_INTERVAL = 60
+
+def tcp_connect_time(host, port, timeout=TCP_TIMEOUT):
+    """Seconds taken to open a TCP connection (DNS included), or None on failure"""
+    start = time.monotonic()
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    except OSError:
+        return None
+    elapsed = time.monotonic() - start
+    sock.close()
+    return elapsed
+
+def dns_lookup_time(host):
+    """Seconds taken to resolve a host name, or None on failure"""
+    start = time.monotonic()
+    try:
+        socket.gethostbyname(host)
+    except OSError:
+        return None
+    return time.monotonic() - start
+
+def read_meminfo(path='/proc/meminfo'):
+    """Memory figures in MB from /proc/meminfo"""
+    fields = {}
+    with open(path, 'r') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            value = rest.split()
+            if value:
+                fields[name] = int(value[0])  # kB
+
+    total = fields['MemTotal']
+    # MemAvailable is missing on very old kernels
+    available = fields.get('MemAvailable', fields.get('MemFree', 0) + fields.get('Cached', 0))
+    return {
+        'total_mb': total // 1024,
+        'available_mb': available // 1024,
+        'used_percent': round(100 * (total - available) / total, 1) if total else 0.0,
+        'swap_total_mb': fields.get('SwapTotal', 0) // 1024,
+        'swap_free_mb': fields.get('SwapFree', 0) // 1024,
+    }
+
+def read_loadavg(path='/proc/loadavg'):
+    """1, 5 and 15 minute load averages and runnable/total task counts"""
+    with open(path, 'r') as f:
+        parts = f.read().split()
+    running, total = parts[3].split('/')
+    return {
+        'load_1m': float(parts[0]),
+        'load_5m': float(parts[1]),
+        'load_15m': float(parts[2]),
+        'running_tasks': int(running),
+        'total_tasks': int(total),
+    }
+
+def read_cpu_times(path='/proc/stat'):
+    """(busy, total) jiffies from the aggregate cpu line of /proc/stat"""
+    with open(path, 'r') as f:
+        values = [int(v) for v in f.readline().split()[1:]]
+    # idle + iowait count as not busy
+    idle = values[3] + (values[4] if len(values) > 4 else 0)
+    total = sum(values[:8])  # guest time is already counted in user/nice
+    return total - idle, total
+
+def cpu_usage_percent(interval=CPU_SAMPLE_INTERVAL):
+    """CPU busy percentage over a short sampling interval"""
+    busy_before, total_before = read_cpu_times()
+    time.sleep(interval)
+    busy_after, total_after = read_cpu_times()
+    elapsed = total_after - total_before
+    return round(100 * (busy_after - busy_before) / elapsed, 1) if elapsed else 0.0
+
+def disk_usage(path):
+    """Size and free space of the filesystem holding `path`"""
+    st = os.statvfs(path)
+    total = st.f_blocks * st.f_frsize
+    free = st.f_bavail * st.f_frsize
+    return {
+        'total_gb': round(total / 1024 ** 3, 2),
+        'free_gb': round(free / 1024 ** 3, 2),
+        'used_percent': round(100 * (total - free) / total, 1) if total else 0.0,
+    }
+
+def find_processes(pattern='openclaw'):
+    """Processes whose command line contains `pattern`, from /proc/*/cmdline"""
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    own_pid = os.getpid()
+    processes = []
+    for entry in os.scandir('/proc'):
+        if not entry.name.isdigit() or int(entry.name) == own_pid:
+            continue
+        try:
+            with open(f'/proc/{entry.name}/cmdline', 'rb') as f:
+                cmdline = f.read().replace(b'\0', b' ').decode('utf-8', 'replace').strip()
+            if not cmdline or pattern not in cmdline.lower():
+                continue
+            with open(f'/proc/{entry.name}/statm', 'r') as f:
+                rss_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            continue  # Exited while scanning, or not ours to read
+        processes.append({
+            'pid': int(entry.name),
+            'rss_mb': round(rss_pages * page_size / 1024 ** 2, 1),
+            'cmdline': cmdline,
+        })
+    return sorted(processes, key=lambda process: process['pid'])
+
 class ConnectionDiagnostics:
-    def __init__(self):
+    # (result key, heading, method) in report order
+    CHECKS = (
+        ('network', "Checking network connectivity...", 'check_network_connectivity'),
+        ('gateway_status', "Checking OpenClaw gateway status...", 'check_openclaw_gateway_status'),
+        ('processes', "Checking OpenClaw processes...", 'check_process_status'),
+        ('resources', "Checking system resources...", 'check_system_resources'),
+        ('whatsapp_details', "Checking WhatsApp connection details...", 'check_whatsapp_connection_details'),
+    )
+
+    def __init__(self, deadline=DEFAULT_DEADLINE):
         self.diagnostics = {
             'timestamp': datetime.now().isoformat(),
             'platform': platform.platform(),
             'hostname': socket.gethostname(),
             'checks': {}
         }
-        
+        self.deadline_seconds = deadline
+        self._deadline = time.monotonic() + deadline
+        # Lines printed under each check's heading, in report order
+        self.output = {}
+        self._lock = threading.Lock()
+        self._expired = set()
+
+    def remaining(self, cap):
+        """Time left before the overall deadline, at most `cap` seconds"""
+        return max(0.1, min(cap, self._deadline - time.monotonic()))
+
+    def record(self, key, info, lines):
+        """Store a check's results, unless the deadline already gave up on it"""
+        with self._lock:
+            if key in self._expired:
+                return
+            self.diagnostics['checks'][key] = info
+            self.output[key] = lines
+
     def check_network_connectivity(self):
         """Check basic network connectivity"""
-        print("Checking network connectivity...")
-        
-        try:
-            # Test DNS resolution
-            socket.gethostbyname('google.com')
-            dns_ok = True
-        except socket.gaierror:
-            dns_ok = False
-            
-        # Test direct connection to common ports
-        def test_port(host, port):
-            try:
-                sock = socket.create_connection((host, port), timeout=5)
-                sock.close()
-                return True
-            except socket.error:
-                return False
-                
-        google_connectivity = test_port('google.com', 80)
-        whatsapp_connectivity = test_port('web.whatsapp.com', 443)
-        
-        self.diagnostics['checks']['network'] = {
+        # DNS and every TCP probe run at the same time
+        with ThreadPoolExecutor(max_workers=1 + len(NETWORK_PROBES)) as pool:
+            dns_future = pool.submit(dns_lookup_time, DNS_PROBE_HOST)
+            connect_futures = {
+                host: pool.submit(tcp_connect_time, host, port, self.remaining(TCP_TIMEOUT))
+                for host, port in NETWORK_PROBES
+            }
+            dns_time = dns_future.result()
+            connect_times = {host: future.result() for host, future in connect_futures.items()}
+
+        dns_ok = dns_time is not None
+        google_connectivity = connect_times['google.com'] is not None
+        whatsapp_connectivity = connect_times['web.whatsapp.com'] is not None
+
+        self.record('network', {
             'dns_resolution': dns_ok,
             'google_connectivity': google_connectivity,
-            'whatsapp_connectivity': whatsapp_connectivity
-        }
-        
-        print(f"  DNS Resolution: {'✓' if dns_ok else '✗'}")
-        print(f"  Google Connectivity: {'✓' if google_connectivity else '✗'}")
-        print(f"  WhatsApp Connectivity: {'✓' if whatsapp_connectivity else '✗'}")
-        
+            'whatsapp_connectivity': whatsapp_connectivity,
+            'dns_ms': round(dns_time * 1000, 1) if dns_ok else None,
+            'connect_ms': {
+                host: round(seconds * 1000, 1) if seconds is not None else None
+                for host, seconds in connect_times.items()
+            }
+        }, [
+            f"  DNS Resolution: {'✓' if dns_ok else '✗'}",
+            f"  Google Connectivity: {'✓' if google_connectivity else '✗'}",
+            f"  WhatsApp Connectivity: {'✓' if whatsapp_connectivity else '✗'}",
+        ])
+
     def check_openclaw_gateway_status(self):
         """Check OpenClaw gateway status"""
-        print("Checking OpenClaw gateway status...")
-        
         try:
             result = subprocess.run(
                 ['openclaw', 'gateway', 'status'],
                 capture_output=True,
                 text=True,
-                timeout=10
+                timeout=self.remaining(GATEWAY_STATUS_TIMEOUT)
             )
-            
+
             status_info = {
                 'return_code': result.returncode,
                 'stdout': result.stdout,
                 'stderr': result.stderr,
                 'success': result.returncode == 0
             }
-            
-            self.diagnostics['checks']['gateway_status'] = status_info
-            
-            print(f"  Gateway Status Command: {'✓' if status_info['success'] else '✗'}")
+            lines = [f"  Gateway Status Command: {'✓' if status_info['success'] else '✗'}"]
             if not status_info['success']:
-                print(f"  Error: {result.stderr}")
-                
+                lines.append(f"  Error: {result.stderr}")
+            self.record('gateway_status', status_info, lines)
+
         except subprocess.TimeoutExpired:
-            print("  ✗ Gateway status check timed out")
-            self.diagnostics['checks']['gateway_status'] = {
+            self.record('gateway_status', {
                 'error': 'timeout',
                 'success': False
-            }
+            }, ["  ✗ Gateway status check timed out"])
         except FileNotFoundError:
-            print("  ✗ OpenClaw command not found")
-            self.diagnostics['checks']['gateway_status'] = {
+            self.record('gateway_status', {
                 'error': 'command_not_found',
                 'success': False
-            }
+            }, ["  ✗ OpenClaw command not found"])
         except Exception as e:
-            print(f"  ✗ Error checking gateway: {e}")
-            self.diagnostics['checks']['gateway_status'] = {
+            self.record('gateway_status', {
                 'error': str(e),
                 'success': False
-            }
-            
+            }, [f"  ✗ Error checking gateway: {e}"])
+
     def check_process_status(self):
         """Check for running OpenClaw processes"""
-        print("Checking OpenClaw processes...")
-        
         try:
-            # Find OpenClaw-related processes
-            result = subprocess.run(
-                ['ps', 'aux'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            openclaw_processes = []
-            for line in result.stdout.split('\n'):
-                if 'openclaw' in line.lower() and 'grep' not in line:
-                    openclaw_processes.append(line.strip())
-                    
-            process_info = {
+            openclaw_processes = find_processes('openclaw')
+            lines = [f"  Found {len(openclaw_processes)} OpenClaw processes"]
+            for proc in openclaw_processes[:3]:  # Show first 3 processes
+                lines.append(f"    {proc['pid']:>7} {proc['rss_mb']:>8.1f} MB  {proc['cmdline'][:100]}")
+            self.record('processes', {
                 'count': len(openclaw_processes),
                 'processes': openclaw_processes
-            }
-            
-            self.diagnostics['checks']['processes'] = process_info
-            
-            print(f"  Found {len(openclaw_processes)} OpenClaw processes")
-            for proc in openclaw_processes[:3]:  # Show first 3 processes
-                print(f"    {proc}")
-                
+            }, lines)
+
         except Exception as e:
-            print(f"  ✗ Error checking processes: {e}")
-            self.diagnostics['checks']['processes'] = {
+            self.record('processes', {
                 'error': str(e),
                 'count': 0,
                 'processes': []
-            }
-            
+            }, [f"  ✗ Error checking processes: {e}"])
+
     def check_system_resources(self):
         """Check system resources"""
-        print("Checking system resources...")
-        
         try:
-            # Check CPU usage
-            cpu_result = subprocess.run(
-                ['top', '-bn1', '-p1'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            # Check memory usage
-            mem_result = subprocess.run(
-                ['free', '-m'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            # Check disk usage
-            disk_result = subprocess.run(
-                ['df', '-h'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
+            memory = read_meminfo()
+            load = read_loadavg()
+            cpu_percent = cpu_usage_percent()
+            disks = {}
+            for path in DISK_PATHS:
+                if os.path.exists(path):
+                    disks[path] = disk_usage(path)
+
+            low_memory = 100 - memory['used_percent'] < LOW_MEMORY_PERCENT
+            low_disk = [path for path, disk in disks.items() if 100 - disk['used_percent'] < LOW_DISK_PERCENT]
             resource_info = {
-                'cpu_available': cpu_result.returncode == 0,
-                'memory_available': mem_result.returncode == 0,
-                'disk_available': disk_result.returncode == 0,
-                'memory_usage': mem_result.stdout if mem_result.returncode == 0 else None,
-                'disk_usage': disk_result.stdout if disk_result.returncode == 0 else None
+                'memory': memory,
+                'load': load,
+                'cpu_percent': cpu_percent,
+                'disks': disks,
+                'low_memory': low_memory,
+                'low_disk': low_disk
             }
-            
-            self.diagnostics['checks']['resources'] = resource_info
-            
-            print("  Resource checks completed")
-            
+
+            lines = [
+                f"  Memory: {memory['available_mb']} of {memory['total_mb']} MB available "
+                f"({memory['used_percent']}% used) {'✗' if low_memory else '✓'}",
+                f"  CPU: {cpu_percent}% busy, load average "
+                f"{load['load_1m']} {load['load_5m']} {load['load_15m']}",
+            ]
+            for path, disk in disks.items():
+                lines.append(f"  Disk {path}: {disk['free_gb']} of {disk['total_gb']} GB free "
+                             f"({disk['used_percent']}% used) {'✗' if path in low_disk else '✓'}")
+            self.record('resources', resource_info, lines)
+
         except Exception as e:
-            print(f"  ✗ Error checking resources: {e}")
-            self.diagnostics['checks']['resources'] = {
+            self.record('resources', {
                 'error': str(e)
-            }
-            
+            }, [f"  ✗ Error checking resources: {e}"])
+
     def check_whatsapp_connection_details(self):
         """Check WhatsApp-specific connection details"""
-        print("Checking WhatsApp connection details...")
-        
         # Check if WhatsApp session exists
         session_exists = False
-        session_path = os.path.expanduser('~/.openclaw/whatsapp_session/')
+        session_path = WHATSAPP_SESSION_PATH
+        session_report = None
         if os.path.exists(session_path):
             session_exists = True
-            # Count session files
-            session_files = len(os.listdir(session_path)) if os.path.isdir(session_path) else 0
+            session_files = 0
+            if os.path.isdir(session_path):
+                # Only files whose size or mtime changed since the last run are rehashed
+                try:
+                    index = SessionIndex(session_path)
+                    session_report = index.scan()
+                    index.save()
+                    session_files = session_report['file_count']
+                except OSError:
+                    session_files = len(os.listdir(session_path))
         else:
             session_files = 0
-            
+
         # Check for WhatsApp-related errors in logs
         log_errors = []
-        log_path = '/tmp/whatsapp_keepalive.log'
+        error_types = {}
+        log_path = KEEPALIVE_LOG_PATH
         if os.path.exists(log_path):
             try:
-                with open(log_path, 'r') as f:
-                    lines = f.readlines()
-                    for line in lines[-20:]:  # Check last 20 lines
-                        if 'error' in line.lower() or 'exception' in line.lower():
-                            log_errors.append(line.strip())
-            except:
+                for line in tail_lines(log_path, 20):  # Check last 20 lines
+                    if 'error' in line.lower() or 'exception' in line.lower():
+                        log_errors.append(line.strip())
+                # Running totals by type, reading only what was appended since the last run
+                analyzer = LogAnalyzer(log_path)
+                error_types = analyzer.scan()
+                analyzer.save()
+            except OSError:
                 pass  # Ignore if can't read log
-                
+
         whatsapp_info = {
             'session_exists': session_exists,
             'session_files_count': session_files,
-            'recent_errors': log_errors
+            'session_index': session_report,
+            'recent_errors': log_errors,
+            'error_types': error_types
         }
-        
-        self.diagnostics['checks']['whatsapp_details'] = whatsapp_info
-        
-        print(f"  WhatsApp session exists: {'✓' if session_exists else '✗'}")
-        print(f"  Session files: {session_files}")
-        print(f"  Recent errors in log: {len(log_errors)}")
-        
+
+        lines = [
+            f"  WhatsApp session exists: {'✓' if session_exists else '✗'}",
+            f"  Session files: {session_files}",
+        ]
+        if session_report is not None:
+            growth = session_report['growth_bytes_per_day']
+            lines += [
+                f"  Session size: {session_report['total_bytes'] / 1024:.1f} KB"
+                + ("" if growth is None else f" ({growth / 1024:+.1f} KB/day)"),
+                f"  Last session write: {format_age(session_report['newest_age_seconds'])} ago, "
+                f"stale files: {session_report['stale_files']}",
+                f"  Session integrity: {'✗' if session_report['invalid_json'] else '✓'} "
+                f"({len(session_report['invalid_json'])} unreadable, {len(session_report['changed'])} changed "
+                f"since last run)",
+            ]
+        lines.append(f"  Recent errors in log: {len(log_errors)}")
+        for name, entry in sorted(error_types.items(), key=lambda item: -item[1]['count']):
+            lines.append(f"    {name}: {entry['count']} (last {entry['last'] or 'unknown'})")
+        self.record('whatsapp_details', whatsapp_info, lines)
+
     def generate_report(self):
         """Generate diagnostic report"""
         print("\n" + "="*60)
@@ -231,21 +386,23 @@ class ConnectionDiagnostics:
         print(f"Generated at: {self.diagnostics['timestamp']}")
         print(f"Host: {self.diagnostics['hostname']}")
         print(f"Platform: {self.diagnostics['platform']}")
+        print(f"Duration: {self.diagnostics['duration_ms']} ms")
         print()
-        
+
         # Print summary
         print("SUMMARY:")
         checks = self.diagnostics['checks']
-        
+
         network_ok = checks.get('network', {}).get('google_connectivity', False)
         gateway_ok = checks.get('gateway_status', {}).get('success', False)
-        resource_ok = checks.get('resources', {}).get('memory_available', False)
-        
+        resources = checks.get('resources', {})
+        resource_ok = 'memory' in resources and not resources['low_memory'] and not resources['low_disk']
+
         print(f"  Network Connectivity: {'✓' if network_ok else '✗'}")
         print(f"  Gateway Status: {'✓' if gateway_ok else '✗'}")
         print(f"  System Resources: {'✓' if resource_ok else '✗'}")
         print()
-        
+
         # Recommendations based on findings
         print("RECOMMENDATIONS:")
         if not network_ok:
@@ -254,54 +411,149 @@ class ConnectionDiagnostics:
         if not gateway_ok:
             print("  • Restart OpenClaw gateway: openclaw gateway restart")
             print("  • Check OpenClaw configuration")
-        if not resource_ok:
+        if resources.get('low_memory'):
             print("  • Free up system memory or upgrade resources")
+        for path in resources.get('low_disk', []):
+            print(f"  • Free up disk space on {path}")
         if network_ok and gateway_ok and resource_ok:
             print("  • All basic checks passed")
             print("  • Consider checking WhatsApp Web session status")
-            
+
         print()
         print("="*60)
-        
+
+    def collect(self):
+        """Run every check concurrently; checks still running at the deadline are marked timed out"""
+        start = time.monotonic()
+        self._deadline = start + self.deadline_seconds
+        executor = ThreadPoolExecutor(max_workers=len(self.CHECKS), thread_name_prefix='diagnostics')
+        futures = {executor.submit(getattr(self, method)): key for key, _, method in self.CHECKS}
+        done, not_done = wait(futures, timeout=self.deadline_seconds)
+
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                key = futures[future]
+                self.record(key, {'error': str(error), 'success': False}, [f"  ✗ Check failed: {error}"])
+        with self._lock:
+            for future in not_done:
+                key = futures[future]
+                self._expired.add(key)
+                self.diagnostics['checks'][key] = {'error': 'deadline exceeded', 'success': False}
+                self.output[key] = [f"  ✗ Did not finish within {self.deadline_seconds}s"]
+        # Don't wait for stragglers (e.g. a hung DNS lookup)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        self.diagnostics['duration_ms'] = round((time.monotonic() - start) * 1000, 1)
+        return self.diagnostics
+
     def run_all_checks(self):
         """Run all diagnostic checks"""
         print("Running connection diagnostics...")
         print()
-        
-        self.check_network_connectivity()
-        print()
-        
-        self.check_openclaw_gateway_status()
-        print()
-        
-        self.check_process_status()
-        print()
-        
-        self.check_system_resources()
-        print()
-        
-        self.check_whatsapp_connection_details()
-        print()
-        
+
+        self.collect()
+        for key, heading, _ in self.CHECKS:
+            print(heading)
+            for line in self.output.get(key, []):
+                print(line)
+            print()
+
         self.generate_report()
-        
+
         return self.diagnostics
 
+def watch(args):
+    """Sample on an interval into the history ring buffer until interrupted"""
+    try:
+        history = DiagnosticsHistory(args.history, capacity=args.capacity)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+    print(f"Recording a sample every {args.interval}s to {history.path} "
+          f"(keeps the last {history.capacity})")
+    print()
+
+    try:
+        while True:
+            started = time.monotonic()
+            diagnostics = ConnectionDiagnostics(deadline=min(args.deadline, args.interval)).collect()
+            sample = sample_from_diagnostics(diagnostics)
+            history.append(sample)
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  "
+                  f"net {'✓' if sample['google_ok'] else '✗'}  "
+                  f"whatsapp {'✓' if sample['whatsapp_ok'] else '✗'}  "
+                  f"gateway {'✓' if sample['gateway_ok'] else '✗'}  "
+                  f"mem {sample['memory_used_percent']:.0f}%  "
+                  f"pass {diagnostics['duration_ms']:.0f} ms", flush=True)
+            time.sleep(max(0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        history.close()
+
+def query(args):
+    """Print min/avg/p95 of the recorded history over a time window"""
+    try:
+        window = parse_window(args.window)
+        history = DiagnosticsHistory(args.history, readonly=True)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+    fields = args.fields.split(',') if args.fields else None
+    unknown = [name for name in fields or () if name not in FIELD_NAMES]
+    if unknown:
+        history.close()
+        sys.exit(f"Error: unknown field(s) {', '.join(unknown)}; choose from {', '.join(FIELD_NAMES[1:])}")
+
+    samples = history.samples(since=time.time() - window)
+    history.close()
+    summary = summarize(samples, fields)
+    if args.json:
+        print(json.dumps({'window_seconds': window, 'samples': len(samples), 'fields': summary}, indent=2))
+    else:
+        print_summary(summary, window, len(samples))
+
 def main():
+    parser = argparse.ArgumentParser(description="Connection Diagnostics Tool")
+    parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE,
+                        help="seconds allowed for the whole diagnostic pass (default: %(default)s)")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep sampling into the history ring buffer instead of writing a JSON report")
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL,
+                        help="seconds between samples in --watch mode (default: %(default)s)")
+    parser.add_argument('--query', action='store_true',
+                        help="summarize the recorded history instead of running diagnostics")
+    parser.add_argument('--window', default='24h',
+                        help="time window for --query, e.g. 30m, 6h, 7d (default: %(default)s)")
+    parser.add_argument('--fields', help="comma-separated fields for --query (default: all)")
+    parser.add_argument('--json', action='store_true', help="print the --query summary as JSON")
+    parser.add_argument('--history', default=HISTORY_PATH,
+                        help="history ring buffer file (default: %(default)s)")
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY,
+                        help="samples kept when creating the history file (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.query:
+        query(args)
+        return
+
     print("Connection Diagnostics Tool")
     print("===========================")
     print(f"Starting diagnostics at: {datetime.now()}")
     print()
-    
-    diagnostics_tool = ConnectionDiagnostics()
+
+    if args.watch:
+        watch(args)
+        return
+
+    diagnostics_tool = ConnectionDiagnostics(deadline=args.deadline)
     results = diagnostics_tool.run_all_checks()
-    
+
     # Optionally save results to file
     output_file = f"connection_diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     with open(output_file, 'w') as f:
         json.dump(results, f, indent=2)
-    
+
     print(f"\nDetailed results saved to: {output_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Diagnostics History
+Fixed-size ring buffer of diagnostic samples in an mmap'd file, written by
+`connection_diagnostics.py --watch` and queried for min/avg/p95 over a time
+window. The file never grows: once full, the oldest sample is overwritten.
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+import time
+
+HISTORY_PATH = os.environ.get('OPENCLAW_DIAGNOSTICS_HISTORY',
+                              os.path.expanduser('~/.openclaw/diagnostics_history.bin'))
+# One week of samples at the default 60 second interval
+DEFAULT_CAPACITY = 7 * 24 * 60
+
+MAGIC = b'OCDH'
+VERSION = 1
+# magic, version, record size, capacity, samples ever written
+HEADER = struct.Struct('<4sHHIQ')
+
+# (name, struct code, description); booleans are stored as 0/1 and latencies as NaN when the probe failed
+FIELDS = (
+    ('timestamp', 'd', 'Unix time of the sample'),
+    ('duration_ms', 'f', 'Time taken by the diagnostic pass'),
+    ('dns_ok', 'B', 'DNS resolution succeeded'),
+    ('google_ok', 'B', 'TCP connect to google.com succeeded'),
+    ('whatsapp_ok', 'B', 'TCP connect to web.whatsapp.com succeeded'),
+    ('gateway_ok', 'B', 'openclaw gateway status succeeded'),
+    ('dns_ms', 'f', 'DNS lookup time'),
+    ('google_connect_ms', 'f', 'TCP connect time to google.com'),
+    ('whatsapp_connect_ms', 'f', 'TCP connect time to web.whatsapp.com'),
+    ('memory_available_mb', 'f', 'Available memory'),
+    ('memory_used_percent', 'f', 'Memory in use'),
+    ('swap_free_mb', 'f', 'Free swap'),
+    ('cpu_percent', 'f', 'CPU busy'),
+    ('load_1m', 'f', '1 minute load average'),
+    ('root_free_gb', 'f', 'Free space on /'),
+    ('openclaw_free_gb', 'f', 'Free space on ~/.openclaw'),
+    ('openclaw_processes', 'H', 'Running OpenClaw processes'),
+)
+FIELD_NAMES = tuple(name for name, _, _ in FIELDS)
+BOOLEAN_FIELDS = ('dns_ok', 'google_ok', 'whatsapp_ok', 'gateway_ok')
+RECORD = struct.Struct('<' + ''.join(code for _, code, _ in FIELDS))
+
+NAN = float('nan')
+WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def parse_window(text):
+    """Seconds in a window such as '90', '30m', '6h' or '7d'"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*', text.lower())
+    if not match:
+        raise ValueError(f"invalid window {text!r} (use e.g. 30m, 6h, 7d)")
+    return float(match.group(1)) * WINDOW_UNITS[match.group(2) or 's']
+
+def sample_from_diagnostics(diagnostics):
+    """Flatten a ConnectionDiagnostics result into one history sample"""
+    checks = diagnostics['checks']
+    network = checks.get('network', {})
+    connect_ms = network.get('connect_ms') or {}
+    resources = checks.get('resources', {})
+    memory = resources.get('memory', {})
+    load = resources.get('load', {})
+    disks = resources.get('disks', {})
+    root_disk = disks.get('/', {})
+    openclaw_disk = next((disk for path, disk in disks.items() if path.endswith('.openclaw')), {})
+
+    def number(value):
+        return NAN if value is None else value
+
+    return {
+        'timestamp': time.time(),
+        'duration_ms': number(diagnostics.get('duration_ms')),
+        'dns_ok': network.get('dns_resolution', False),
+        'google_ok': network.get('google_connectivity', False),
+        'whatsapp_ok': network.get('whatsapp_connectivity', False),
+        'gateway_ok': checks.get('gateway_status', {}).get('success', False),
+        'dns_ms': number(network.get('dns_ms')),
+        'google_connect_ms': number(connect_ms.get('google.com')),
+        'whatsapp_connect_ms': number(connect_ms.get('web.whatsapp.com')),
+        'memory_available_mb': number(memory.get('available_mb')),
+        'memory_used_percent': number(memory.get('used_percent')),
+        'swap_free_mb': number(memory.get('swap_free_mb')),
+        'cpu_percent': number(resources.get('cpu_percent')),
+        'load_1m': number(load.get('load_1m')),
+        'root_free_gb': number(root_disk.get('free_gb')),
+        'openclaw_free_gb': number(openclaw_disk.get('free_gb')),
+        'openclaw_processes': checks.get('processes', {}).get('count', 0),
+    }
+
+class DiagnosticsHistory:
+    """Ring buffer of fixed-size samples in an mmap'd file"""
+
+    def __init__(self, path=HISTORY_PATH, capacity=DEFAULT_CAPACITY, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        if readonly:
+            self._file = open(path, 'rb')
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                self._file.close()
+                raise ValueError(f"{path} is not a diagnostics history file")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.capacity = self._read_header(size)
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.truncate(HEADER.size + capacity * RECORD.size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, capacity, 0)
+            self.capacity = capacity
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            self.capacity = self._read_header(size)
+
+    def _read_header(self, size):
+        magic, version, record_size, capacity, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} diagnostics history file")
+        if size < HEADER.size + capacity * RECORD.size:
+            self.close()
+            raise ValueError(f"{self.path} is truncated")
+        return capacity
+
+    @property
+    def written(self):
+        """Samples ever appended; the ring holds the last `capacity` of them"""
+        return HEADER.unpack_from(self._map, 0)[4]
+
+    def append(self, sample):
+        """Store one sample, overwriting the oldest once the ring is full"""
+        written = self.written
+        values = tuple(sample.get(name, 0) for name in FIELD_NAMES)
+        RECORD.pack_into(self._map, HEADER.size + (written % self.capacity) * RECORD.size, *values)
+        # The count is bumped after the record so readers never see a half-written slot as current
+        struct.pack_into('<Q', self._map, HEADER.size - 8, written + 1)
+
+    def samples(self, since=None):
+        """Stored samples, oldest first, optionally only those at or after `since`"""
+        written = self.written
+        count = min(written, self.capacity)
+        start = written - count
+        result = []
+        for n in range(start, written):
+            values = RECORD.unpack_from(self._map, HEADER.size + (n % self.capacity) * RECORD.size)
+            if since is not None and values[0] < since:
+                continue
+            result.append(dict(zip(FIELD_NAMES, values)))
+        return result
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def summarize(samples, fields=None):
+    """min/avg/p95/max per field; booleans become the percentage of samples that passed"""
+    summary = {}
+    for name in fields or FIELD_NAMES[1:]:
+        values = sorted(sample[name] for sample in samples if not math.isnan(sample[name]))
+        if name in BOOLEAN_FIELDS:
+            summary[name] = {
+                'samples': len(values),
+                'ok_percent': round(100 * sum(values) / len(values), 1) if values else None,
+            }
+            continue
+        if not values:
+            summary[name] = {'samples': 0, 'min': None, 'avg': None, 'p95': None, 'max': None}
+            continue
+        # Samples are stored as float32, so trim the noise
+        summary[name] = {
+            'samples': len(values),
+            'min': round(values[0], 3),
+            'avg': round(sum(values) / len(values), 3),
+            'p95': round(percentile(values, 0.95), 3),
+            'max': round(values[-1], 3),
+        }
+    return summary
+
+def print_summary(summary, window_seconds, sample_count):
+    """Print a summary table"""
+    def fmt(value):
+        return '-' if value is None else f"{value:.1f}"
+
+    print(f"Diagnostics history: {sample_count} samples over the last {window_seconds / 3600:g}h")
+    print()
+    print(f"  {'field':<22} {'samples':>8} {'min':>10} {'avg':>10} {'p95':>10} {'max':>10}")
+    for name, stats in summary.items():
+        if 'ok_percent' in stats:
+            print(f"  {name:<22} {stats['samples']:>8} {'ok ' + fmt(stats['ok_percent']) + '%':>43}")
+        else:
+            print(f"  {name:<22} {stats['samples']:>8} {fmt(stats['min']):>10} {fmt(stats['avg']):>10} "
+                  f"{fmt(stats['p95']):>10} {fmt(stats['max']):>10}")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Keep-Alive Log Scanner
+Reads the keep-alive log without loading it into memory: tail_lines seeks
+backwards from the end in blocks, and LogAnalyzer resumes from the byte
+offset (checked against the inode and leading bytes) saved by its previous
+run, classifying errors by type.
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+
+BLOCK_SIZE = 8192
+# Leading bytes remembered to tell a rotated file from the same one, since inodes get reused
+FINGERPRINT_BYTES = 128
+STATE_PATH = os.path.expanduser('~/.openclaw/keepalive_log_state.json')
+
+# First matching rule wins; matched case-insensitively against WARNING/ERROR lines
+ERROR_TYPES = (
+    ('heartbeat_failure', re.compile(r'heartbeat')),
+    ('reconnect_failure', re.compile(r'reconnect')),
+    ('timeout', re.compile(r'timed out|timeout')),
+    ('connection_lost', re.compile(r'connection lost|disconnected')),
+    ('circuit_open', re.compile(r'circuit open')),
+    ('other', re.compile(r'')),
+)
+LINE_PATTERN = re.compile(r'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)(?:,\d+)? - (\w+) - (.*)$')
+PROBLEM_LEVELS = ('WARNING', 'ERROR', 'CRITICAL')
+
+def tail_lines(path, count, block_size=BLOCK_SIZE):
+    """Last `count` lines of a file, reading backwards from the end in blocks"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        # count + 1 newlines guarantees `count` complete lines (the file may end without one)
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.decode('utf-8', 'replace').splitlines()
+    return lines[-count:] if count else []
+
+def classify(line):
+    """(error type, timestamp) for a warning or error log line, or None"""
+    match = LINE_PATTERN.match(line)
+    if match:
+        timestamp, level, message = match.groups()
+        if level not in PROBLEM_LEVELS:
+            return None
+    else:
+        # Not written by the keep-alive logger (e.g. a traceback); fall back to keywords
+        timestamp, message = None, line
+        if 'error' not in line.lower() and 'exception' not in line.lower():
+            return None
+    message = message.lower()
+    for name, pattern in ERROR_TYPES:
+        if pattern.search(message):
+            return name, timestamp
+
+class LogAnalyzer:
+    """Incrementally classifies new log lines, remembering where it stopped"""
+
+    def __init__(self, log_path, state_path=STATE_PATH):
+        self.log_path = log_path
+        self.state_path = state_path
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+            if state.get('log_path') == self.log_path:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {'log_path': self.log_path, 'inode': None, 'fingerprint': None, 'offset': 0, 'errors': {}}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _record(self, line):
+        result = classify(line)
+        if result is None:
+            return
+        name, timestamp = result
+        entry = self.state['errors'].setdefault(name, {'count': 0, 'first': None, 'last': None})
+        entry['count'] += 1
+        if timestamp:
+            entry['first'] = entry['first'] or timestamp
+            entry['last'] = timestamp
+
+    def _consume(self, f):
+        """Classify complete lines from the current position; returns bytes consumed"""
+        consumed = 0
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break  # Partial line still being written; pick it up next time
+            consumed += len(raw)
+            self._record(raw.decode('utf-8', 'replace').rstrip('\n'))
+        return consumed
+
+    def _finish_rotated(self):
+        """Read what was appended to the previous file before it was rotated"""
+        for rotated in (self.log_path + '.1', self.log_path + '.1.gz'):
+            if not os.path.exists(rotated):
+                continue
+            opener = gzip.open if rotated.endswith('.gz') else open
+            try:
+                with opener(rotated, 'rb') as f:
+                    if not f.read(FINGERPRINT_BYTES).hex().startswith(self.state.get('fingerprint') or ''):
+                        return  # Not the file we were reading (rotated more than once since)
+                    f.seek(self.state['offset'])
+                    self._consume(f)
+            except (OSError, EOFError):
+                pass
+            return
+
+    def scan(self):
+        """Classify lines appended since the last scan; returns the error counts so far"""
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            return self.state['errors']
+
+        with open(self.log_path, 'rb') as f:
+            fingerprint = f.read(FINGERPRINT_BYTES).hex()
+            offset = self.state['offset']
+            rotated = (self.state['inode'] not in (None, st.st_ino)
+                       or st.st_size < offset
+                       or not fingerprint.startswith(self.state.get('fingerprint') or ''))
+            if rotated:
+                self._finish_rotated()
+                offset = 0
+            f.seek(offset)
+            offset += self._consume(f)
+
+        self.state['inode'] = st.st_ino
+        self.state['fingerprint'] = fingerprint
+        self.state['offset'] = offset
+        return self.state['errors']
+
+def main():
+    """Scan the keep-alive log and print error counts by type"""
+    log_path = sys.argv[1] if len(sys.argv) > 1 else '/tmp/whatsapp_keepalive.log'
+    analyzer = LogAnalyzer(log_path)
+    errors = analyzer.scan()
+    analyzer.save()
+
+    print(f"Errors in {log_path} (up to byte {analyzer.state['offset']}):")
+    if not errors:
+        print("  none")
+    for name, entry in sorted(errors.items(), key=lambda item: -item[1]['count']):
+        print(f"  {name:<18} {entry['count']:>6}  first {entry['first'] or '-'}  last {entry['last'] or '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+WhatsApp Session Index
+Keeps a persistent index of the session directory (size, mtime and content
+hash per file) so each diagnostic run can report growth, stale keys and
+checksum drift. Files are only rehashed when their size or mtime changed;
+--verify rehashes everything to catch content that changed underneath an
+unchanged mtime.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+SESSION_PATH = os.path.expanduser('~/.openclaw/whatsapp_session/')
+INDEX_PATH = os.path.expanduser('~/.openclaw/whatsapp_session_index.json')
+
+# Key files untouched for longer than this are reported as stale
+STALE_KEY_AGE = 30 * 86400
+# (timestamp, total bytes, file count) per scan, for the growth rate
+HISTORY_SCANS = 500
+# Growth is only reported once the scans span at least this long
+GROWTH_MIN_SPAN = 3600
+HASH_CHUNK = 64 * 1024
+
+def file_hash(path):
+    """blake2b digest of a file's contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def json_is_valid(path):
+    """False if a .json session file no longer parses (truncated write, disk full)"""
+    try:
+        with open(path, 'rb') as f:
+            json.load(f)
+        return True
+    except (ValueError, UnicodeDecodeError):
+        return False
+
+def walk_files(root):
+    """(relative path, DirEntry) for every regular file under root, via scandir"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            if directory == root:
+                raise
+            continue  # Subdirectory deleted while scanning
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield os.path.relpath(entry.path, root), entry
+
+class SessionIndex:
+    """Size, mtime and hash index of a session directory, persisted between runs"""
+
+    def __init__(self, session_path=SESSION_PATH, index_path=INDEX_PATH):
+        self.session_path = session_path
+        self.index_path = index_path
+        self.index = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if index.get('session_path') == self.session_path:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'session_path': self.session_path, 'files': {}, 'history': []}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def scan(self, verify=False):
+        """Update the index from disk and return a health report"""
+        now = time.time()
+        previous = self.index['files']
+        files = {}
+        added, changed, touched, drifted, invalid = [], [], [], [], []
+
+        for name, entry in walk_files(self.session_path):
+            old = previous.get(name)
+            try:
+                st = entry.stat(follow_symlinks=False)
+                record = {'size': st.st_size, 'mtime': st.st_mtime}
+                unchanged = old is not None and old['size'] == st.st_size and old['mtime'] == st.st_mtime
+                if unchanged and not verify:
+                    record['hash'] = old['hash']
+                    record['valid'] = old['valid']
+                else:
+                    record['hash'] = file_hash(entry.path)
+                    record['valid'] = json_is_valid(entry.path) if name.endswith('.json') else True
+            except OSError:
+                continue  # Deleted while scanning: reported as removed
+
+            if old is None:
+                added.append(name)
+            elif record['hash'] != old['hash']:
+                # An unchanged size and mtime only gets here under --verify:
+                # corruption or a restored backup
+                (drifted if unchanged else changed).append(name)
+            elif not unchanged:
+                touched.append(name)
+            if not record['valid']:
+                invalid.append(name)
+            files[name] = record
+
+        removed = [name for name in previous if name not in files]
+        self.index['files'] = files
+
+        total_bytes = sum(record['size'] for record in files.values())
+        history = self.index['history']
+        history.append([now, total_bytes, len(files)])
+        del history[:-HISTORY_SCANS]
+
+        mtimes = [record['mtime'] for record in files.values()]
+        creds = files.get('creds.json')
+        return {
+            'file_count': len(files),
+            'total_bytes': total_bytes,
+            'growth_bytes_per_day': self.growth_rate(),
+            'newest_age_seconds': round(now - max(mtimes)) if mtimes else None,
+            'oldest_age_seconds': round(now - min(mtimes)) if mtimes else None,
+            'creds_age_seconds': round(now - creds['mtime']) if creds else None,
+            'stale_files': sum(1 for mtime in mtimes if now - mtime > STALE_KEY_AGE),
+            'added': added,
+            'removed': removed,
+            'changed': changed,
+            'touched': touched,
+            'drifted': drifted,
+            'invalid_json': invalid,
+        }
+
+    def growth_rate(self):
+        """Bytes per day between the oldest and newest recorded scans"""
+        history = self.index['history']
+        if len(history) < 2 or history[-1][0] - history[0][0] < GROWTH_MIN_SPAN:
+            return None
+        (start, start_bytes, _), (end, end_bytes, _) = history[0], history[-1]
+        return round((end_bytes - start_bytes) * 86400 / (end - start))
+
+def format_age(seconds):
+    if seconds is None:
+        return 'n/a'
+    for unit, size in (('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size:
+            return f"{seconds / size:.1f}{unit}"
+    return f"{seconds}s"
+
+def main():
+    parser = argparse.ArgumentParser(description="WhatsApp session directory index")
+    parser.add_argument('--path', default=SESSION_PATH, help="session directory (default: %(default)s)")
+    parser.add_argument('--index', default=INDEX_PATH, help="index file (default: %(default)s)")
+    parser.add_argument('--verify', action='store_true',
+                        help="rehash every file to detect content changes with an unchanged mtime")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.path):
+        raise SystemExit(f"Error: {args.path} is not a directory")
+
+    index = SessionIndex(args.path, args.index)
+    start = time.monotonic()
+    report = index.scan(verify=args.verify)
+    elapsed = time.monotonic() - start
+    index.save()
+
+    growth = report['growth_bytes_per_day']
+    print(f"Session: {args.path}")
+    print(f"  Files: {report['file_count']} ({report['total_bytes'] / 1024:.1f} KB), scanned in {elapsed * 1000:.0f} ms")
+    print(f"  Growth: {'n/a' if growth is None else f'{growth / 1024:+.1f} KB/day'}")
+    print(f"  Last write: {format_age(report['newest_age_seconds'])} ago, "
+          f"creds.json: {format_age(report['creds_age_seconds'])} ago")
+    print(f"  Stale files (>{STALE_KEY_AGE // 86400}d): {report['stale_files']}")
+    print(f"  Since last scan: {len(report['added'])} added, {len(report['removed'])} removed, "
+          f"{len(report['changed'])} changed, {len(report['touched'])} touched")
+    print(f"  Checksum drift: {len(report['drifted'])} {'✗' if report['drifted'] else '✓'}"
+          + ("" if args.verify else " (run with --verify to rehash unchanged files)"))
+    print(f"  Invalid JSON: {len(report['invalid_json'])} {'✗' if report['invalid_json'] else '✓'}")
+    for name in sorted(set(report['drifted'] + report['invalid_json']))[:10]:
+        print(f"    {name}")
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,43 @@ module.exports = {
       NODE_ENV: 'production',
       HOME: '/home/codespace'
     }
+  }, {
+    name: 'openclaw-feed-poller',
+    script: '/workspaces/OpenClaw/skills/common/feed_poller.py',
+    interpreter: 'python3',
+    instances: 1,
+    autorestart: true,
+    watch: false,
+    max_memory_restart: '256M',
+    env: {
+      HOME: '/home/codespace',
+      OPENCLAW_FEED_POLLER_PORT: '8765'
+    }
+  }, {
+    name: 'openclaw-skill-workers',
+    script: '/workspaces/OpenClaw/skills/common/skill_workers.py',
+    args: 'serve',
+    interpreter: 'python3',
+    instances: 1,
+    autorestart: true,
+    watch: false,
+    max_memory_restart: '256M',
+    env: {
+      HOME: '/home/codespace',
+      OPENCLAW_SKILL_WORKERS: '2'
+    }
+  }, {
+    name: 'openclaw-weather-monitor',
+    script: '/workspaces/OpenClaw/skills/common/weather_monitor.py',
+    interpreter: 'python3',
+    instances: 1,
+    autorestart: true,
+    watch: false,
+    max_memory_restart: '128M',
+    env: {
+      HOME: '/home/codespace',
+      OPENCLAW_WEATHER_POLL_INTERVAL: '15'
+    }
   }],
   deploy: {
     production: {
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Persistent article store with cross-feed deduplication
+Keeps every article fetched by the news skills in SQLite, indexed by a hash
+of its normalized link/GUID and by title shingles, so the same story seen
+in several feeds is stored and returned once with all of its sources.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import urllib.parse
+import uuid
+import zlib
+
+DEFAULT_DB_PATH = os.environ.get(
+    'OPENCLAW_ARTICLE_DB',
+    os.path.expanduser('~/.openclaw/news/articles.db')
+)
+
+# Jaccard similarity of title shingles above which two articles are the same story
+NEAR_DUPLICATE_THRESHOLD = 0.5
+# Titles with fewer shingles than this are too short to compare reliably
+MIN_SHINGLES = 3
+
+TRACKING_PARAM_RE = re.compile(r'^(utm_\w+|fbclid|gclid|ref|cmpid)$', re.IGNORECASE)
+# Latin words and digits, or single CJK ideographs / kana / hangul
+TOKEN_RE = re.compile(r'[0-9a-z]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    pub_date TEXT,
+    link TEXT,
+    shingle_count INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_keys (
+    key TEXT PRIMARY KEY,
+    article_id INTEGER NOT NULL REFERENCES articles(id)
+);
+CREATE TABLE IF NOT EXISTS article_sources (
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    source TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (article_id, source)
+);
+CREATE TABLE IF NOT EXISTS title_shingles (
+    shingle INTEGER NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    PRIMARY KEY (shingle, article_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def normalize_link(link):
+    """Canonical form of an article URL for identity comparison"""
+    parts = urllib.parse.urlsplit(link.strip())
+    if not parts.netloc:
+        return link.strip()
+    query = urllib.parse.urlencode([
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAM_RE.match(k)
+    ])
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    # http and https copies of a page are the same article
+    return urllib.parse.urlunsplit(('', host, parts.path.rstrip('/'), query, ''))
+
+
+def identity_keys(item):
+    """Hash keys identifying an item by its normalized link and GUID"""
+    keys = set()
+    for value in (item.get('link'), item.get('guid')):
+        if value:
+            keys.add(hashlib.sha1(normalize_link(value).encode('utf-8')).hexdigest())
+    return keys
+
+
+def title_shingles(title):
+    """Set of hashed token bigrams of a title"""
+    tokens = TOKEN_RE.findall((title or '').lower())
+    if len(tokens) < 2:
+        return set(zlib.crc32(t.encode('utf-8')) for t in tokens)
+    return set(
+        zlib.crc32(f'{a} {b}'.encode('utf-8'))
+        for a, b in zip(tokens, tokens[1:])
+    )
+
+
+class ArticleStore:
+    """SQLite-backed article store with link/GUID and title-shingle indexes"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Callers sharing a store across threads serialise access themselves
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        # Random id telling this database apart from one recreated at the same path
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('store_id', ?)",
+                              (uuid.uuid4().hex,))
+        self.store_id = self.conn.execute(
+            "SELECT value FROM store_meta WHERE key = 'store_id'"
+        ).fetchone()[0]
+
+    def close(self):
+        """Close the underlying database"""
+        self.conn.close()
+
+    def _find_by_keys(self, keys):
+        """Article id matching any identity key, or None"""
+        for key in keys:
+            row = self.conn.execute(
+                'SELECT article_id FROM article_keys WHERE key = ?', (key,)
+            ).fetchone()
+            if row:
+                return row[0]
+        return None
+
+    def _find_near_duplicate(self, shingles):
+        """Article id whose title shingles overlap enough with `shingles`, or None"""
+        if len(shingles) < MIN_SHINGLES:
+            return None
+
+        placeholders = ','.join('?' * len(shingles))
+        rows = self.conn.execute(
+            f'SELECT s.article_id, COUNT(*) AS shared, a.shingle_count '
+            f'FROM title_shingles s JOIN articles a ON a.id = s.article_id '
+            f'WHERE s.shingle IN ({placeholders}) '
+            f'GROUP BY s.article_id ORDER BY shared DESC LIMIT 5',
+            tuple(shingles)
+        ).fetchall()
+
+        for article_id, shared, count in rows:
+            union = len(shingles) + count - shared
+            if union and shared / union >= NEAR_DUPLICATE_THRESHOLD:
+                return article_id
+        return None
+
+    def add(self, source, item, now=None):
+        """
+        Store an item seen in `source`
+
+        Returns (article_id, is_new) where is_new is False when the item was
+        already stored, either from this source or as a duplicate in another.
+        """
+        now = now or time.time()
+        keys = identity_keys(item)
+        shingles = title_shingles(item.get('title'))
+
+        with self.conn:
+            article_id = self._find_by_keys(keys)
+            if article_id is None:
+                article_id = self._find_near_duplicate(shingles)
+
+            is_new = article_id is None
+            if is_new:
+                article_id = self.conn.execute(
+                    'INSERT INTO articles (title, description, pub_date, link, '
+                    'shingle_count, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (item.get('title') or 'No Title', item.get('description'),
+                     item.get('pub_date'), item.get('link'), len(shingles), now, now)
+                ).lastrowid
+                self.conn.executemany(
+                    'INSERT OR IGNORE INTO title_shingles (shingle, article_id) VALUES (?, ?)',
+                    [(shingle, article_id) for shingle in shingles]
+                )
+            else:
+                self.conn.execute(
+                    'UPDATE articles SET last_seen = ? WHERE id = ?', (now, article_id)
+                )
+
+            # Keys of a near-duplicate are indexed too so the next lookup is exact
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO article_keys (key, article_id) VALUES (?, ?)',
+                [(key, article_id) for key in keys]
+            )
+            self.conn.execute(
+                'INSERT OR IGNORE INTO article_sources (article_id, source, first_seen) '
+                'VALUES (?, ?, ?)',
+                (article_id, source, now)
+            )
+
+        return article_id, is_new
+
+    def sources(self, article_id):
+        """Every source an article has appeared in, in order of first sighting"""
+        rows = self.conn.execute(
+            'SELECT source FROM article_sources WHERE article_id = ? ORDER BY first_seen, rowid',
+            (article_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get(self, article_id):
+        """Stored article as a skill result entry, with its sources"""
+        row = self.conn.execute(
+            'SELECT id, title, description, pub_date, link, first_seen FROM articles WHERE id = ?',
+            (article_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'] or '',
+            'pub_date': row['pub_date'] or '',
+            'link': row['link'] or '',
+            'first_seen': row['first_seen'],
+            'sources': self.sources(row['id']),
+        }
+
+    def add_results(self, results, only_new=False):
+        """
+        Store a skill result dict (source -> items) and return its articles
+        deduplicated across sources, each once, in first-seen order
+
+        Error entries are skipped. With `only_new`, articles stored by an
+        earlier call are left out.
+        """
+        # dict as an insertion-ordered set of article ids
+        ordered = {}
+        new_ids = set()
+        for source, items in results.items():
+            for item in items:
+                if 'error' in item:
+                    continue
+                article_id, is_new = self.add(source, item)
+                if is_new:
+                    new_ids.add(article_id)
+                ordered.setdefault(article_id)
+
+        articles = []
+        for article_id in ordered:
+            if only_new and article_id not in new_ids:
+                continue
+            article = self.get(article_id)
+            article['new'] = article_id in new_ids
+            articles.append(article)
+        return articles
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+On-disk conditional-GET cache for RSS feeds
+Stores the ETag, Last-Modified and parsed items of each feed, keyed by URL,
+so unchanged feeds can be revalidated with a 304 instead of re-downloaded
+and re-parsed, and fresh entries skip the network entirely.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'OPENCLAW_FEED_CACHE_DIR',
+    os.path.expanduser('~/.openclaw/cache/feeds')
+)
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_TTL = 60
+
+
+class FeedCache:
+    """URL-keyed response cache with a size cap and LRU eviction"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        """Path of the cache entry for a URL"""
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.json')
+
+    def get(self, url):
+        """Return the cached entry for a URL, or None, marking it recently used"""
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('url') != url:
+            return None
+
+        try:
+            # The file mtime doubles as the LRU clock
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    @staticmethod
+    def is_fresh(entry, ttl):
+        """Whether an entry was validated less than `ttl` seconds ago"""
+        return time.time() - entry.get('validated_at', 0) < ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Request headers that revalidate a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url, items, limit, etag=None, last_modified=None):
+        """Store freshly parsed items along with their validators"""
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'limit': limit,
+            'items': items,
+            'validated_at': time.time(),
+        }
+        self._write(url, entry)
+        self._evict()
+        return entry
+
+    def revalidated(self, url, entry):
+        """Record that the server confirmed an entry is unchanged (304)"""
+        entry['validated_at'] = time.time()
+        self._write(url, entry)
+        return entry
+
+    def _write(self, url, entry):
+        """Atomically replace the entry file for a URL"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, self._path(url))
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size cap"""
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.cache_dir) as it:
+                for dirent in it:
+                    if not dirent.name.endswith('.json'):
+                        continue
+                    try:
+                        st = dirent.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, dirent.path))
+                    total += st.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Remove every cache entry"""
+        with os.scandir(self.cache_dir) as it:
+            for dirent in it:
+                if dirent.name.endswith('.json'):
+                    try:
+                        os.unlink(dirent.path)
+                    except OSError:
+                        pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Shared cache instance used by the skills, created on first use"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = FeedCache()
+        return _default_cache
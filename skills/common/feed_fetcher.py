@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Concurrent RSS feed fetch engine shared by the news skills
+Fetches every source in a batch at once on a bounded worker pool so the
+total latency of a batch is roughly that of its slowest feed.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from feed_cache import DEFAULT_TTL, FeedCache, get_default_cache
+from feed_health import resolve_health
+from feed_parser import parse_feed
+from http_pool import HTTPStatusError, get_default_pool
+from tracing import span
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (compatible; OpenClaw News Skill)'
+
+# Per-source deadline covers connect, transfer and parse of a single feed
+DEFAULT_SOURCE_TIMEOUT = 10
+# Global deadline for a whole batch, whatever the number of sources
+DEFAULT_TOTAL_TIMEOUT = 15
+DEFAULT_MAX_WORKERS = 16
+
+READ_CHUNK_SIZE = 16 * 1024
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a source does not finish before its deadline"""
+
+
+def iter_chunks(response, deadline):
+    """Yield a response body in chunks, giving up once the deadline passes"""
+    while True:
+        if time.monotonic() > deadline:
+            raise DeadlineExceeded('source deadline exceeded while reading feed')
+        with span('transfer'):
+            chunk = response.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def take_until(items, stop):
+    """Items before the first one matching `stop`"""
+    if stop is None:
+        return items
+    for i, item in enumerate(items):
+        if stop(item):
+            return items[:i]
+    return items
+
+
+def fetch_feed(rss_url, limit=5, user_agent=DEFAULT_USER_AGENT,
+               timeout=DEFAULT_SOURCE_TIMEOUT, cache=None, ttl=DEFAULT_TTL,
+               stop=None, health=None):
+    """
+    Fetch and parse one RSS feed, returning its top items or an error entry
+
+    With a `cache`, an entry validated less than `ttl` seconds ago is served
+    without touching the network, and an older one is revalidated with a
+    conditional GET so a 304 reuses the cached items.
+
+    `stop` is an optional predicate marking the first already-seen item;
+    items from there on are dropped and parsing ends as soon as it matches.
+
+    Every network fetch is recorded in `health` (None = shared default,
+    False = off); a quarantined source returns an error entry at once.
+    """
+    with span('source', url=rss_url) as source_span:
+        items = _fetch_feed(rss_url, limit, user_agent, timeout, cache, ttl, stop, health)
+        if len(items) == 1 and 'error' in items[0]:
+            source_span.set(error=items[0]['error'])
+        return items
+
+
+def _fetch_feed(rss_url, limit, user_agent, timeout, cache, ttl, stop, health):
+    health = resolve_health(health)
+    if health is not None and health.quarantined(rss_url):
+        return [health.quarantine_error(rss_url)]
+    start = time.monotonic()
+    deadline = start + timeout
+    try:
+        with span('cache'):
+            entry = cache.get(rss_url) if cache else None
+        # Cached items are only reusable if enough of them were kept
+        if entry is not None and entry.get('limit', 0) < limit:
+            entry = None
+        if entry is not None and FeedCache.is_fresh(entry, ttl):
+            return take_until(entry['items'][:limit], stop)
+
+        headers = {
+            'User-Agent': user_agent
+        }
+        if entry is not None:
+            headers.update(FeedCache.conditional_headers(entry))
+
+        # Pooled keep-alive connection with transparent gzip/deflate
+        with get_default_pool().get(rss_url, headers=headers, timeout=timeout) as response:
+            if response.status == 304 and entry is not None:
+                if health is not None:
+                    health.record_success(rss_url, time.monotonic() - start, response.wire_bytes)
+                with span('cache'):
+                    entry = cache.revalidated(rss_url, entry)
+                return take_until(entry['items'][:limit], stop)
+            if not 200 <= response.status < 300:
+                raise HTTPStatusError(response.status, response.reason, rss_url)
+
+            # Parse while downloading and stop reading after `limit` items
+            with span('parse') as parse_span:
+                items = parse_feed(iter_chunks(response, deadline), limit, stop=stop)
+                parse_span.set(items=len(items), bytes=response.wire_bytes)
+            etag = response.getheader('ETag')
+            last_modified = response.getheader('Last-Modified')
+        if health is not None:
+            health.record_success(rss_url, time.monotonic() - start, response.wire_bytes, items)
+
+        # A list cut short by `stop` is not a complete top-N and isn't cached
+        if cache and stop is None:
+            with span('cache'):
+                cache.put(rss_url, items, limit, etag=etag, last_modified=last_modified)
+        return items
+    except Exception as e:
+        if health is not None:
+            health.record_failure(rss_url, time.monotonic() - start, e)
+        return [{'error': str(e)}]
+
+
+def resolve_cache(cache):
+    """Map a `cache` argument (None = shared default, False = off) to a cache or None"""
+    if cache is False:
+        return None
+    if cache is None:
+        try:
+            return get_default_cache()
+        except OSError:
+            # An unwritable cache directory must not break the skills
+            return None
+    return cache
+
+
+def fetch_all(sources, limit=5, user_agent=DEFAULT_USER_AGENT,
+              source_timeout=DEFAULT_SOURCE_TIMEOUT,
+              total_timeout=DEFAULT_TOTAL_TIMEOUT,
+              max_workers=DEFAULT_MAX_WORKERS, cache=None, ttl=DEFAULT_TTL,
+              stops=None, health=None):
+    """
+    Fetch every source concurrently
+
+    `sources` maps a source name to its feed URL. The result maps each name
+    to its items, or to a single error entry if the source failed or missed
+    the global deadline, so callers always get partial results.
+
+    `cache` defaults to the shared on-disk feed cache; pass False to always
+    hit the network. `ttl` is either one freshness TTL in seconds for every
+    source or a dict of per-source TTLs keyed by source name. `stops`
+    optionally maps source names to a fetch_feed `stop` predicate.
+    `health` is passed to fetch_feed for every source.
+    """
+    if not sources:
+        return {}
+
+    cache = resolve_cache(cache)
+    if isinstance(ttl, dict):
+        ttls = {name: ttl.get(name, DEFAULT_TTL) for name in sources}
+    else:
+        ttls = {name: ttl for name in sources}
+    stops = stops or {}
+    health = resolve_health(health)
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_workers, len(sources)),
+        thread_name_prefix='feed-fetch'
+    )
+    try:
+        futures = {
+            name: executor.submit(
+                fetch_feed, url, limit, user_agent, source_timeout, cache, ttls[name],
+                stops.get(name), health
+            )
+            for name, url in sources.items()
+        }
+        with span('wait', sources=len(sources)):
+            wait(futures.values(), timeout=total_timeout)
+
+        results = {}
+        for name, future in futures.items():
+            if future.done():
+                results[name] = future.result()
+            else:
+                future.cancel()
+                results[name] = [{'error': f'global deadline of {total_timeout}s exceeded'}]
+        return results
+    finally:
+        # Don't block on stragglers; they are bounded by their own deadline
+        executor.shutdown(wait=False, cancel_futures=True)
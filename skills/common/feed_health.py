@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Per-source feed health records
+Tracks latency, error rate, consecutive failures, bytes fetched and the
+publishing cadence of every feed URL. Sources that keep failing are
+quarantined with exponential backoff so a dead feed answers instantly
+instead of costing a timeout, and each source's refresh interval follows
+how often it actually publishes.
+
+    python3 feed_health.py                 # health of every known source
+    python3 feed_health.py --reset <url>   # lift a quarantine
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from news_index import parse_pub_date
+
+DEFAULT_HEALTH_PATH = os.environ.get(
+    'OPENCLAW_FEED_HEALTH',
+    os.path.expanduser('~/.openclaw/cache/feed_health.json')
+)
+# Weight of the newest sample in the latency, error rate and cadence averages
+EWMA_ALPHA = 0.2
+# Consecutive failures before a source is quarantined, then re-checked after
+# QUARANTINE_BASE seconds, doubling on every further failure
+QUARANTINE_AFTER = 3
+QUARANTINE_BASE = 300
+QUARANTINE_MAX = 6 * 3600
+# Adaptive refresh interval: this fraction of the mean gap between items,
+# kept within MIN_INTERVAL and MAX_INTERVAL
+CADENCE_FRACTION = 0.5
+MIN_INTERVAL = 60
+MAX_INTERVAL = 3600
+# Successful fetches are written to disk at most this often; failures at once
+SAVE_INTERVAL = 30
+# Long-running processes look for resets made by `--reset` at most this often
+RESET_CHECK_INTERVAL = 5
+# Reset tombstones are dropped from the file after this many seconds
+RESET_RETENTION = 7 * 86400
+# Key of a reset that covers every URL
+ALL_SOURCES = '*'
+
+
+def new_record():
+    return {
+        'latency_ms': None,
+        'error_rate': 0.0,
+        'consecutive_failures': 0,
+        'successes': 0,
+        'failures': 0,
+        'bytes': 0,
+        'cadence_seconds': None,
+        'last_success': None,
+        'last_error': None,
+        'checked_at': None,
+        'quarantined_until': None,
+    }
+
+
+def ewma(previous, sample, alpha=EWMA_ALPHA):
+    return sample if previous is None else previous + alpha * (sample - previous)
+
+
+def publishing_gap(items):
+    """Mean seconds between consecutive items by pubDate, or None"""
+    timestamps = sorted(ts for ts in (parse_pub_date(item.get('pub_date')) for item in items) if ts is not None)
+    if len(timestamps) < 2 or timestamps[-1] <= timestamps[0]:
+        return None
+    return (timestamps[-1] - timestamps[0]) / (len(timestamps) - 1)
+
+
+def read_health_file(path):
+    """(records, resets) stored in a health file; empty if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, {}
+    if 'records' not in data:
+        # Files written before resets were recorded hold the records alone
+        return data, {}
+    return data['records'], data.get('resets', {})
+
+
+class FeedHealth:
+    """
+    URL-keyed health records, persisted as one JSON file
+
+    A reset leaves a tombstone (URL or ALL_SOURCES -> time of the reset) in
+    the file. Every process drops its records checked before a tombstone,
+    so a reset reaches a running poller instead of being written back by
+    its next save.
+    """
+
+    def __init__(self, path=DEFAULT_HEALTH_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._saved_at = 0
+        self._resets_checked = time.monotonic()
+        self._file_mtime = self._mtime()
+        # Bumped whenever a reset drops records, so a scheduler can re-plan
+        self.reset_generation = 0
+        self.records, self.resets = read_health_file(path)
+        self._apply_resets()
+
+    def get(self, url):
+        """Copy of the record of a URL, or None if it was never fetched"""
+        with self._lock:
+            record = self.records.get(url)
+            return dict(record) if record else None
+
+    def quarantined(self, url, now=None):
+        """Seconds left in a URL's quarantine, or 0"""
+        record = self.records.get(url)
+        until = record and record['quarantined_until']
+        if until and self.check_resets():
+            record = self.records.get(url)
+            until = record and record['quarantined_until']
+        if not until:
+            return 0
+        return max(until - (now or time.time()), 0)
+
+    def quarantine_error(self, url):
+        """Error entry returned instead of fetching a quarantined URL"""
+        record = self.records[url]
+        until = datetime.fromtimestamp(record['quarantined_until']).isoformat(timespec='seconds')
+        return {'error': f"quarantined until {until} after {record['consecutive_failures']} "
+                         f"failures: {record['last_error']}"}
+
+    def record_success(self, url, seconds, wire_bytes, items=None):
+        """A fetch that returned items, or None for a 304"""
+        now = time.time()
+        with self._lock:
+            record = self.records.setdefault(url, new_record())
+            record['latency_ms'] = round(ewma(record['latency_ms'], seconds * 1000), 1)
+            record['error_rate'] = round(ewma(record['error_rate'], 0.0), 4)
+            record['consecutive_failures'] = 0
+            record['quarantined_until'] = None
+            record['successes'] += 1
+            record['bytes'] += wire_bytes
+            record['last_success'] = record['checked_at'] = now
+            gap = publishing_gap(items) if items else None
+            if gap is not None:
+                record['cadence_seconds'] = round(ewma(record['cadence_seconds'], gap))
+        self._save(force=False)
+
+    def record_failure(self, url, seconds, error):
+        now = time.time()
+        with self._lock:
+            record = self.records.setdefault(url, new_record())
+            record['latency_ms'] = round(ewma(record['latency_ms'], seconds * 1000), 1)
+            record['error_rate'] = round(ewma(record['error_rate'], 1.0), 4)
+            record['consecutive_failures'] += 1
+            record['failures'] += 1
+            record['last_error'] = str(error)
+            record['checked_at'] = now
+            excess = record['consecutive_failures'] - QUARANTINE_AFTER
+            if excess >= 0:
+                backoff = min(QUARANTINE_BASE * 2 ** min(excess, 16), QUARANTINE_MAX)
+                record['quarantined_until'] = now + backoff
+        self._save(force=True)
+
+    def interval(self, url, default):
+        """
+        Refresh interval of a URL: a fraction of its publishing cadence once
+        known, else `default`; never earlier than the end of a quarantine
+        """
+        record = self.records.get(url)
+        if record is None:
+            return default
+        interval = default
+        if record['cadence_seconds']:
+            interval = min(max(record['cadence_seconds'] * CADENCE_FRACTION, MIN_INTERVAL), MAX_INTERVAL)
+        return max(interval, self.quarantined(url))
+
+    def reset(self, url=None):
+        """Forget the records of one URL, or of every URL, in every process sharing the file"""
+        with self._lock:
+            self.resets[url or ALL_SOURCES] = time.time()
+            self._apply_resets()
+        self._save(force=True)
+
+    def check_resets(self):
+        """
+        Pick up resets another process wrote to the file since the last
+        check (at most every RESET_CHECK_INTERVAL seconds); True if any
+        record was dropped
+        """
+        now = time.monotonic()
+        if now - self._resets_checked < RESET_CHECK_INTERVAL:
+            return False
+        self._resets_checked = now
+        mtime = self._mtime()
+        if mtime is None or mtime == self._file_mtime:
+            return False
+        self._file_mtime = mtime
+        _, resets = read_health_file(self.path)
+        with self._lock:
+            self._merge_resets(resets)
+            return self._apply_resets()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _merge_resets(self, resets):
+        for key, reset_at in resets.items():
+            if reset_at > self.resets.get(key, 0):
+                self.resets[key] = reset_at
+
+    def _apply_resets(self):
+        """Drop the records checked before a reset of their URL; True if any was dropped"""
+        if not self.resets:
+            return False
+        reset_all = self.resets.get(ALL_SOURCES, 0)
+        stale = [url for url, record in self.records.items()
+                 if (record.get('checked_at') or 0) <= max(reset_all, self.resets.get(url, 0))]
+        for url in stale:
+            del self.records[url]
+        if stale:
+            self.reset_generation += 1
+        return bool(stale)
+
+    def _save(self, force):
+        """
+        Atomically write the records, merged with the file as it is now:
+        the poller and skill processes share it, for each URL the most
+        recently checked record wins, and resets from either side apply
+        """
+        now = time.monotonic()
+        if not force and now - self._saved_at < SAVE_INTERVAL:
+            return
+        on_disk, disk_resets = read_health_file(self.path)
+        with self._lock:
+            self._saved_at = now
+            self._merge_resets(disk_resets)
+            for url, record in on_disk.items():
+                mine = self.records.get(url)
+                if mine is None or (record.get('checked_at') or 0) > (mine['checked_at'] or 0):
+                    self.records[url] = record
+            self._apply_resets()
+            expired = time.time() - RESET_RETENTION
+            self.resets = {key: reset_at for key, reset_at in self.resets.items() if reset_at > expired}
+            payload = json.dumps({'records': self.records, 'resets': self.resets})
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+            # Our own write is not a reset to pick up
+            self._file_mtime = self._mtime()
+        except OSError:
+            pass
+
+    def flush(self):
+        self._save(force=True)
+
+
+_default_health = None
+_default_health_lock = threading.Lock()
+
+
+def get_default_health():
+    """Shared health records used by the skills, loaded on first use"""
+    global _default_health
+    with _default_health_lock:
+        if _default_health is None:
+            _default_health = FeedHealth()
+            # Successful fetches are saved lazily; keep them when a skill process exits
+            atexit.register(_default_health.flush)
+        return _default_health
+
+
+def resolve_health(health):
+    """Map a `health` argument (None = shared default, False = off) to a FeedHealth or None"""
+    if health is False:
+        return None
+    return get_default_health() if health is None else health
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return '-'
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f}h"
+    if seconds >= 60:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds:.0f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-source feed health")
+    parser.add_argument('--path', default=DEFAULT_HEALTH_PATH, help="health file (default: %(default)s)")
+    parser.add_argument('--json', action='store_true', help="print JSON")
+    parser.add_argument('--reset', nargs='?', const='', metavar='URL',
+                        help="forget one source (lifting its quarantine), or every source without a URL")
+    args = parser.parse_args()
+
+    health = FeedHealth(args.path)
+    if args.reset is not None:
+        if args.reset and args.reset not in health.records:
+            sys.exit(f"Error: no health record for {args.reset}")
+        health.reset(args.reset or None)
+        print(f"✓ Reset {args.reset or 'every source'}")
+        return
+
+    if args.json:
+        print(json.dumps(health.records, indent=2))
+        return
+
+    from feed_poller import load_feed_groups, source_interval
+    sources = {}
+    for group, spec in load_feed_groups().items():
+        for source, url in spec['sources'].items():
+            sources[url] = (source, spec)
+
+    print(f"{'Source':40} {'Status':12} {'Latency':>8} {'Errors':>7} {'Fails':>5} {'MB':>7} {'Cadence':>8} {'Interval':>8}")
+    for url, record in sorted(health.records.items(), key=lambda kv: -kv[1]['error_rate']):
+        source, spec = sources.get(url, (url, None))
+        interval = source_interval(spec, source, health) if spec else None
+        remaining = health.quarantined(url)
+        status = f"✗ {format_duration(remaining)}" if remaining else "✓ ok"
+        latency = f"{record['latency_ms']:.0f}ms" if record['latency_ms'] is not None else '-'
+        label = source if len(source) <= 40 else '...' + source[-37:]
+        print(f"{label:40} {status:12} {latency:>8} {record['error_rate']:>7.0%} "
+              f"{record['consecutive_failures']:>5} {record['bytes'] / 1e6:>7.2f} "
+              f"{format_duration(record['cadence_seconds']):>8} {format_duration(interval):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Streaming RSS/Atom parser shared by the news skills
+Feeds the response to an XMLPullParser chunk by chunk and stops as soon as
+the requested number of items has been read, clearing each item once it
+is consumed, so cost grows with the items requested rather than feed size.
+"""
+
+import re
+from xml.etree import ElementTree as ET
+
+from tracing import span
+
+TAG_RE = re.compile('<[^<]+?>')
+
+DESCRIPTION_MAX_LENGTH = 200
+
+# Local tag names of the elements holding one article (RSS, RDF and Atom)
+ITEM_TAGS = frozenset(('item', 'entry'))
+
+# Item fields in order of preference; the first one present wins
+FIELD_TAGS = {
+    'title': ('title',),
+    'description': ('description', 'summary', 'content', 'encoded'),
+    'pub_date': ('pubDate', 'published', 'updated', 'date'),
+    'link': ('link',),
+    'guid': ('guid', 'id'),
+}
+_TAG_FIELDS = {}
+for _field, _tags in FIELD_TAGS.items():
+    for _rank, _tag in enumerate(_tags):
+        _TAG_FIELDS[_tag] = (_field, _rank)
+
+
+def local_name(tag):
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit('}', 1)[-1] if tag[0] == '{' else tag
+
+
+def clean_description(description, max_length=DESCRIPTION_MAX_LENGTH):
+    """Remove HTML tags and truncate a description"""
+    if not description:
+        return ''
+    description = TAG_RE.sub('', description)
+    return description[:max_length] + '...' if len(description) > max_length else description
+
+
+def _link_value(elem):
+    """Link of an item: RSS keeps it as text, Atom in the href attribute"""
+    href = elem.get('href')
+    if href is not None:
+        # Atom may list several links; only the alternate one is the article
+        if elem.get('rel', 'alternate') != 'alternate':
+            return None
+        return href
+    return elem.text
+
+
+def _build_item(fields):
+    """Turn the raw field values of an item into a skill result entry"""
+    with span('clean'):
+        description = clean_description(fields.get('description'))
+    item = {
+        'title': fields.get('title') or 'No Title',
+        'description': description,
+        'pub_date': fields.get('pub_date') or '',
+        'link': fields.get('link') or '',
+    }
+    item['guid'] = fields.get('guid') or item['link']
+    return item
+
+
+def parse_feed(chunks, limit, stop=None):
+    """
+    Parse the top `limit` items of an RSS or Atom feed
+
+    `chunks` is an iterable of raw bytes, typically read from the response
+    as it arrives; reading stops once enough items have been parsed. `stop`
+    is an optional predicate on a parsed item: when it returns True, parsing
+    ends before that item is included.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    items = []
+    if limit <= 0:
+        return items
+
+    stack = []
+    current = None
+    fields = ranks = None
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                if current is None and local_name(elem.tag) in ITEM_TAGS:
+                    current = elem
+                    fields, ranks = {}, {}
+                continue
+
+            stack.pop()
+            if current is None:
+                continue
+
+            if elem is current:
+                item = _build_item(fields)
+                current = None
+                # Detach the consumed item so the tree never grows
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+                if stop is not None and stop(item):
+                    return items
+                items.append(item)
+                if len(items) >= limit:
+                    return items
+            elif stack and stack[-1] is current:
+                field_rank = _TAG_FIELDS.get(local_name(elem.tag))
+                if field_rank is None:
+                    continue
+                field, rank = field_rank
+                value = _link_value(elem) if field == 'link' else elem.text
+                if value is not None and rank < ranks.get(field, len(FIELD_TAGS[field])):
+                    fields[field] = value.strip() if field != 'description' else value
+                    ranks[field] = rank
+
+    parser.close()
+    return items
+
+
+def parse_feed_bytes(content, limit, stop=None):
+    """Parse the top items of a feed that is already fully in memory"""
+    return parse_feed((content,), limit, stop=stop)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Background feed poller with an in-memory snapshot store
+Refreshes every source of every skill feed group on its own interval and
+serves the latest results over a local HTTP endpoint, so skill calls read
+a ready snapshot instead of fetching live while the user waits.
+"""
+
+import heapq
+import json
+import logging
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from article_store import ArticleStore
+from feed_fetcher import DEFAULT_USER_AGENT, fetch_all, fetch_feed, resolve_cache
+from feed_health import RESET_CHECK_INTERVAL, resolve_health
+from skill_registry import discover_skills, load_skill_module
+from tracing import span
+
+POLLER_HOST = os.environ.get('OPENCLAW_FEED_POLLER_HOST', '127.0.0.1')
+POLLER_PORT = int(os.environ.get('OPENCLAW_FEED_POLLER_PORT', '8765'))
+
+DEFAULT_INTERVAL = 300
+# A source is stale once its data is older than this many refresh intervals
+STALE_AFTER_INTERVALS = 2
+SNAPSHOT_READ_TIMEOUT = 0.5
+
+SKILLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SnapshotStore:
+    """Versioned in-memory store of the latest items of every source"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groups = {}
+        self.version = 0
+
+    def update(self, group, source, items, interval):
+        """Record a refresh result; failed refreshes keep the last good items"""
+        failed = len(items) == 1 and 'error' in items[0]
+        now = time.time()
+        with self._lock:
+            sources = self._groups.setdefault(group, {})
+            previous = sources.get(source)
+            if failed and previous and previous.get('updated_at'):
+                record = dict(previous, last_error=items[0]['error'], checked_at=now)
+            else:
+                record = {
+                    'items': items,
+                    'updated_at': None if failed else now,
+                    'checked_at': now,
+                    'interval': interval,
+                    'last_error': items[0]['error'] if failed else None,
+                }
+            sources[source] = record
+            self.version += 1
+
+    def snapshot(self, group):
+        """Copy of a group with per-source age and staleness, or None"""
+        now = time.time()
+        with self._lock:
+            sources = self._groups.get(group)
+            if sources is None:
+                return None
+            version = self.version
+            records = dict(sources)
+
+        result = {}
+        for source, record in records.items():
+            updated_at = record['updated_at']
+            age = now - updated_at if updated_at is not None else None
+            result[source] = {
+                'items': record['items'],
+                'updated_at': datetime.fromtimestamp(updated_at).isoformat() if updated_at else None,
+                'age_seconds': round(age, 1) if age is not None else None,
+                'stale': age is None or age > record['interval'] * STALE_AFTER_INTERVALS,
+                'last_error': record['last_error'],
+            }
+        return {'version': version, 'group': group, 'sources': result}
+
+
+class FeedPoller:
+    """Refreshes each source on its own interval into a SnapshotStore"""
+
+    def __init__(self, groups, store=None, max_workers=8, article_store=None):
+        self.groups = groups
+        self.store = store or SnapshotStore()
+        # Optional ArticleStore collecting every polled article for search
+        self.article_store = article_store
+        self._article_lock = threading.Lock()
+        self.running = True
+        self._wakeup = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='feed-poll')
+        self._cache = resolve_cache(None)
+        self._health = resolve_health(None)
+        self._reset_generation = self._health.reset_generation if self._health else 0
+        self.logger = logging.getLogger(__name__)
+
+        # Every source starts due immediately
+        self._schedule = []
+        for group, spec in groups.items():
+            for source in spec['sources']:
+                heapq.heappush(self._schedule, (0, group, source))
+
+    def _interval(self, group, source):
+        """Refresh interval of one source"""
+        return source_interval(self.groups[group], source, self._health)
+
+    def _refresh(self, group, source):
+        """Fetch one source and publish it to the store"""
+        spec = self.groups[group]
+        interval = self._interval(group, source)
+        # ttl=0 always revalidates, but a 304 still skips the download
+        items = fetch_feed(spec['sources'][source], spec.get('limit', 5),
+                           spec.get('user_agent', DEFAULT_USER_AGENT),
+                           cache=self._cache, ttl=0, health=self._health)
+        self.store.update(group, source, items, interval)
+        if len(items) == 1 and 'error' in items[0]:
+            self.logger.warning(f"Refresh of {group}/{source} failed: {items[0]['error']}")
+        elif self.article_store is not None:
+            with self._article_lock:
+                self.article_store.add_results({source: items})
+
+    def _reschedule_resets(self, now):
+        """Make the sources whose health was reset (feed_health.py --reset) due now"""
+        self._health.check_resets()
+        if self._health.reset_generation == self._reset_generation:
+            return
+        self._reset_generation = self._health.reset_generation
+        self._schedule = [
+            (min(due, now) if self._health.get(self.groups[group]['sources'][source]) is None else due,
+             group, source)
+            for due, group, source in self._schedule
+        ]
+        heapq.heapify(self._schedule)
+        self.logger.info("Feed health was reset; rescheduled the affected sources")
+
+    def run(self):
+        """Scheduling loop; runs until stop() is called"""
+        while self.running:
+            now = time.monotonic()
+            if self._health is not None:
+                self._reschedule_resets(now)
+            while self._schedule and self._schedule[0][0] <= now:
+                _, group, source = heapq.heappop(self._schedule)
+                self._executor.submit(self._refresh, group, source)
+                heapq.heappush(self._schedule,
+                               (now + self._interval(group, source), group, source))
+
+            delay = self._schedule[0][0] - now if self._schedule else 60
+            if self._health is not None:
+                # Wake up often enough to notice a reset of a quarantined source
+                delay = min(delay, RESET_CHECK_INTERVAL)
+            self._wakeup.wait(max(delay, 0.1))
+            self._wakeup.clear()
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self):
+        """Stop the scheduling loop"""
+        self.running = False
+        self._wakeup.set()
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    """Serves GET /snapshot/<group> and GET /health from the poller store"""
+
+    store = None
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'version': self.store.version})
+            return
+
+        prefix = '/snapshot/'
+        if self.path.startswith(prefix):
+            snapshot = self.store.snapshot(self.path[len(prefix):])
+            if snapshot is not None:
+                self._send_json(200, snapshot)
+                return
+
+        self._send_json(404, {'error': 'not found'})
+
+    def _send_json(self, status, payload):
+        with span('serialize'):
+            body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def read_snapshot(group, timeout=SNAPSHOT_READ_TIMEOUT):
+    """Fetch a group snapshot from a running poller, or None if unavailable"""
+    url = f'http://{POLLER_HOST}:{POLLER_PORT}/snapshot/{group}'
+    try:
+        with span('snapshot', group=group), urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except Exception:
+        return None
+
+
+def snapshot_items(snapshot, sources):
+    """
+    Map each source to its snapshot items, or None if any of `sources` has
+    not been polled yet so the caller can fall back to a live fetch
+    """
+    if not snapshot:
+        return None
+    records = snapshot['sources']
+    if any(name not in records for name in sources):
+        return None
+    return {name: records[name]['items'] for name in sources}
+
+
+def configured_interval(spec, source):
+    """Interval of a source as configured: its `intervals` entry, else the group `interval`"""
+    return spec.get('intervals', {}).get(source, spec.get('interval', DEFAULT_INTERVAL))
+
+
+def source_interval(spec, source, health=None):
+    """
+    Refresh interval of a source in a feed group spec
+
+    An interval listed in the spec's `intervals` is used as is; any other
+    source follows its observed publishing cadence once the feed health
+    records have one, else the group `interval`. A quarantined source is
+    not due before its quarantine ends.
+    """
+    health = resolve_health(health)
+    url = spec['sources'][source]
+    configured = spec.get('intervals', {}).get(source)
+    if configured is not None:
+        return max(configured, health.quarantined(url)) if health else configured
+    default = spec.get('interval', DEFAULT_INTERVAL)
+    return health.interval(url, default) if health else default
+
+
+def group_intervals(spec):
+    """
+    {source: configured interval} of a feed group, used as freshness TTLs
+
+    The adaptive intervals only pace the poller: a quiet feed polled hourly
+    must still be revalidated when fetched live after its configured TTL.
+    """
+    return {source: configured_interval(spec, source) for source in spec['sources']}
+
+
+def fetch_group(spec):
+    """Fetch every source of a feed group live, bypassing the poller"""
+    return fetch_all(spec['sources'], limit=spec.get('limit', 5),
+                     user_agent=spec.get('user_agent', DEFAULT_USER_AGENT),
+                     ttl=group_intervals(spec))
+
+
+def get_group_items(group, spec):
+    """Items of a feed group from the poller snapshot, else fetched live"""
+    items = snapshot_items(read_snapshot(group), spec['sources'])
+    if items is None:
+        items = fetch_group(spec)
+    return items
+
+
+def get_group_snapshot(group, spec):
+    """
+    Snapshot of a feed group with per-source staleness; when no poller is
+    running, the group is fetched live and reported with an age of zero
+    """
+    snapshot = read_snapshot(group)
+    if snapshot_items(snapshot, spec['sources']) is not None:
+        return snapshot
+
+    store = SnapshotStore()
+    intervals = group_intervals(spec)
+    for source, items in fetch_group(spec).items():
+        store.update(group, source, items, intervals[source])
+    snapshot = store.snapshot(group)
+    snapshot['version'] = None
+    return snapshot
+
+
+def load_feed_groups(skills_dir=SKILLS_DIR):
+    """Collect the FEED_GROUPS declared by every skills/*/*_skill.py module"""
+    groups = {}
+    # Only skills that declare feed groups are imported
+    for spec in discover_skills(skills_dir).values():
+        if spec.feed_groups:
+            groups.update(load_skill_module(spec).FEED_GROUPS)
+    return groups
+
+
+def main():
+    """Main entry point"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    logger = logging.getLogger(__name__)
+
+    groups = load_feed_groups()
+    try:
+        article_store = ArticleStore()
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Article store unavailable, polled news won't be searchable: {e}")
+        article_store = None
+    poller = FeedPoller(groups, article_store=article_store)
+
+    SnapshotHandler.store = poller.store
+    server = ThreadingHTTPServer((POLLER_HOST, POLLER_PORT), SnapshotHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def handle_signal(signum, frame):
+        logger.info("Received shutdown signal, stopping feed poller...")
+        poller.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    source_count = sum(len(spec['sources']) for spec in groups.values())
+    logger.info(f"Polling {source_count} sources in groups: {', '.join(groups)}")
+    logger.info(f"Serving snapshots at http://{POLLER_HOST}:{POLLER_PORT}/snapshot/<group>")
+
+    poller.run()
+    server.shutdown()
+    logger.info("Feed poller stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Per-host HTTP/1.1 keep-alive connection pool shared by the RSS skills
+Reuses TCP/TLS connections across the sources of a batch that live on the
+same host, and asks for gzip/deflate bodies that are decompressed as they
+stream in.
+"""
+
+import http.client
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+import zlib
+
+import tracing
+from tracing import span
+
+MAX_CONNECTIONS_PER_HOST = 6
+# Idle connections older than this are assumed closed by the server
+IDLE_TIMEOUT = 30
+MAX_REDIRECTS = 5
+# Unread body bytes worth draining to keep a connection reusable
+DRAIN_LIMIT = 256 * 1024
+READ_CHUNK_SIZE = 16 * 1024
+
+ACCEPT_ENCODING = 'gzip, deflate'
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# A reused connection may have been dropped by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class HTTPStatusError(Exception):
+    """Raised for responses that carry no usable body"""
+
+    def __init__(self, status, reason, url):
+        super().__init__(f'HTTP Error {status}: {reason}')
+        self.status = status
+        self.url = url
+
+
+class _Decoder:
+    """Streaming decoder for a Content-Encoding"""
+
+    def __init__(self, encoding):
+        self.encoding = (encoding or 'identity').strip().lower()
+        self._decompressor = None
+        if self.encoding in ('gzip', 'x-gzip'):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decode(self, data):
+        if self._decompressor is None:
+            if self.encoding != 'deflate':
+                return data
+            # Servers disagree on whether "deflate" carries a zlib header
+            wbits = zlib.MAX_WBITS if data[:1] == b'\x78' else -zlib.MAX_WBITS
+            self._decompressor = zlib.decompressobj(wbits)
+        return self._decompressor.decompress(data)
+
+    def flush(self):
+        return self._decompressor.flush() if self._decompressor is not None else b''
+
+
+class PooledResponse:
+    """Response whose connection goes back to the pool once the body is consumed"""
+
+    def __init__(self, pool, key, conn, response, url):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self._decoder = _Decoder(response.getheader('Content-Encoding'))
+        self._finished = False
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.url = url
+        # Compressed bytes received for the body, for accounting
+        self.wire_bytes = 0
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def read(self, size=READ_CHUNK_SIZE):
+        """Return the next decoded chunk of the body, b'' at the end"""
+        while not self._finished:
+            data = self._response.read(size)
+            if not data:
+                self._finished = True
+                return self._decoder.flush()
+            self.wire_bytes += len(data)
+            decoded = self._decoder.decode(data)
+            if decoded:
+                return decoded
+        return b''
+
+    def close(self):
+        """Release the connection, keeping it alive whenever possible"""
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+
+        if not self._finished:
+            # Stopped early: drain a small remainder rather than reconnect
+            remaining = self._response.length
+            if remaining is not None and remaining <= DRAIN_LIMIT:
+                try:
+                    self._response.read()
+                    self._finished = True
+                except (OSError, http.client.HTTPException):
+                    pass
+
+        if self._finished and not self._response.will_close:
+            self._pool._release(self._key, conn)
+        else:
+            self._response.close()
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _traced_create_connection(address, timeout, source_address=None, *args):
+    """socket.create_connection with the DNS lookup and TCP connect timed apart"""
+    host, port = address
+    with span('dns', host=host):
+        addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    with span('connect', host=host):
+        error = None
+        for family, sock_type, proto, _, sockaddr in addresses:
+            sock = socket.socket(family, sock_type, proto)
+            try:
+                sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sockaddr)
+                return sock
+            except OSError as e:
+                error = e
+                sock.close()
+        raise error or OSError(f'getaddrinfo returned no address for {host}')
+
+
+class _TracedHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection recording dns and connect spans; only used while tracing"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _traced_create_connection
+
+
+class _TracedHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS connection recording dns, connect and tls spans; only used while tracing"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _traced_create_connection
+
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        server_hostname = self._tunnel_host or self.host
+        with span('tls', host=server_hostname):
+            self.sock = self._context.wrap_socket(self.sock, server_hostname=server_hostname)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, pooled per (scheme, host, port)"""
+
+    def __init__(self, max_per_host=MAX_CONNECTIONS_PER_HOST, idle_timeout=IDLE_TIMEOUT):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+        self.stats = {'connections_opened': 0, 'connections_reused': 0}
+
+    def _new_connection(self, key, timeout):
+        scheme, host, port = key
+        with self._lock:
+            self.stats['connections_opened'] += 1
+        traced = tracing.enabled()
+        if scheme == 'https':
+            cls = _TracedHTTPSConnection if traced else http.client.HTTPSConnection
+            return cls(host, port, timeout=timeout, context=self._ssl_context)
+        cls = _TracedHTTPConnection if traced else http.client.HTTPConnection
+        return cls(host, port, timeout=timeout)
+
+    def _acquire(self, key, timeout):
+        """Idle connection for a host, or None"""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, released_at = idle.pop()
+                if now - released_at < self.idle_timeout:
+                    self.stats['connections_reused'] += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn
+                conn.close()
+        return None
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+    def _send(self, key, path, headers, timeout):
+        """Send one GET, retrying once on a fresh connection if a reused one was stale"""
+        for attempt in range(2):
+            conn = self._acquire(key, timeout) if attempt == 0 else None
+            reused = conn is not None
+            if conn is None:
+                conn = self._new_connection(key, timeout)
+            try:
+                # Includes connecting on a new connection, then waiting for the status line
+                with span('request', host=key[1], reused=reused):
+                    conn.request('GET', path, headers=headers)
+                    return conn, conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+
+    def get(self, url, headers=None, timeout=10, max_redirects=MAX_REDIRECTS):
+        """
+        GET a URL over a pooled connection, following redirects
+
+        The returned PooledResponse must be closed (or used as a context
+        manager) so that its connection can be reused.
+        """
+        request_headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        request_headers.update(headers or {})
+
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            scheme = parts.scheme.lower()
+            if scheme not in ('http', 'https'):
+                raise ValueError(f'unsupported URL scheme: {url}')
+            port = parts.port or (443 if scheme == 'https' else 80)
+            key = (scheme, parts.hostname, port)
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+
+            conn, response = self._send(key, path, request_headers, timeout)
+            pooled = PooledResponse(self, key, conn, response, url)
+
+            location = response.getheader('Location')
+            if response.status in REDIRECT_CODES and location:
+                pooled.close()
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return pooled
+
+        raise HTTPStatusError(response.status, 'too many redirects', url)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """Connection pool shared by every skill in the process"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool()
+        return _default_pool
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Incremental full-text index over collected news articles
+Positional inverted index over article titles and descriptions with
+CJK-aware tokenization, BM25 ranking, phrase queries and a time filter,
+kept in sync with the article store and persisted next to it.
+"""
+
+import heapq
+import math
+import os
+import pickle
+import re
+import time
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Latin words and digits, or runs of CJK ideographs / kana / hangul
+TOKEN_RE = re.compile(r'[0-9a-z]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+')
+CJK_RE = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]')
+QUERY_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+# Title tokens count this many times towards term frequency
+TITLE_WEIGHT = 2
+# Position gap between title and description so phrases never span both
+FIELD_GAP = 1000
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+INDEX_FORMAT_VERSION = 2
+
+
+def tokenize(text):
+    """
+    Split text into index terms
+
+    Latin text is split into lowercase words. CJK runs have no word
+    boundaries, so they are split into overlapping character bigrams
+    (a single character stays a unigram), which makes phrase queries over
+    Chinese text match on consecutive bigram positions.
+    """
+    tokens = []
+    for run in TOKEN_RE.findall((text or '').lower()):
+        if CJK_RE.match(run) and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def parse_pub_date(pub_date):
+    """Epoch seconds of an RSS (RFC 822) or Atom (ISO 8601) date, or None"""
+    if not pub_date:
+        return None
+    try:
+        parsed = parsedate_to_datetime(pub_date)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(pub_date.strip().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_query(query):
+    """Split a query into terms and "quoted phrases", each as a token list"""
+    clauses = []
+    for phrase, word in QUERY_RE.findall(query):
+        tokens = tokenize(phrase or word)
+        if not tokens:
+            continue
+        if phrase or len(tokens) > 1:
+            # Unquoted CJK words tokenize to several bigrams; keep them together
+            clauses.append(tuple(tokens))
+        else:
+            clauses.append((tokens[0],))
+    return clauses
+
+
+class NewsIndex:
+    """Positional inverted index with BM25 ranking"""
+
+    def __init__(self, store_id=None):
+        # ArticleStore.store_id of the database the doc ids come from
+        self.store_id = store_id
+        # term -> {doc_id: [positions]}
+        self.postings = {}
+        # term -> {doc_id: weighted term frequency}, precomputed for ranking
+        self.frequencies = {}
+        # doc_id -> (timestamp, weighted length)
+        self.docs = {}
+        self.total_length = 0
+        self.last_article_id = 0
+        # doc_id -> BM25 length normalisation, rebuilt when documents change
+        self._norms = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id, title, description, timestamp):
+        """Index one document; re-adding an id is ignored"""
+        if doc_id in self.docs:
+            return
+
+        title_tokens = tokenize(title)
+        description_tokens = tokenize(description)
+
+        for position, term in enumerate(title_tokens):
+            self.postings.setdefault(term, {}).setdefault(doc_id, []).append(position)
+            frequencies = self.frequencies.setdefault(term, {})
+            frequencies[doc_id] = frequencies.get(doc_id, 0) + TITLE_WEIGHT
+        for position, term in enumerate(description_tokens, FIELD_GAP):
+            self.postings.setdefault(term, {}).setdefault(doc_id, []).append(position)
+            frequencies = self.frequencies.setdefault(term, {})
+            frequencies[doc_id] = frequencies.get(doc_id, 0) + 1
+
+        length = len(title_tokens) * TITLE_WEIGHT + len(description_tokens)
+        self.docs[doc_id] = (timestamp, length)
+        self.total_length += length
+        self._norms = None
+
+    def sync(self, store):
+        """Index every article added to an ArticleStore since the last sync"""
+        rows = store.conn.execute(
+            'SELECT id, title, description, pub_date, first_seen FROM articles '
+            'WHERE id > ? ORDER BY id',
+            (self.last_article_id,)
+        ).fetchall()
+        for article_id, title, description, pub_date, first_seen in rows:
+            timestamp = parse_pub_date(pub_date) or first_seen
+            self.add(article_id, title, description, timestamp)
+            self.last_article_id = article_id
+        return len(rows)
+
+    def _phrase_frequencies(self, tokens):
+        """doc_id -> weighted frequency of a phrase of consecutive tokens"""
+        postings = [self.postings.get(token) for token in tokens]
+        if not all(postings):
+            return {}
+
+        # Intersect starting from the rarest token
+        candidates = set(min(postings, key=len))
+        for token_postings in postings:
+            candidates.intersection_update(token_postings)
+
+        frequencies = {}
+        for doc_id in candidates:
+            following = [set(p[doc_id]) for p in postings[1:]]
+            frequency = 0
+            for start in postings[0][doc_id]:
+                if all(start + offset in positions
+                       for offset, positions in enumerate(following, 1)):
+                    frequency += TITLE_WEIGHT if start < FIELD_GAP else 1
+            if frequency:
+                frequencies[doc_id] = frequency
+        return frequencies
+
+    def _length_norms(self):
+        """BM25 length normalisation of every document"""
+        if self._norms is None:
+            average_length = self.total_length / len(self.docs) or 1
+            self._norms = {
+                doc_id: BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                for doc_id, (_, length) in self.docs.items()
+            }
+        return self._norms
+
+    def search(self, query, since=None, until=None, limit=10):
+        """
+        Ranked search for words and "quoted phrases"
+
+        Documents matching any clause are scored with BM25, each phrase
+        counting as one term. `since`/`until` restrict results to articles
+        published within that epoch-seconds window.
+        Returns a list of (doc_id, score), best first.
+        """
+        clauses = parse_query(query)
+        if not clauses or not self.docs:
+            return []
+
+        doc_count = len(self.docs)
+        norms = self._length_norms()
+        filtered = since is not None or until is not None
+        docs = self.docs
+        scores = {}
+
+        for clause in clauses:
+            if len(clause) == 1:
+                frequencies = self.frequencies.get(clause[0], {})
+            else:
+                frequencies = self._phrase_frequencies(clause)
+            if not frequencies:
+                continue
+
+            idf = math.log(1 + (doc_count - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+            weight = idf * (BM25_K1 + 1)
+            for doc_id, frequency in frequencies.items():
+                if filtered:
+                    timestamp = docs[doc_id][0]
+                    if timestamp is None:
+                        continue
+                    if since is not None and timestamp < since:
+                        continue
+                    if until is not None and timestamp > until:
+                        continue
+                score = weight * frequency / (frequency + norms[doc_id])
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        return heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1])
+
+    def save(self, path):
+        """Persist the index atomically"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            state = dict(self.__dict__, _norms=None)
+            pickle.dump((INDEX_FORMAT_VERSION, state), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a persisted index, or an empty one if missing or outdated"""
+        index = cls()
+        try:
+            with open(path, 'rb') as f:
+                version, state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return index
+        if version == INDEX_FORMAT_VERSION:
+            index.__dict__.update(state)
+        return index
+
+
+def index_path_for(db_path):
+    """Location of the persisted index belonging to an article database"""
+    return os.path.splitext(db_path)[0] + '.idx'
+
+
+# Indexes of database files by path; in-memory databases are private to their store
+_loaded_indexes = {}
+_memory_indexes = weakref.WeakKeyDictionary()
+
+
+def get_synced_index(store):
+    """
+    Index of an article store, kept in memory between calls in the same
+    process and only tokenizing articles added since it was last saved
+
+    An index built from another database (one recreated at the same path
+    restarts its ids below `last_article_id`) is rebuilt from scratch.
+    """
+    persistent = store.db_path != ':memory:'
+    indexes, key = (_loaded_indexes, store.db_path) if persistent else (_memory_indexes, store)
+    index = indexes.get(key)
+    if index is None or index.store_id != store.store_id:
+        index = NewsIndex.load(index_path_for(store.db_path)) if persistent else NewsIndex()
+        if index.store_id != store.store_id:
+            index = NewsIndex(store.store_id)
+        indexes[key] = index
+    if index.sync(store) and persistent:
+        index.save(index_path_for(store.db_path))
+    return index
+
+
+def search_articles(store, query, since_hours=None, limit=10):
+    """Search the articles of a store, returning full article entries with scores"""
+    index = get_synced_index(store)
+    since = time.time() - since_hours * 3600 if since_hours else None
+
+    results = []
+    for article_id, score in index.search(query, since=since, limit=limit):
+        article = store.get(article_id)
+        if article is not None:
+            article['score'] = round(score, 3)
+            results.append(article)
+    return results
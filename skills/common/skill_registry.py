@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Skill registry
+Discovers the skills under skills/*/ from their source and markdown without
+importing them, imports each skill module on first use, and profiles how
+long every skill takes to import.
+
+    python3 skill_registry.py list              # skills, functions and commands
+    python3 skill_registry.py profile [skill]   # cold import time per skill
+"""
+
+import argparse
+import ast
+import glob
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+SKILLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILL_PATTERN = '*_skill.py'
+
+# `- `/get_hk_news` - ...` lines of the Commands section of a skill's .md
+COMMAND_RE = re.compile(r'^\s*[-*]\s+`/(\w+)')
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+# Printed on stderr by the profiling child between interpreter startup and the skill import
+PROFILE_MARKER = '--- skill import ---'
+PROFILE_TOP_MODULES = 8
+
+
+class SkillSpec:
+    """What a skill offers, read from its files without running them"""
+
+    def __init__(self, name, path, description, functions, commands, feed_groups):
+        self.name = name
+        self.path = path
+        self.description = description
+        # {function name: {'args': [...], 'doc': first docstring line}}
+        self.functions = functions
+        self.commands = commands
+        self.feed_groups = feed_groups
+
+    @property
+    def module_name(self):
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'path': self.path,
+            'description': self.description,
+            'functions': self.functions,
+            'commands': self.commands,
+            'feed_groups': self.feed_groups,
+        }
+
+
+def first_line(text):
+    return text.strip().splitlines()[0] if text and text.strip() else ''
+
+
+def read_skill_spec(path):
+    """Parse a skill module's AST (and its .md, if any) into a SkillSpec"""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+
+    functions = {}
+    assigned = set()
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and not node.name.startswith('_'):
+            functions[node.name] = {
+                'args': [arg.arg for arg in node.args.args],
+                'doc': first_line(ast.get_docstring(node)),
+            }
+        elif isinstance(node, ast.Assign):
+            assigned.update(target.id for target in node.targets if isinstance(target, ast.Name))
+
+    commands = []
+    md_path = os.path.splitext(path)[0] + '.md'
+    if os.path.exists(md_path):
+        with open(md_path, 'r', encoding='utf-8') as f:
+            commands = [match.group(1) for match in map(COMMAND_RE.match, f) if match]
+
+    return SkillSpec(
+        name=os.path.basename(os.path.dirname(path)),
+        path=path,
+        description=first_line(ast.get_docstring(tree)),
+        functions=functions,
+        commands=commands,
+        feed_groups='FEED_GROUPS' in assigned,
+    )
+
+
+def discover_skills(skills_dir=SKILLS_DIR):
+    """{skill name: SkillSpec} for every skills/*/*_skill.py"""
+    skills = {}
+    for path in sorted(glob.glob(os.path.join(skills_dir, '*', SKILL_PATTERN))):
+        spec = read_skill_spec(path)
+        skills[spec.name] = spec
+    return skills
+
+
+def load_skill_module(spec):
+    module_spec = importlib.util.spec_from_file_location(spec.module_name, spec.path)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    return module
+
+
+class SkillRegistry:
+    """Discovered skills, with each module imported the first time it is used"""
+
+    def __init__(self, skills_dir=SKILLS_DIR):
+        self.skills = discover_skills(skills_dir)
+        self.modules = {}
+        # {skill: {'ms': import time, 'modules': modules it pulled in}}
+        self.import_times = {}
+        self._lock = threading.Lock()
+
+    def spec(self, skill):
+        try:
+            return self.skills[skill]
+        except KeyError:
+            raise LookupError(f"Unknown skill: {skill}") from None
+
+    def load(self, skill):
+        """The imported skill module, importing it on first use"""
+        module = self.modules.get(skill)
+        if module is not None:
+            return module
+        spec = self.spec(skill)
+        with self._lock:
+            if skill not in self.modules:
+                before = len(sys.modules)
+                start = time.perf_counter()
+                self.modules[skill] = load_skill_module(spec)
+                self.import_times[skill] = {
+                    'ms': round((time.perf_counter() - start) * 1000, 3),
+                    'modules': len(sys.modules) - before,
+                }
+            return self.modules[skill]
+
+    def load_all(self):
+        for skill in self.skills:
+            self.load(skill)
+
+    def function(self, skill, function):
+        if function not in self.spec(skill).functions:
+            raise LookupError(f"Skill {skill} has no function {function}")
+        return getattr(self.load(skill), function)
+
+    def call(self, skill, function, args=(), kwargs=None):
+        return self.function(skill, function)(*args, **(kwargs or {}))
+
+
+def profile_import(spec):
+    """
+    Import a skill in a fresh interpreter under -X importtime
+
+    Returns the wall time of the import, the number of modules it loaded
+    and the slowest of them by their own (not cumulative) import time.
+    """
+    code = (
+        "import importlib.util, json, sys, time\n"
+        f"sys.stderr.write({PROFILE_MARKER!r} + '\\n'); sys.stderr.flush()\n"
+        "start = time.perf_counter()\n"
+        f"spec = importlib.util.spec_from_file_location({spec.module_name!r}, {spec.path!r})\n"
+        "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+        "print(json.dumps({'ms': (time.perf_counter() - start) * 1000}))\n"
+    )
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, cwd=os.path.dirname(spec.path))
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {spec.name} failed: {result.stderr.strip().splitlines()[-1:]}")
+
+    modules = []
+    _, _, trace = result.stderr.partition(PROFILE_MARKER)
+    for line in trace.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({'module': name, 'self_ms': int(self_us) / 1000,
+                            'cumulative_ms': int(cumulative_us) / 1000, 'depth': len(indent) // 2})
+    modules.sort(key=lambda module: module['self_ms'], reverse=True)
+    return {
+        'skill': spec.name,
+        'ms': round(json.loads(result.stdout.strip().splitlines()[-1])['ms'], 3),
+        'modules': len(modules),
+        'slowest': modules[:PROFILE_TOP_MODULES],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenClaw skill registry")
+    parser.add_argument('--skills-dir', default=SKILLS_DIR, help="default: %(default)s")
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--json', action='store_true', help="print JSON")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', parents=[output], help="list skills, their functions and commands")
+    profile_parser = subparsers.add_parser('profile', parents=[output], help="cold import time of each skill")
+    profile_parser.add_argument('skills', nargs='*', help="skills to profile (default: all)")
+    args = parser.parse_args()
+
+    skills = discover_skills(args.skills_dir)
+    if args.command == 'list':
+        if args.json:
+            print(json.dumps({name: spec.to_dict() for name, spec in skills.items()}, indent=2))
+            return
+        for spec in skills.values():
+            print(f"{spec.name}: {spec.description}")
+            print(f"  {spec.path}")
+            for function, info in spec.functions.items():
+                print(f"  {function}({', '.join(info['args'])})  {info['doc']}")
+            if spec.commands:
+                print(f"  Commands: {' '.join('/' + command for command in spec.commands)}")
+        return
+
+    unknown = [name for name in args.skills if name not in skills]
+    if unknown:
+        sys.exit(f"Error: unknown skill(s): {', '.join(unknown)}")
+    try:
+        profiles = [profile_import(skills[name]) for name in (args.skills or skills)]
+    except RuntimeError as e:
+        sys.exit(f"Error: {e}")
+    if args.json:
+        print(json.dumps(profiles, indent=2))
+        return
+    for profile in profiles:
+        print(f"{profile['skill']}: {profile['ms']:.1f} ms, {profile['modules']} modules")
+        for module in profile['slowest']:
+            print(f"  {module['self_ms']:8.2f} ms  {module['module']}")
+
+
+if __name__ == "__main__":
+    main()
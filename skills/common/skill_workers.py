@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Pre-warmed skill worker pool
+A supervisor imports every skill once and forks a few long-lived workers
+that share one Unix socket, so a skill call costs a local round trip
+instead of an interpreter start plus imports.
+
+Every message is a 4-byte big-endian length followed by compact JSON. A
+request is [skill, function, args, kwargs] and the reply is [true, result]
+or [false, "ErrorType: message"]. The reserved skill "" answers `ping` and
+`stats`. Connections stay open for any number of calls.
+
+    python3 skill_workers.py serve [--workers 2]
+    python3 skill_workers.py call hk_news search_hk_news '"typhoon signal"'
+    python3 skill_workers.py ping --count 1000
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+
+from skill_registry import SkillRegistry
+
+SOCKET_PATH = os.environ.get('OPENCLAW_SKILL_SOCKET', os.path.expanduser('~/.openclaw/skills.sock'))
+DEFAULT_WORKERS = int(os.environ.get('OPENCLAW_SKILL_WORKERS', '2'))
+CALL_TIMEOUT = 60
+LISTEN_BACKLOG = 64
+
+FRAME_HEADER = struct.Struct('!I')
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+# A worker that exits within this many seconds of starting is respawned after the same pause
+RESPAWN_DELAY = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class SkillError(Exception):
+    """A skill call that raised in the worker"""
+
+
+def send_message(sock, message):
+    payload = json.dumps(message, separators=(',', ':'), default=str).encode('utf-8')
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def read_message(rfile):
+    """Next message from a buffered socket file, or None at a clean end of stream"""
+    header = rfile.read(FRAME_HEADER.size)
+    if not header:
+        return None
+    if len(header) < FRAME_HEADER.size:
+        raise ConnectionError("truncated frame header")
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ConnectionError(f"frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    payload = rfile.read(length)
+    if len(payload) < length:
+        raise ConnectionError("truncated frame")
+    return json.loads(payload)
+
+
+class SkillWorker:
+    """A forked worker: accepts on the shared socket and serves each connection on a thread"""
+
+    def __init__(self, registry, listener):
+        self.registry = registry
+        self.listener = listener
+        self.started = time.monotonic()
+        self._counter = itertools.count(1)
+        self.requests = 0
+
+    def builtin(self, function):
+        if function == 'ping':
+            return os.getpid()
+        if function == 'stats':
+            return {
+                'pid': os.getpid(),
+                'requests': self.requests,
+                'uptime_seconds': round(time.monotonic() - self.started),
+                'import_times': self.registry.import_times,
+            }
+        raise LookupError(f"Unknown builtin: {function}")
+
+    def handle(self, request):
+        self.requests = next(self._counter)
+        try:
+            skill, function, args, kwargs = request
+            if skill == '':
+                return [True, self.builtin(function)]
+            return [True, self.registry.call(skill, function, args, kwargs)]
+        except Exception as e:
+            return [False, f"{type(e).__name__}: {e}"]
+
+    def serve_connection(self, conn):
+        with conn, conn.makefile('rb') as rfile:
+            while True:
+                try:
+                    request = read_message(rfile)
+                    if request is None:
+                        return
+                    send_message(conn, self.handle(request))
+                except (OSError, ValueError):
+                    return
+
+    def run(self):
+        while True:
+            conn, _ = self.listener.accept()
+            threading.Thread(target=self.serve_connection, args=(conn,), daemon=True).start()
+
+
+class SkillWorkerPool:
+    """Binds the socket, imports the skills, then forks workers and respawns them when they exit"""
+
+    def __init__(self, registry, socket_path=SOCKET_PATH, workers=DEFAULT_WORKERS):
+        self.registry = registry
+        self.socket_path = socket_path
+        self.worker_count = workers
+        self.workers = {}  # pid -> monotonic start time
+        self.listener = None
+        self.stopping = False
+
+    def bind(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise RuntimeError(f"a skill worker pool is already listening on {self.socket_path}")
+            except OSError:
+                os.unlink(self.socket_path)  # Left behind by a pool that died
+            finally:
+                probe.close()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        listener.listen(LISTEN_BACKLOG)
+        return listener
+
+    def prewarm(self):
+        """Import every skill before forking, so workers start with them loaded"""
+        for skill in self.registry.skills:
+            try:
+                self.registry.load(skill)
+                timing = self.registry.import_times[skill]
+                logger.info(f"Imported {skill} in {timing['ms']:.1f} ms ({timing['modules']} modules)")
+            except Exception as e:
+                # Workers retry the import on the first call and report the error to the caller
+                logger.warning(f"Could not import skill {skill}: {e}")
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)  # The supervisor shuts workers down
+                SkillWorker(self.registry, self.listener).run()
+            except BaseException:
+                logger.exception("Skill worker crashed")
+                status = 1
+            finally:
+                os._exit(status)
+        self.workers[pid] = time.monotonic()
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        self.listener = self.bind()
+        try:
+            self.prewarm()
+            for _ in range(self.worker_count):
+                self.spawn()
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+            logger.info(f"{self.worker_count} skill workers listening on {self.socket_path}")
+
+            while self.workers:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                started = self.workers.pop(pid, None)
+                if started is None or self.stopping:
+                    continue
+                logger.warning(f"Skill worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, respawning")
+                if time.monotonic() - started < RESPAWN_DELAY:
+                    time.sleep(RESPAWN_DELAY)
+                self.spawn()
+        finally:
+            self.listener.close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+
+class SkillClient:
+    """Persistent connection to the worker pool; safe to share between threads"""
+
+    def __init__(self, socket_path=SOCKET_PATH, timeout=CALL_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.sock = None
+        self.rfile = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+        self.rfile = sock.makefile('rb')
+
+    def close(self):
+        if self.sock is not None:
+            self.rfile.close()
+            self.sock.close()
+            self.sock = self.rfile = None
+
+    def request(self, skill, function, args=(), kwargs=None):
+        message = [skill, function, list(args), kwargs or {}]
+        with self._lock:
+            # A connection to a worker that has since restarted fails on first use;
+            # it is retried once on a fresh connection
+            for attempt in range(2):
+                if self.sock is None:
+                    self.connect()
+                try:
+                    send_message(self.sock, message)
+                    reply = read_message(self.rfile)
+                    if reply is None:
+                        raise ConnectionError("worker closed the connection")
+                    break
+                except socket.timeout:
+                    self.close()
+                    raise
+                except (OSError, ValueError):
+                    self.close()
+                    if attempt:
+                        raise
+        ok, value = reply
+        if not ok:
+            raise SkillError(value)
+        return value
+
+    def call(self, skill, function, *args, **kwargs):
+        return self.request(skill, function, args, kwargs)
+
+    def ping(self):
+        return self.request('', 'ping')
+
+
+_default_client = None
+_local_registry = None
+_default_lock = threading.Lock()
+
+
+def call_skill(skill, function, *args, **kwargs):
+    """
+    Call a skill function through the worker pool
+
+    Falls back to importing and calling the skill in this process when no
+    pool is listening. Results from the pool have been through JSON.
+    """
+    global _default_client, _local_registry
+    with _default_lock:
+        if _default_client is None:
+            _default_client = SkillClient()
+    try:
+        return _default_client.call(skill, function, *args, **kwargs)
+    except (FileNotFoundError, ConnectionRefusedError):
+        with _default_lock:
+            if _local_registry is None:
+                _local_registry = SkillRegistry()
+        return _local_registry.call(skill, function, args, kwargs)
+
+
+def parse_arg(text):
+    """CLI arguments are JSON values, or plain strings if they do not parse"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warmed skill worker pool")
+    parser.add_argument('--socket', default=SOCKET_PATH, help="Unix socket path (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="run the worker pool")
+    serve_parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    call_parser = subparsers.add_parser('call', help="call a skill function")
+    call_parser.add_argument('skill')
+    call_parser.add_argument('function')
+    call_parser.add_argument('args', nargs='*', type=parse_arg, help="JSON values or strings")
+    ping_parser = subparsers.add_parser('ping', help="measure the round trip to a worker")
+    ping_parser.add_argument('--count', type=int, default=1000)
+    subparsers.add_parser('stats', help="request count and skill import times of a worker")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            handlers=[logging.StreamHandler(sys.stdout)]
+        )
+        try:
+            SkillWorkerPool(SkillRegistry(), args.socket, args.workers).run()
+            logger.info("Skill worker pool stopped")
+        except RuntimeError as e:
+            sys.exit(f"Error: {e}")
+        return
+
+    client = SkillClient(args.socket)
+    try:
+        if args.command == 'call':
+            print(json.dumps(client.call(args.skill, args.function, *args.args), indent=2, default=str))
+        elif args.command == 'stats':
+            print(json.dumps(client.request('', 'stats'), indent=2))
+        else:
+            client.ping()  # Connect outside the timing
+            seconds = []
+            for _ in range(args.count):
+                start = time.perf_counter()
+                client.ping()
+                seconds.append(time.perf_counter() - start)
+            seconds.sort()
+            print(f"{args.count} round trips: p50 {seconds[len(seconds) // 2] * 1e6:.0f} µs, "
+                  f"p99 {seconds[int(len(seconds) * 0.99)] * 1e6:.0f} µs, max {seconds[-1] * 1e6:.0f} µs")
+    except (OSError, SkillError) as e:
+        sys.exit(f"Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
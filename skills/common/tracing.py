@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Lightweight stage tracing for the skills
+Nested spans with monotonic timestamps around each source and each stage
+(dns, connect, tls, request, transfer, parse, clean, cache, serialize),
+exported as Chrome trace-event JSON and summarised per stage. Tracing is
+off by default and a disabled span is a shared no-op object.
+
+    OPENCLAW_TRACE=/tmp/poller.json python3 feed_poller.py   # trace a process
+    python3 tracing.py run hk_news get_hk_news --chrome trace.json
+    python3 tracing.py run news get_top_news --profile cprofile
+    python3 tracing.py summary trace.json
+"""
+
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+# Set to a file path to trace the whole process and write the trace there on exit
+TRACE_PATH = os.environ.get('OPENCLAW_TRACE')
+# Spans kept in memory; later ones are counted but dropped
+MAX_EVENTS = 200000
+PROFILE_TOP = 25
+
+_enabled = False
+_origin_ns = time.perf_counter_ns()
+_events = []
+_dropped = 0
+_thread_names = {}
+
+
+class Span:
+    """A timed stage; extra details go in `args` via set()"""
+
+    __slots__ = ('name', 'args', 'start_ns')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        _record(self.name, self.start_ns, end_ns, self.args)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **args):
+    """Context manager timing one stage; a no-op unless tracing is enabled"""
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, args)
+
+
+def enabled():
+    return _enabled
+
+
+def _record(name, start_ns, end_ns, args):
+    global _dropped
+    if len(_events) >= MAX_EVENTS:
+        _dropped += 1
+        return
+    thread = threading.current_thread()
+    _thread_names[thread.ident] = thread.name
+    # list.append is atomic, so spans from the fetch threads need no lock
+    _events.append((name, start_ns, end_ns - start_ns, thread.ident, args))
+
+
+def enable():
+    """Start recording spans, discarding any recorded before"""
+    global _enabled, _origin_ns, _dropped
+    _events.clear()
+    _thread_names.clear()
+    _dropped = 0
+    _origin_ns = time.perf_counter_ns()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def chrome_trace():
+    """Recorded spans as a Chrome trace-event document (chrome://tracing, Perfetto)"""
+    pid = os.getpid()
+    events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+              for tid, name in list(_thread_names.items())]
+    for name, start_ns, dur_ns, tid, args in list(_events):
+        events.append({
+            'name': name,
+            'cat': 'openclaw',
+            'ph': 'X',
+            'ts': (start_ns - _origin_ns) / 1000,
+            'dur': dur_ns / 1000,
+            'pid': pid,
+            'tid': tid,
+            'args': args,
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'dropped_spans': _dropped}}
+
+
+def write_chrome_trace(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(), f, default=str)
+
+
+@contextlib.contextmanager
+def capture():
+    """Trace the enclosed block; yields nothing, read the result with chrome_trace()"""
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def summarize(trace):
+    """
+    Per-stage totals of a Chrome trace document
+
+    Self time excludes the nested spans of the same thread, so `parse`
+    does not also count the `transfer` reads it drives.
+    """
+    spans = sorted((e for e in trace['traceEvents'] if e.get('ph') == 'X'),
+                   key=lambda e: (e['pid'], e['tid'], e['ts'], -e['dur']))
+    stages = {}
+    stack = []  # Open spans of the current thread: [end, stage entry, self time, thread]
+
+    def close(until_ts, thread):
+        while stack and (stack[-1][3] != thread or stack[-1][0] <= until_ts):
+            _, stage, self_us, _ = stack.pop()
+            stage['self_us'] += self_us
+
+    for event in spans:
+        thread = (event['pid'], event['tid'])
+        close(event['ts'], thread)
+        if stack:
+            stack[-1][2] -= event['dur']
+        stage = stages.setdefault(event['name'], {'count': 0, 'total_us': 0.0, 'self_us': 0.0, 'durations': []})
+        stage['count'] += 1
+        stage['total_us'] += event['dur']
+        stage['durations'].append(event['dur'])
+        stack.append([event['ts'] + event['dur'], stage, event['dur'], thread])
+    close(float('inf'), None)
+
+    rows = []
+    for name, stage in stages.items():
+        durations = sorted(stage['durations'])
+        rows.append({
+            'stage': name,
+            'count': stage['count'],
+            'total_ms': round(stage['total_us'] / 1000, 3),
+            'self_ms': round(stage['self_us'] / 1000, 3),
+            'mean_ms': round(stage['total_us'] / stage['count'] / 1000, 3),
+            'p95_ms': round(durations[int(len(durations) * 0.95)] / 1000, 3),
+            'max_ms': round(durations[-1] / 1000, 3),
+        })
+    rows.sort(key=lambda row: row['self_ms'], reverse=True)
+    return rows
+
+
+def print_summary(rows):
+    print(f"{'Stage':16} {'Count':>7} {'Total ms':>10} {'Self ms':>10} {'Mean ms':>9} {'p95 ms':>9} {'Max ms':>9}")
+    for row in rows:
+        print(f"{row['stage']:16} {row['count']:>7} {row['total_ms']:>10.2f} {row['self_ms']:>10.2f} "
+              f"{row['mean_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['max_ms']:>9.3f}")
+
+
+@contextlib.contextmanager
+def profile(kind, output=None, top=PROFILE_TOP):
+    """
+    Profile the enclosed block with cProfile ('cprofile') or tracemalloc
+    ('tracemalloc'), printing the top entries to `output` (default stdout)
+    """
+    output = output or sys.stdout
+    if kind == 'cprofile':
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            stats = io.StringIO()
+            pstats.Stats(profiler, stream=stats).sort_stats('cumulative').print_stats(top)
+            output.write(stats.getvalue())
+    elif kind == 'tracemalloc':
+        import tracemalloc
+
+        tracemalloc.start(10)
+        try:
+            yield None
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            output.write(f"Allocated {current / 1024:.0f} KiB still live, peak {peak / 1024:.0f} KiB\n")
+            for stat in snapshot.statistics('lineno')[:top]:
+                output.write(f"{stat}\n")
+    else:
+        raise ValueError(f"unknown profiler: {kind}")
+
+
+def parse_arg(text):
+    """CLI arguments are JSON values, or plain strings if they do not parse"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace and profile skill calls")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help="call a skill function once with tracing on")
+    run_parser.add_argument('skill')
+    run_parser.add_argument('function')
+    run_parser.add_argument('args', nargs='*', type=parse_arg, help="JSON values or strings")
+    run_parser.add_argument('--chrome', metavar='PATH', help="write a Chrome trace-event file")
+    run_parser.add_argument('--profile', choices=('cprofile', 'tracemalloc'),
+                            help="also profile the call (adds overhead to the span timings)")
+    run_parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    summary_parser = subparsers.add_parser('summary', help="per-stage summary of a Chrome trace file")
+    summary_parser.add_argument('path')
+    summary_parser.add_argument('--json', action='store_true', help="print JSON")
+    args = parser.parse_args()
+
+    if args.command == 'summary':
+        try:
+            with open(args.path, 'r', encoding='utf-8') as f:
+                rows = summarize(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            sys.exit(f"Error: {e}")
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            print_summary(rows)
+        return
+
+    # Run as a script this file is __main__; the skills record spans in the imported module
+    import tracing
+    from skill_registry import SkillRegistry
+
+    registry = SkillRegistry()
+    try:
+        function = registry.function(args.skill, args.function)
+    except LookupError as e:
+        sys.exit(f"Error: {e}")
+
+    profile_output = io.StringIO()
+    with contextlib.ExitStack() as stack:
+        if args.profile:
+            stack.enter_context(profile(args.profile, profile_output))
+        stack.enter_context(tracing.capture())
+        with tracing.span('call', skill=args.skill, function=args.function):
+            result = function(*args.args)
+            with tracing.span('serialize'):
+                json.dumps(result, default=str)
+
+    trace = tracing.chrome_trace()
+    if args.chrome:
+        tracing.write_chrome_trace(args.chrome)
+    rows = summarize(trace)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_summary(rows)
+        if args.chrome:
+            print(f"\n✓ Chrome trace written to {args.chrome} (open in chrome://tracing or ui.perfetto.dev)")
+    if args.profile:
+        print(profile_output.getvalue(), file=sys.stderr if args.json else sys.stdout)
+
+
+if TRACE_PATH and __name__ != '__main__':
+    enable()
+    atexit.register(write_chrome_trace, TRACE_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Hong Kong Observatory weather warning monitor
+Polls the HKO warning summary with conditional GETs, parses it into
+structured warning codes (typhoon signal, rainstorm colour, ...) and diffs
+each new state against the last one, emitting an event only when a warning
+is issued, upgraded, downgraded or cancelled. A feed whose content hash is
+unchanged is not parsed at all, so an idle poll costs one small request.
+
+    python3 weather_monitor.py                       # run, logging events
+    python3 weather_monitor.py --notify whatsapp:+85212345678
+    python3 weather_monitor.py --once                # print current warnings
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from xml.etree import ElementTree as ET
+
+from feed_fetcher import iter_chunks
+from http_pool import HTTPStatusError, get_default_pool
+
+WARNING_SUMMARY_URL = 'https://rss.weather.gov.hk/rss/WeatherWarningSummaryv2.xml'
+LOCAL_FORECAST_URL = 'https://rss.weather.gov.hk/rss/LocalWeatherForecast.xml'
+USER_AGENT = 'Mozilla/5.0 (compatible; OpenClaw HK Weather Monitor)'
+STATE_PATH = os.environ.get('OPENCLAW_WEATHER_STATE',
+                            os.path.expanduser('~/.openclaw/weather_state.json'))
+POLL_INTERVAL = int(os.environ.get('OPENCLAW_WEATHER_POLL_INTERVAL', '15'))
+FETCH_TIMEOUT = 10
+# Recent events kept in the state file for get_hk_weather_warnings()
+RECENT_EVENTS = 20
+
+# (category, code, level, name, pattern) checked against each sentence of the
+# summary; within a category the most severe match wins. Codes follow the
+# HKO open data warning summary (warnsum) codes.
+WARNINGS = (
+    ('WTCSGNL', 'TC10', 10, 'Hurricane Signal No. 10', r'hurricane signal|signal no\.?\s*10\b'),
+    ('WTCSGNL', 'TC9', 9, 'Increasing Gale or Storm Signal No. 9',
+     r'increasing gale or storm signal|signal no\.?\s*9\b'),
+    ('WTCSGNL', 'TC8', 8, 'Gale or Storm Signal No. 8',
+     r'no\.?\s*8\s+(?:north|south)[\s-]?(?:east|west)|gale or storm signal|signal no\.?\s*8\b'),
+    ('WTCSGNL', 'TC3', 3, 'Strong Wind Signal No. 3', r'strong wind signal|signal no\.?\s*3\b'),
+    ('WTCSGNL', 'TC1', 1, 'Standby Signal No. 1', r'standby signal|signal no\.?\s*1\b'),
+    ('WRAIN', 'WRAINB', 3, 'Black Rainstorm Warning Signal', r'black rainstorm'),
+    ('WRAIN', 'WRAINR', 2, 'Red Rainstorm Warning Signal', r'red rainstorm'),
+    ('WRAIN', 'WRAINA', 1, 'Amber Rainstorm Warning Signal', r'amber rainstorm'),
+    ('WFIRE', 'WFIRER', 2, 'Red Fire Danger Warning', r'red fire danger'),
+    ('WFIRE', 'WFIREY', 1, 'Yellow Fire Danger Warning', r'yellow fire danger'),
+    ('WTMW', 'WTMW', 1, 'Tsunami Warning', r'tsunami warning'),
+    ('WFNTSA', 'WFNTSA', 1, 'Special Announcement on Flooding in the northern New Territories',
+     r'flooding in the northern new territories'),
+    ('WL', 'WL', 1, 'Landslip Warning', r'landslip warning'),
+    ('WTS', 'WTS', 1, 'Thunderstorm Warning', r'thunderstorm warning'),
+    ('WMSGNL', 'WMSGNL', 1, 'Strong Monsoon Signal', r'strong monsoon signal'),
+    ('WHOT', 'WHOT', 1, 'Very Hot Weather Warning', r'very hot weather warning'),
+    ('WCOLD', 'WCOLD', 1, 'Cold Weather Warning', r'cold weather warning'),
+    ('WFROST', 'WFROST', 1, 'Frost Warning', r'frost warning'),
+)
+_WARNING_RES = [(category, code, level, name, re.compile(pattern, re.IGNORECASE))
+                for category, code, level, name, pattern in WARNINGS]
+# No. 8 signals carry the quadrant the gales are expected from
+TC8_DIRECTION_RE = re.compile(r'no\.?\s*8\s+(north|south)[\s-]?(east|west)', re.IGNORECASE)
+# Clauses about a warning that is not (or not yet) in force, unless they say "in force"
+NOT_IN_FORCE_RE = re.compile(r'\bcancel|\bconsider|\bexpect|\bmay be\b|\bwill be (?:issued|replaced)|\bno longer\b',
+                             re.IGNORECASE)
+IN_FORCE_RE = re.compile(r'(?<!no longer )(?<!not )\bin force\b', re.IGNORECASE)
+# Words saying what happens to a warning; a clause without one has no verdict yet
+STATUS_RE = re.compile(NOT_IN_FORCE_RE.pattern + r'|\bin force\b|\bissued\b|\bhoisted\b|\blowered\b|\breplaced\b',
+                       re.IGNORECASE)
+CLAUSE_SPLIT_RE = re.compile(r'([,;]\s*|\s+(?:and|but|while|whereas)\s+)', re.IGNORECASE)
+ISSUED_AT_RE = re.compile(r'issued at\s+([0-9][0-9:.]*\s*[ap]\.?m\.?)', re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+SENTENCE_RE = re.compile(r'(?<=\.)\s+(?=[A-Z])|\n+')
+
+logger = logging.getLogger(__name__)
+
+
+def feed_text(body):
+    """Title and description of every item of an RSS document, HTML stripped, untruncated"""
+    root = ET.fromstring(body)
+    parts = []
+    for item in root.iter('item'):
+        for tag in ('title', 'description'):
+            text = item.findtext(tag) or ''
+            parts.append(TAG_RE.sub('\n', text))
+    return '\n'.join(part.strip() for part in parts if part.strip())
+
+
+def split_clauses(sentence):
+    """
+    Split a sentence where a new warning gets its own verdict
+
+    A piece starts a new clause only if it names a warning and the clause
+    before it already says something about its own warning, so "Signal No. 3
+    and Signal No. 1 will be cancelled" stays one clause while "Signal No. 1
+    is in force, and ... will consider issuing Signal No. 3" becomes two.
+    """
+    parts = CLAUSE_SPLIT_RE.split(sentence)
+    clauses = [parts[0]]
+    for separator, piece in zip(parts[1::2], parts[2::2]):
+        names_warning = any(pattern.search(piece) for *_, pattern in _WARNING_RES)
+        if names_warning and STATUS_RE.search(clauses[-1]):
+            clauses.append(piece)
+        else:
+            clauses[-1] += separator + piece
+    return clauses
+
+
+def warnings_in_text(text):
+    """
+    {category: warning} for every warning a summary text lists as in force
+
+    >>> sorted(warnings_in_text("The Thunderstorm Warning was issued at 2:00 p.m. "
+    ...                         "and is expected to remain in force until 4:00 p.m."))
+    ['WTS']
+    >>> [w['code'] for w in warnings_in_text("The Standby Signal No. 1 is in force, and the Observatory "
+    ...                                      "will consider issuing the Strong Wind Signal No. 3 later.").values()]
+    ['TC1']
+    >>> warnings_in_text("The Red Rainstorm Warning Signal was cancelled at 3:00 p.m.")
+    {}
+    """
+    warnings = {}
+    for sentence in SENTENCE_RE.split(text):
+        sentence = ' '.join(sentence.split())
+        if not sentence:
+            continue
+        issued = ISSUED_AT_RE.search(sentence)
+        for clause in split_clauses(sentence):
+            if NOT_IN_FORCE_RE.search(clause) and not IN_FORCE_RE.search(clause):
+                continue
+            matched = set()
+            for category, code, level, name, pattern in _WARNING_RES:
+                # Patterns are ordered most severe first within a category
+                if category in matched or not pattern.search(clause):
+                    continue
+                matched.add(category)
+                if category in warnings and warnings[category]['level'] >= level:
+                    continue
+                if code == 'TC8':
+                    direction = TC8_DIRECTION_RE.search(clause)
+                    if direction:
+                        quadrant = direction.group(1)[0] + direction.group(2)[0]
+                        code = 'TC8' + quadrant.upper()
+                        name = f"No. 8 {direction.group(1).title()}{direction.group(2).lower()} Gale or Storm Signal"
+                warnings[category] = {
+                    'category': category,
+                    'code': code,
+                    'level': level,
+                    'name': name,
+                    'issued_at': issued.group(1) if issued else None,
+                    'text': sentence,
+                }
+    return warnings
+
+
+def parse_warnings(body):
+    """{category: warning} for every warning the RSS summary lists as in force"""
+    return warnings_in_text(feed_text(body))
+
+
+def diff_warnings(previous, current):
+    """Events turning the `previous` warnings into the `current` ones"""
+    now = datetime.now().isoformat(timespec='seconds')
+    events = []
+    for category, warning in current.items():
+        old = previous.get(category)
+        if old is None:
+            kind = 'issued'
+        elif warning['code'] == old['code']:
+            continue
+        elif warning['level'] > old['level']:
+            kind = 'upgraded'
+        elif warning['level'] < old['level']:
+            kind = 'downgraded'
+        else:
+            kind = 'changed'  # e.g. No. 8 Northeast -> No. 8 Southeast
+        events.append({'type': kind, 'category': category, 'code': warning['code'], 'name': warning['name'],
+                       'previous': old['code'] if old else None, 'text': warning['text'], 'time': now})
+    for category, old in previous.items():
+        if category not in current:
+            events.append({'type': 'cancelled', 'category': category, 'code': old['code'], 'name': old['name'],
+                           'previous': old['code'], 'text': '', 'time': now})
+    return events
+
+
+def format_event(event, previous_name=None):
+    """One-line message for an event"""
+    if event['type'] in ('upgraded', 'downgraded', 'changed') and previous_name:
+        return f"HKO: {previous_name} {event['type']} to {event['name']}"
+    return f"HKO: {event['name']} {event['type']}"
+
+
+class WeatherMonitor:
+    """Warning and forecast state of the HKO feeds, persisted between runs"""
+
+    def __init__(self, state_path=STATE_PATH, warning_url=WARNING_SUMMARY_URL,
+                 forecast_url=LOCAL_FORECAST_URL, user_agent=USER_AGENT):
+        self.state_path = state_path
+        self.warning_url = warning_url
+        self.forecast_url = forecast_url
+        self.user_agent = user_agent
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'feeds': {}, 'warnings': None, 'forecast': None, 'events': [], 'checked_at': None}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def fetch_changed(self, url):
+        """
+        (body, validators) if a feed's content changed since the last fetch,
+        else (None, None). The validators are only stored by commit() once
+        the body has been parsed, so a body that fails to parse is fetched
+        and parsed again on the next poll.
+        """
+        feed = self.state['feeds'].setdefault(url, {})
+        headers = {'User-Agent': self.user_agent}
+        if feed.get('etag'):
+            headers['If-None-Match'] = feed['etag']
+        if feed.get('last_modified'):
+            headers['If-Modified-Since'] = feed['last_modified']
+
+        deadline = time.monotonic() + FETCH_TIMEOUT
+        with get_default_pool().get(url, headers=headers, timeout=FETCH_TIMEOUT) as response:
+            if response.status == 304:
+                return None, None
+            if not 200 <= response.status < 300:
+                raise HTTPStatusError(response.status, response.reason, url)
+            body = b''.join(iter_chunks(response, deadline))
+            validators = {
+                'etag': response.getheader('ETag'),
+                'last_modified': response.getheader('Last-Modified'),
+                'hash': hashlib.sha256(body).hexdigest(),
+            }
+
+        if validators['hash'] == feed.get('hash'):
+            # Same content as the last parsed body; only the validators moved
+            feed.update(validators)
+            return None, None
+        validators['changed_at'] = datetime.now().isoformat(timespec='seconds')
+        return body, validators
+
+    def commit(self, url, validators):
+        """Record a fetched body as parsed"""
+        self.state['feeds'][url].update(validators)
+
+    def poll(self):
+        """Check both feeds; returns the warning events since the previous poll"""
+        events = []
+        body, validators = self.fetch_changed(self.warning_url)
+        if body is not None:
+            current = parse_warnings(body)
+            self.commit(self.warning_url, validators)
+            previous = self.state['warnings']
+            if previous is None:
+                # First run: record what is in force without announcing it
+                logger.info(f"Baseline: {len(current)} warning(s) in force")
+            else:
+                events = diff_warnings(previous, current)
+                for event in events:
+                    old = previous.get(event['category'])
+                    event['message'] = format_event(event, old['name'] if old else None)
+            self.state['warnings'] = current
+            self.state['events'] = (self.state['events'] + events)[-RECENT_EVENTS:]
+
+        try:
+            body, validators = self.fetch_changed(self.forecast_url)
+            if body is not None:
+                self.state['forecast'] = feed_text(body)
+                self.commit(self.forecast_url, validators)
+        except (OSError, ValueError, SyntaxError, HTTPStatusError) as e:
+            # The forecast is informational; warnings still go out without it
+            logger.warning(f"Local forecast fetch failed: {e}")
+
+        self.state['checked_at'] = time.time()
+        self.save()
+        return events
+
+    def run(self, interval=POLL_INTERVAL, on_event=None, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                for event in self.poll():
+                    logger.info(event['message'])
+                    if on_event:
+                        on_event(event)
+            except Exception as e:
+                logger.warning(f"Warning summary poll failed: {e}")
+            stop_event.wait(interval)
+
+
+def current_warnings(state_path=STATE_PATH, max_age=POLL_INTERVAL * 4):
+    """
+    Warnings in force, the full local forecast and recent changes
+
+    Read from the monitor's state file while it is fresh; otherwise the
+    feeds are polled once here. If that poll fails, the last saved state is
+    returned with an `error` key, or [{'error': ...}] when there is none.
+    """
+    monitor = WeatherMonitor(state_path)
+    checked_at = monitor.state.get('checked_at')
+    error = None
+    if checked_at is None or time.time() - checked_at > max_age:
+        try:
+            monitor.poll()
+        except (OSError, ValueError, SyntaxError, HTTPStatusError) as e:
+            # SyntaxError covers ET.ParseError on a malformed summary
+            error = str(e)
+            monitor = WeatherMonitor(state_path)  # The last saved state, not the half-updated one
+    state = monitor.state
+    if state['warnings'] is None or state['checked_at'] is None:
+        return [{'error': error or 'no weather warning state yet'}]
+    result = {
+        'warnings': sorted(state['warnings'].values(), key=lambda w: (w['category'], -w['level'])),
+        'forecast': state['forecast'],
+        'recent_events': state['events'],
+        'checked_at': datetime.fromtimestamp(state['checked_at']).isoformat(timespec='seconds'),
+    }
+    if error is not None:
+        result['error'] = error
+    return result
+
+
+def dispatcher_notifier(targets, transport='cli'):
+    """
+    on_event callback sending each event to `channel:target` recipients via
+    the message dispatcher, through the `openclaw message` CLI ('cli') or the
+    dispatcher's HTTP gateway endpoint ('gateway')
+    """
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backup_system'))
+    from message_dispatcher import CLITransport, GatewayTransport, MessageDispatcher
+
+    dispatcher = MessageDispatcher(GatewayTransport() if transport == 'gateway' else CLITransport()).start()
+    recipients = [target.split(':', 1) for target in targets]
+
+    def notify(event):
+        for channel, target in recipients:
+            dispatcher.send(channel, target, event['message'])
+
+    return notify, dispatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HKO weather warning monitor")
+    parser.add_argument('--interval', type=int, default=POLL_INTERVAL, help="seconds between polls (default: %(default)s)")
+    parser.add_argument('--state', default=STATE_PATH, help="state file (default: %(default)s)")
+    parser.add_argument('--notify', action='append',
+                        default=[t for t in os.environ.get('OPENCLAW_WEATHER_NOTIFY', '').split(',') if t],
+                        help="channel:target to message on every change (repeatable, or OPENCLAW_WEATHER_NOTIFY)")
+    parser.add_argument('--transport', choices=('cli', 'gateway'),
+                        default=os.environ.get('OPENCLAW_WEATHER_TRANSPORT', 'cli'),
+                        help="how --notify messages are sent: the openclaw CLI, or an HTTP POST to the gateway "
+                             "message endpoint (default: %(default)s)")
+    parser.add_argument('--once', action='store_true', help="poll once and print the warnings in force")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    if args.once:
+        result = current_warnings(args.state, max_age=0)
+        if isinstance(result, list):
+            sys.exit(f"Error: {result[0]['error']}")
+        if 'error' in result:
+            print(f"✗ Poll failed, showing the state saved at {result['checked_at']}: {result['error']}")
+        if not result['warnings']:
+            print("No warnings in force")
+        for warning in result['warnings']:
+            print(f"{warning['code']:8} {warning['name']}"
+                  + (f" (issued at {warning['issued_at']})" if warning['issued_at'] else ""))
+        return
+
+    bad = [target for target in args.notify if ':' not in target]
+    if bad:
+        sys.exit(f"Error: --notify expects channel:target, got {', '.join(bad)}")
+    try:
+        on_event, dispatcher = dispatcher_notifier(args.notify, args.transport) if args.notify else (None, None)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    logger.info(f"Monitoring {WARNING_SUMMARY_URL} every {args.interval}s"
+                + (f", notifying {', '.join(args.notify)}" if args.notify else ""))
+    WeatherMonitor(args.state).run(args.interval, on_event, stop_event)
+    if dispatcher is not None:
+        dispatcher.stop()
+    logger.info("Weather monitor stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,125 +3,136 @@
 Hong Kong news retrieval skill using official Hong Kong government RSS feeds
 """
 
-import urllib.request
-import urllib.parse
-from xml.etree import ElementTree as ET
 import json
-from datetime import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from article_store import ArticleStore
+from feed_delta import fetch_group_delta
+from feed_poller import get_group_items, get_group_snapshot
+from news_index import search_articles
+from weather_monitor import current_warnings
+
+NEWS_USER_AGENT = 'Mozilla/5.0 (compatible; OpenClaw HK News Skill)'
+WEATHER_USER_AGENT = 'Mozilla/5.0 (compatible; OpenClaw HK Weather Skill)'
+
+HK_NEWS_SOURCES = {
+    'HK News Ticker': 'https://www.news.gov.hk/en/common/html/ticker.rss.xml',
+    'HK Top Stories': 'https://www.news.gov.hk/en/common/html/topstories.rss.xml',
+    'HK Administration & Civic Affairs': 'https://www.news.gov.hk/en/categories/admin/html/articlelist.rss.xml',
+    'HK Business & Finance': 'https://www.news.gov.hk/en/categories/finance/html/articlelist.rss.xml',
+    'HK City Life': 'https://www.news.gov.hk/en/city_life/html/articlelist.rss.xml',
+    'HK Environment': 'https://www.news.gov.hk/en/categories/environment/html/articlelist.rss.xml',
+    'HK Health & Community': 'https://www.news.gov.hk/en/categories/health/html/articlelist.rss.xml',
+    'HK Law & Order': 'https://www.news.gov.hk/en/categories/law_order/html/articlelist.rss.xml',
+    'HK All Press Releases': 'https://www.info.gov.hk/gia/rss/general_en.xml',
+    'RTHK Local News': 'https://rthk.hk/rthk/news/rss/e_expressnews_elocal.xml',
+    'RTHK Greater China News': 'https://rthk.hk/rthk/news/rss/e_expressnews_egreaterchina.xml',
+    'RTHK International News': 'https://rthk.hk/rthk/news/rss/e_expressnews_einternational.xml',
+    'RTHK Finance News': 'https://rthk.hk/rthk/news/rss/e_expressnews_efinance.xml',
+    'RTHK Sports News': 'https://rthk.hk/rthk/news/rss/e_expressnews_esports.xml',
+    'RTHK Chinese Local News': 'https://rthk.hk/rthk/news/rss/c_expressnews_clocal.xml',
+    'RTHK Chinese Greater China News': 'https://rthk.hk/rthk/news/rss/c_expressnews_cgreaterchina.xml',
+    'RTHK Chinese International News': 'https://rthk.hk/rthk/news/rss/c_expressnews_cinternational.xml',
+    'RTHK Chinese Finance News': 'https://rthk.hk/rthk/news/rss/c_expressnews_cfinance.xml',
+    'RTHK Chinese Sports News': 'https://rthk.hk/rthk/news/rss/c_expressnews_csports.xml',
+    'SCMP Hong Kong News': 'https://www.scmp.com/rss/3/feed',
+    'SCMP Greater China News': 'https://www.scmp.com/rss/4/feed',
+    'SCMP Opinion': 'https://www.scmp.com/rss/7/feed',
+    'SCMP Business': 'https://www.scmp.com/rss/5/feed',
+    'SCMP Tech': 'https://www.scmp.com/rss/36/feed',
+}
+
+WEATHER_SOURCES = {
+    'Weather Warning Summary': 'https://rss.weather.gov.hk/rss/WeatherWarningSummaryv2.xml',
+    'Local Weather Forecast': 'https://rss.weather.gov.hk/rss/LocalWeatherForecast.xml',
+}
+
+# Freshness TTLs and poller refresh intervals in seconds; sources not
+# listed use the group default
+SOURCE_TTLS = {
+    'HK News Ticker': 60,
+    'RTHK Local News': 60,
+    'RTHK Chinese Local News': 60,
+    'HK All Press Releases': 120,
+    'Weather Warning Summary': 60,
+    'Local Weather Forecast': 600,
+}
+
+# Feed groups refreshed in the background by skills/common/feed_poller.py
+FEED_GROUPS = {
+    'hk_news': {
+        'sources': HK_NEWS_SOURCES,
+        'limit': 3,
+        'user_agent': NEWS_USER_AGENT,
+        'interval': 300,
+        'intervals': SOURCE_TTLS,
+    },
+    'hk_weather': {
+        'sources': WEATHER_SOURCES,
+        'limit': 2,
+        'user_agent': WEATHER_USER_AGENT,
+        'interval': 300,
+        'intervals': SOURCE_TTLS,
+    },
+}
 
 def get_hk_news():
     """Retrieve Hong Kong news from official RSS feeds"""
-    hk_sources = {
-        'HK News Ticker': 'https://www.news.gov.hk/en/common/html/ticker.rss.xml',
-        'HK Top Stories': 'https://www.news.gov.hk/en/common/html/topstories.rss.xml',
-        'HK Administration & Civic Affairs': 'https://www.news.gov.hk/en/categories/admin/html/articlelist.rss.xml',
-        'HK Business & Finance': 'https://www.news.gov.hk/en/categories/finance/html/articlelist.rss.xml',
-        'HK City Life': 'https://www.news.gov.hk/en/city_life/html/articlelist.rss.xml',
-        'HK Environment': 'https://www.news.gov.hk/en/categories/environment/html/articlelist.rss.xml',
-        'HK Health & Community': 'https://www.news.gov.hk/en/categories/health/html/articlelist.rss.xml',
-        'HK Law & Order': 'https://www.news.gov.hk/en/categories/law_order/html/articlelist.rss.xml',
-        'HK All Press Releases': 'https://www.info.gov.hk/gia/rss/general_en.xml',
-        'RTHK Local News': 'https://rthk.hk/rthk/news/rss/e_expressnews_elocal.xml',
-        'RTHK Greater China News': 'https://rthk.hk/rthk/news/rss/e_expressnews_egreaterchina.xml',
-        'RTHK International News': 'https://rthk.hk/rthk/news/rss/e_expressnews_einternational.xml',
-        'RTHK Finance News': 'https://rthk.hk/rthk/news/rss/e_expressnews_efinance.xml',
-        'RTHK Sports News': 'https://rthk.hk/rthk/news/rss/e_expressnews_esports.xml',
-        'RTHK Chinese Local News': 'https://rthk.hk/rthk/news/rss/c_expressnews_clocal.xml',
-        'RTHK Chinese Greater China News': 'https://rthk.hk/rthk/news/rss/c_expressnews_cgreaterchina.xml',
-        'RTHK Chinese International News': 'https://rthk.hk/rthk/news/rss/c_expressnews_cinternational.xml',
-        'RTHK Chinese Finance News': 'https://rthk.hk/rthk/news/rss/c_expressnews_cfinance.xml',
-        'RTHK Chinese Sports News': 'https://rthk.hk/rthk/news/rss/c_expressnews_csports.xml',
-        'SCMP Hong Kong News': 'https://www.scmp.com/rss/3/feed',
-        'SCMP Greater China News': 'https://www.scmp.com/rss/4/feed',
-        'SCMP Opinion': 'https://www.scmp.com/rss/7/feed',
-        'SCMP Business': 'https://www.scmp.com/rss/5/feed',
-        'SCMP Tech': 'https://www.scmp.com/rss/36/feed',
-    }
-    
-    news_results = {}
-    for source_name, rss_url in hk_sources.items():
-        try:
-            req = urllib.request.Request(
-                rss_url,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (compatible; OpenClaw HK News Skill)'
-                }
-            )
-            response = urllib.request.urlopen(req, timeout=10)
-            content = response.read().decode('utf-8')
-            
-            # Parse RSS feed
-            root = ET.fromstring(content)
-            items = []
-            
-            for item in root.findall('.//item')[:3]:  # Get top 3 articles
-                title = item.find('title').text if item.find('title') is not None else 'No Title'
-                description = item.find('description').text if item.find('description') is not None else ''
-                pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
-                
-                # Clean description
-                if description:
-                    import re
-                    description = re.sub('<[^<]+?>', '', description)
-                    description = description[:200] + '...' if len(description) > 200 else description
-                
-                items.append({
-                    'title': title,
-                    'description': description,
-                    'pub_date': pub_date
-                })
-            
-            news_results[source_name] = items
-        except Exception as e:
-            news_results[source_name] = [{'error': str(e)}]
-    
-    return news_results
+    # Top 3 articles per source, from the poller snapshot when it is running
+    return get_group_items('hk_news', FEED_GROUPS['hk_news'])
+
+def get_hk_news_snapshot():
+    """Retrieve Hong Kong news along with the age and staleness of every source"""
+    return get_group_snapshot('hk_news', FEED_GROUPS['hk_news'])
+
+def get_hk_news_since(cursor=None):
+    """
+    Retrieve only Hong Kong news published since the previous call
+
+    Returns {'items': {source: new items}, 'cursor': ...}; pass the cursor
+    back on the next call. Without a cursor the current top items are returned.
+    """
+    return fetch_group_delta('hk_news', FEED_GROUPS['hk_news'], cursor)
+
+def get_hk_news_digest(only_new=False):
+    """
+    Retrieve Hong Kong news deduplicated across sources
+
+    Every article is returned once with the list of sources it appeared in.
+    With `only_new`, articles already returned by an earlier call are skipped.
+    """
+    store = ArticleStore()
+    try:
+        return store.add_results(get_hk_news(), only_new=only_new)
+    finally:
+        store.close()
+
+def search_hk_news(query, since_hours=None, limit=10):
+    """
+    Search collected news for keywords and "quoted phrases"
+
+    Covers the latest Hong Kong news plus everything stored by earlier
+    calls and by the feed poller. `since_hours` keeps only articles
+    published within that many hours. Results are ranked best first.
+    """
+    store = ArticleStore()
+    try:
+        store.add_results(get_hk_news())
+        return search_articles(store, query, since_hours=since_hours, limit=limit)
+    finally:
+        store.close()
 
 def get_hk_weather():
     """Retrieve Hong Kong weather information"""
-    weather_sources = {
-        'Weather Warning Summary': 'https://rss.weather.gov.hk/rss/WeatherWarningSummaryv2.xml',
-        'Local Weather Forecast': 'https://rss.weather.gov.hk/rss/LocalWeatherForecast.xml',
-    }
-    
-    weather_results = {}
-    for source_name, rss_url in weather_sources.items():
-        try:
-            req = urllib.request.Request(
-                rss_url,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (compatible; OpenClaw HK Weather Skill)'
-                }
-            )
-            response = urllib.request.urlopen(req, timeout=10)
-            content = response.read().decode('utf-8')
-            
-            # Parse RSS feed
-            root = ET.fromstring(content)
-            items = []
-            
-            for item in root.findall('.//item')[:2]:  # Get top 2 weather updates
-                title = item.find('title').text if item.find('title') is not None else 'No Title'
-                description = item.find('description').text if item.find('description') is not None else ''
-                pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
-                
-                # Clean description
-                if description:
-                    import re
-                    description = re.sub('<[^<]+?>', '', description)
-                    description = description[:200] + '...' if len(description) > 200 else description
-                
-                items.append({
-                    'title': title,
-                    'description': description,
-                    'pub_date': pub_date
-                })
-            
-            weather_results[source_name] = items
-        except Exception as e:
-            weather_results[source_name] = [{'error': str(e)}]
-    
-    return weather_results
+    # Top 2 weather updates per source
+    return get_group_items('hk_weather', FEED_GROUPS['hk_weather'])
+
+def get_hk_weather_warnings():
+    """HKO warnings in force as structured codes, the full local forecast and recent changes"""
+    return current_warnings()
 
 if __name__ == "__main__":
     # Get Hong Kong news
@@ -4,65 +4,53 @@ Basic news retrieval skill using RSS feeds
 This is a workaround for missing web search API
 """
 
-import urllib.request
-import urllib.parse
-from xml.etree import ElementTree as ET
 import json
-from datetime import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from feed_fetcher import fetch_feed, resolve_cache
+from feed_delta import fetch_group_delta
+from feed_poller import get_group_items, get_group_snapshot
+
+USER_AGENT = 'Mozilla/5.0 (compatible; OpenClaw News Skill)'
+
+NEWS_SOURCES = {
+    'BBC News': 'http://feeds.bbci.co.uk/news/rss.xml',
+    'CNN': 'http://rss.cnn.com/rss/edition.rss',
+    'Reuters': 'http://feeds.reuters.com/reuters/topNews',
+}
+
+# Feed groups refreshed in the background by skills/common/feed_poller.py
+FEED_GROUPS = {
+    'news': {
+        'sources': NEWS_SOURCES,
+        'limit': 5,
+        'user_agent': USER_AGENT,
+        'interval': 300,
+    },
+}
 
 def get_news_from_rss(rss_url):
     """Retrieve news from RSS feed"""
-    try:
-        req = urllib.request.Request(
-            rss_url,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (compatible; OpenClaw News Skill)'
-            }
-        )
-        response = urllib.request.urlopen(req, timeout=10)
-        content = response.read().decode('utf-8')
-        
-        # Parse RSS feed
-        root = ET.fromstring(content)
-        items = []
-        
-        for item in root.findall('.//item')[:5]:  # Get top 5 articles
-            title = item.find('title').text if item.find('title') is not None else 'No Title'
-            description = item.find('description').text if item.find('description') is not None else ''
-            pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
-            
-            # Clean description
-            if description:
-                # Remove HTML tags if present
-                import re
-                description = re.sub('<[^<]+?>', '', description)
-                description = description[:200] + '...' if len(description) > 200 else description
-            
-            items.append({
-                'title': title,
-                'description': description,
-                'pub_date': pub_date
-            })
-        
-        return items
-    except Exception as e:
-        return [{'error': str(e)}]
+    # Get top 5 articles, served from the feed cache while fresh
+    return fetch_feed(rss_url, limit=5, user_agent=USER_AGENT, cache=resolve_cache(None))
 
 def get_top_news():
     """Get top news from various sources"""
-    sources = {
-        'BBC News': 'http://feeds.bbci.co.uk/news/rss.xml',
-        'CNN': 'http://rss.cnn.com/rss/edition.rss',
-        'Reuters': 'http://feeds.reuters.com/reuters/topNews',
-    }
-    
-    news_results = {}
-    for source_name, rss_url in sources.items():
-        news_results[source_name] = get_news_from_rss(rss_url)
-    
-    return news_results
+    # Served from the feed poller snapshot when it is running
+    return get_group_items('news', FEED_GROUPS['news'])
+
+def get_top_news_since(cursor=None):
+    """Get only top news published since the previous call, plus a new cursor"""
+    return fetch_group_delta('news', FEED_GROUPS['news'], cursor)
+
+def get_top_news_snapshot():
+    """Get top news along with the age and staleness of every source"""
+    return get_group_snapshot('news', FEED_GROUPS['news'])
 
 if __name__ == "__main__":
     # Test the function
     news = get_top_news()
-    print(json.dumps(news, indent=2, default=str))
\ No newline at end of file
+    print(json.dumps(news, indent=2, default=str))
@@ -0,0 +1,219 @@
+"""
+Server-Sent Events change feed for the todo app
+One hub thread owns every subscriber socket and multiplexes them with a
+selector, so idle connected clients cost no request thread. Bursts of task
+changes are coalesced into a single event carrying the sequence number of
+the last change, which clients send back (Last-Event-ID) to resume.
+"""
+
+import json
+import selectors
+import socket
+import threading
+import time
+
+# Changes arriving within this window after the first one share an event
+COALESCE_WINDOW = 0.05
+# Comment lines keep idle connections (and proxies) alive and reveal dead peers
+HEARTBEAT_INTERVAL = 15
+# Subscribers that stop reading are dropped once this much output is queued
+MAX_BUFFERED_BYTES = 256 * 1024
+
+
+def format_event(event, data, event_id=None):
+    """Encode one SSE event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, separators=(',', ':'), ensure_ascii=False))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+def to_delta(record):
+    """Client-facing form of a task log record"""
+    if record['op'] == 'put':
+        return {'seq': record['seq'], 'op': 'put', 'task': record['task']}
+    return {'seq': record['seq'], 'op': 'delete', 'id': record['id']}
+
+
+class _Subscriber:
+    def __init__(self, sock, last_seq):
+        self.sock = sock
+        self.last_seq = last_seq
+        self.buffer = bytearray()
+
+
+class ChangeHub:
+    """Fans task changes out to SSE subscribers from a single thread"""
+
+    def __init__(self, task_store):
+        self.task_store = task_store
+        self._selector = selectors.DefaultSelector()
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._new_subscribers = []
+        self._pending_changes = []
+        self._first_change_at = None
+        self._running = True
+
+        # Self-pipe so other threads can wake the selector
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+        task_store.add_listener(self.publish)
+        self._thread = threading.Thread(target=self._run, name='task-change-hub', daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # Already awake or shutting down
+
+    def subscribe(self, sock, last_seq):
+        """Take ownership of a socket whose SSE response headers were already sent"""
+        with self._lock:
+            self._new_subscribers.append((sock, last_seq))
+        self._wake()
+
+    def publish(self, records):
+        """Task store listener; called from the log committer after each durable batch"""
+        with self._lock:
+            if not self._pending_changes:
+                self._first_change_at = time.monotonic()
+            self._pending_changes.extend(records)
+        self._wake()
+
+    def close(self):
+        self._running = False
+        self._wake()
+        self._thread.join()
+
+    def _run(self):
+        next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL
+        while self._running:
+            timeout = next_heartbeat - time.monotonic()
+            with self._lock:
+                if self._pending_changes:
+                    flush_at = self._first_change_at + COALESCE_WINDOW
+                    timeout = min(timeout, flush_at - time.monotonic())
+
+            for key, events in self._selector.select(max(timeout, 0)):
+                if key.data is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    continue
+                subscriber = key.data
+                if events & selectors.EVENT_READ:
+                    # Clients never send anything after the request: EOF or junk
+                    self._check_readable(subscriber)
+                if events & selectors.EVENT_WRITE and subscriber.sock in self._subscribers:
+                    self._flush(subscriber)
+
+            self._accept_new_subscribers()
+
+            now = time.monotonic()
+            batch = None
+            with self._lock:
+                if self._pending_changes and now >= self._first_change_at + COALESCE_WINDOW:
+                    batch, self._pending_changes = self._pending_changes, []
+            if batch:
+                self._broadcast(batch)
+
+            if now >= next_heartbeat:
+                for subscriber in list(self._subscribers.values()):
+                    self._send(subscriber, b': ping\n\n')
+                next_heartbeat = now + HEARTBEAT_INTERVAL
+
+        for subscriber in list(self._subscribers.values()):
+            self._drop(subscriber)
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _accept_new_subscribers(self):
+        with self._lock:
+            new_subscribers, self._new_subscribers = self._new_subscribers, []
+
+        for sock, last_seq in new_subscribers:
+            sock.setblocking(False)
+            subscriber = _Subscriber(sock, last_seq)
+            self._subscribers[sock] = subscriber
+            self._selector.register(sock, selectors.EVENT_READ, subscriber)
+
+            backlog = self.task_store.changes_since(last_seq)
+            if backlog is None:
+                # Too far behind the retained history: client must reload
+                subscriber.last_seq = self.task_store.durable_seq
+                self._send(subscriber, format_event('reset', {'seq': subscriber.last_seq},
+                                                    subscriber.last_seq))
+            elif backlog:
+                self._send_deltas(subscriber, backlog)
+            else:
+                self._send(subscriber, b': connected\n\n')
+
+    def _broadcast(self, records):
+        for subscriber in list(self._subscribers.values()):
+            self._send_deltas(subscriber, records)
+
+    def _send_deltas(self, subscriber, records):
+        fresh = [record for record in records if record['seq'] > subscriber.last_seq]
+        if not fresh:
+            return
+        subscriber.last_seq = fresh[-1]['seq']
+        self._send(subscriber, format_event('tasks', [to_delta(record) for record in fresh],
+                                            subscriber.last_seq))
+
+    def _send(self, subscriber, data):
+        subscriber.buffer += data
+        if len(subscriber.buffer) > MAX_BUFFERED_BYTES:
+            self._drop(subscriber)
+            return
+        self._flush(subscriber)
+
+    def _flush(self, subscriber):
+        try:
+            while subscriber.buffer:
+                sent = subscriber.sock.send(subscriber.buffer)
+                del subscriber.buffer[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(subscriber)
+            return
+
+        events = selectors.EVENT_READ
+        if subscriber.buffer:
+            events |= selectors.EVENT_WRITE
+        self._selector.modify(subscriber.sock, events, subscriber)
+
+    def _check_readable(self, subscriber):
+        try:
+            data = subscriber.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._drop(subscriber)
+
+    def _drop(self, subscriber):
+        if self._subscribers.pop(subscriber.sock, None) is None:
+            return
+        try:
+            self._selector.unregister(subscriber.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            subscriber.sock.close()
+        except OSError:
+            pass
@@ -1,8 +1,13 @@
 // Modern Todo List Application
+const API_URL = '/api/tasks';
+
 class TodoApp {
     constructor() {
         this.tasks = JSON.parse(localStorage.getItem('tasks')) || [];
         this.currentFilter = 'all';
+        // Becomes true once the server task API answers; until then tasks
+        // are kept in localStorage only
+        this.remote = false;
         this.init();
     }
 
@@ -11,6 +16,119 @@ class TodoApp {
         this.updateTaskCount();
         this.bindEvents();
         this.showEmptyState();
+        this.loadRemoteTasks(true);
+    }
+
+    // `migrate` is only set on page load: that is the one time tasks kept in
+    // localStorage may be uploaded to a server that has none
+    async loadRemoteTasks(migrate = false) {
+        let response;
+        try {
+            response = await fetch(API_URL, { headers: { 'Accept': 'application/json' } });
+        } catch (error) {
+            return; // Server API unavailable: stay in localStorage mode
+        }
+        if (!response.ok) {
+            return;
+        }
+
+        const remoteTasks = await response.json();
+        const seq = response.headers.get('X-Task-Seq');
+        this.remote = true;
+
+        const localTasks = migrate ? JSON.parse(localStorage.getItem('tasks')) || [] : [];
+        if (remoteTasks.length === 0 && localTasks.length > 0) {
+            // First run against the server: upload the local tasks once, oldest first
+            for (const task of [...localTasks].reverse()) {
+                await this.sendDelta('POST', '', task);
+            }
+            localStorage.removeItem('tasks');
+        } else {
+            this.tasks = remoteTasks;
+        }
+
+        this.renderTasks();
+        this.updateTaskCount();
+        this.showEmptyState();
+        this.subscribeChanges(seq);
+    }
+
+    // Follow changes made from other tabs and devices. The browser reconnects
+    // by itself and resumes from the last event id it saw.
+    subscribeChanges(seq) {
+        if (this.changes) {
+            this.changes.close();
+        }
+        if (!window.EventSource || seq === null) {
+            return;
+        }
+
+        this.changes = new EventSource(`${API_URL}/changes?since=${seq}`);
+        this.changes.addEventListener('tasks', (e) => {
+            this.applyDeltas(JSON.parse(e.data));
+        });
+        this.changes.addEventListener('reset', () => {
+            // Too far behind the server's history: reload the whole list
+            this.changes.close();
+            this.changes = null;
+            this.loadRemoteTasks();
+        });
+    }
+
+    // Apply a batch of server changes, touching only the affected list items
+    applyDeltas(deltas) {
+        let changed = false;
+
+        deltas.forEach(delta => {
+            if (delta.op === 'delete') {
+                const before = this.tasks.length;
+                this.tasks = this.tasks.filter(task => task.id !== delta.id);
+                if (this.tasks.length !== before) {
+                    this.removeTaskElement(delta.id);
+                    changed = true;
+                }
+                return;
+            }
+
+            const task = delta.task;
+            const index = this.tasks.findIndex(t => t.id === task.id);
+            if (index === -1) {
+                this.tasks.unshift(task);
+            } else if (JSON.stringify(this.tasks[index]) === JSON.stringify(task)) {
+                return; // Echo of a change made here
+            } else {
+                this.tasks[index] = task;
+            }
+            this.updateTaskElement(task);
+            changed = true;
+        });
+
+        if (changed) {
+            this.updateTaskCount();
+            this.showEmptyState();
+        }
+    }
+
+    // Send one task change to the server instead of rewriting the whole list
+    async sendDelta(method, path, body) {
+        if (!this.remote) {
+            this.saveTasks();
+            return;
+        }
+
+        try {
+            const response = await fetch(API_URL + path, {
+                method: method,
+                headers: { 'Content-Type': 'application/json' },
+                body: body === undefined ? undefined : JSON.stringify(body)
+            });
+            if (!response.ok) {
+                const error = await response.json().catch(() => ({}));
+                console.error(`Task sync failed (${response.status}):`, error.error || response.statusText);
+            }
+        } catch (error) {
+            console.error('Task sync failed:', error);
+        }
     }
 
     bindEvents() {
@@ -51,7 +169,7 @@ class TodoApp {
             };
 
             this.tasks.unshift(newTask);
-            this.saveTasks();
+            this.sendDelta('POST', '', newTask);
             this.renderTasks();
             this.updateTaskCount();
             this.showEmptyState();
@@ -68,7 +186,7 @@ class TodoApp {
             
             setTimeout(() => {
                 this.tasks = this.tasks.filter(task => task.id !== id);
-                this.saveTasks();
+                this.sendDelta('DELETE', `/${id}`);
                 this.renderTasks();
                 this.updateTaskCount();
                 this.showEmptyState();
@@ -77,14 +195,16 @@ class TodoApp {
     }
 
     toggleTask(id) {
+        let completed;
         this.tasks = this.tasks.map(task => {
             if (task.id === id) {
-                return { ...task, completed: !task.completed };
+                completed = !task.completed;
+                return { ...task, completed: completed };
             }
             return task;
         });
         
-        this.saveTasks();
+        this.sendDelta('PATCH', `/${id}`, { completed: completed });
         this.renderTasks();
         this.updateTaskCount();
     }
@@ -98,14 +218,14 @@ class TodoApp {
                 return task;
             });
             
-            this.saveTasks();
+            this.sendDelta('PATCH', `/${id}`, { text: newText.trim() });
             this.renderTasks();
         }
     }
 
     clearCompleted() {
         this.tasks = this.tasks.filter(task => !task.completed);
-        this.saveTasks();
+        this.sendDelta('DELETE', '?completed=true');
         this.renderTasks();
         this.updateTaskCount();
         this.showEmptyState();
@@ -141,27 +261,61 @@ class TodoApp {
         taskList.innerHTML = '';
 
         filteredTasks.forEach(task => {
-            const li = document.createElement('li');
-            li.className = 'task-item';
-            li.dataset.id = task.id;
-
-            li.innerHTML = `
-                <div class="task-checkbox ${task.completed ? 'checked' : ''}" 
-                     onclick="todoApp.toggleTask(${task.id})">
-                </div>
-                <div class="task-text ${task.completed ? 'completed' : ''}">
-                    ${this.escapeHtml(task.text)}
-                </div>
-                <div class="task-actions">
-                    <button class="edit-btn" onclick="todoApp.showEditModal(${task.id}, '${this.escapeHtml(task.text)}')">✎</button>
-                    <button class="delete-btn" onclick="todoApp.deleteTask(${task.id})">×</button>
-                </div>
-            `;
-
-            taskList.appendChild(li);
+            taskList.appendChild(this.createTaskElement(task));
         });
     }
 
+    createTaskElement(task) {
+        const li = document.createElement('li');
+        li.className = 'task-item';
+        li.dataset.id = task.id;
+
+        li.innerHTML = `
+            <div class="task-checkbox ${task.completed ? 'checked' : ''}" 
+                 onclick="todoApp.toggleTask(${task.id})">
+            </div>
+            <div class="task-text ${task.completed ? 'completed' : ''}">
+                ${this.escapeHtml(task.text)}
+            </div>
+            <div class="task-actions">
+                <button class="edit-btn" onclick="todoApp.showEditModal(${task.id}, '${this.escapeHtml(task.text)}')">✎</button>
+                <button class="delete-btn" onclick="todoApp.deleteTask(${task.id})">×</button>
+            </div>
+        `;
+        return li;
+    }
+
+    // Re-render one task in place, inserting or removing it as the filter requires
+    updateTaskElement(task) {
+        const taskList = document.getElementById('taskList');
+        const existing = taskList.querySelector(`[data-id="${task.id}"]`);
+        const filteredTasks = this.getFilteredTasks();
+        const position = filteredTasks.indexOf(task);
+
+        if (position === -1) {
+            if (existing) {
+                existing.remove();
+            }
+            return;
+        }
+
+        const li = this.createTaskElement(task);
+        if (existing) {
+            existing.replaceWith(li);
+            return;
+        }
+        const next = filteredTasks[position + 1];
+        const nextElement = next ? taskList.querySelector(`[data-id="${next.id}"]`) : null;
+        taskList.insertBefore(li, nextElement);
+    }
+
+    removeTaskElement(id) {
+        const existing = document.querySelector(`#taskList [data-id="${id}"]`);
+        if (existing) {
+            existing.remove();
+        }
+    }
+
     showEditModal(id, currentText) {
         const newText = prompt('編輯任務:', currentText);
         if (newText !== null) {
@@ -1,25 +1,347 @@
+import argparse
+import gzip
+import hashlib
 import http.server
-import socketserver
-import os
+import json
+import mimetypes
+import threading
+import urllib.parse
 from pathlib import Path
 
+from change_feed import ChangeHub
+from task_store import TaskError, TaskStore
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
 # 設定端口（使用可用端口）
 PORT = 8000
 
 # 設定服務器根目錄為 todo-app
 WEB_DIR = Path("/workspaces/OpenClaw/todo-app")
+if not WEB_DIR.is_dir():
+    WEB_DIR = Path(__file__).resolve().parent
+
+# 預先載入到記憶體的靜態資源
+CACHED_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg', '.ico', '.txt'}
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg', '.txt'}
+MAX_CACHED_FILE_SIZE = 1024 * 1024
+# Compressing tiny files only adds overhead
+MIN_COMPRESS_SIZE = 256
+
+API_PREFIX = '/api/tasks'
+CHANGES_PATH = API_PREFIX + '/changes'
+# How long EventSource clients wait before reconnecting (ms)
+SSE_RETRY_MS = 2000
+MAX_BODY_SIZE = 64 * 1024
+
+
+class Asset:
+    """One static file held in memory with its precompressed variants"""
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.body = path.read_bytes()
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+        self.content_type = mimetypes.guess_type(str(path))[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type.endswith('javascript'):
+            self.content_type += '; charset=utf-8'
+
+        self.variants = {}
+        if path.suffix in COMPRESSIBLE_EXTENSIONS and len(self.body) >= MIN_COMPRESS_SIZE:
+            self.variants['gzip'] = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(self.body)
+
+
+class AssetCache:
+    """In-memory cache of the app's static files, invalidated on mtime change"""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def preload(self):
+        """Load every cacheable file under the root"""
+        for path in self.root.rglob('*'):
+            if path.is_file():
+                self.get(path.relative_to(self.root).as_posix())
+        return len(self._assets)
+
+    def get(self, rel_path):
+        """Asset for a path relative to the root, or None if it is not cacheable"""
+        path = (self.root / rel_path).resolve()
+        if self.root not in path.parents or path.suffix not in CACHED_EXTENSIONS:
+            return None
+        try:
+            stat = path.stat()
+        except OSError:
+            with self._lock:
+                self._assets.pop(path, None)
+            return None
+        if stat.st_size > MAX_CACHED_FILE_SIZE:
+            return None
+
+        asset = self._assets.get(path)
+        if asset is None or asset.mtime_ns != stat.st_mtime_ns or asset.size != stat.st_size:
+            asset = Asset(path, stat)
+            with self._lock:
+                self._assets[path] = asset
+        return asset
+
 
 class TodoHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Keep-alive responses are written as headers then body; don't let
+    # Nagle hold the body back waiting for the client's delayed ACK
+    disable_nagle_algorithm = True
+    asset_cache = None
+    task_store = None
+    change_hub = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(WEB_DIR), **kwargs)
 
-def run_server():
-    print(f"Starting Todo List app server at port {PORT}")
+    def do_GET(self):
+        if self.is_api_request():
+            self.handle_api('GET')
+        elif not self.send_cached(head_only=False):
+            super().do_GET()
+
+    def do_POST(self):
+        self.handle_api('POST')
+
+    def do_PUT(self):
+        self.handle_api('PUT')
+
+    def do_PATCH(self):
+        self.handle_api('PATCH')
+
+    def do_DELETE(self):
+        self.handle_api('DELETE')
+
+    def is_api_request(self):
+        path = urllib.parse.urlsplit(self.path).path
+        return path == API_PREFIX or path.startswith(API_PREFIX + '/')
+
+    def handle_api(self, method):
+        """
+        Task REST API: /api/tasks (GET, POST, DELETE?completed=true),
+        /api/tasks/<id> and the /api/tasks/changes event stream
+        """
+        if not self.is_api_request() or self.task_store is None:
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        url = urllib.parse.urlsplit(self.path)
+        task_id = url.path[len(API_PREFIX):].strip('/')
+        store = self.task_store
+        try:
+            if url.path.rstrip('/') == CHANGES_PATH:
+                if method == 'GET':
+                    self.start_change_feed(url)
+                else:
+                    self.send_json(405, {'error': f'{method} not allowed on {CHANGES_PATH}'})
+                return
+
+            if not task_id:
+                if method == 'GET':
+                    seq, tasks = store.list_with_seq()
+                    self.send_json(200, tasks, {'X-Task-Seq': str(seq)})
+                elif method == 'POST':
+                    self.send_json(201, store.create(self.read_json()))
+                elif method == 'DELETE' and urllib.parse.parse_qs(url.query).get('completed') == ['true']:
+                    self.send_json(200, {'deleted': store.delete_completed()})
+                else:
+                    self.send_json(405, {'error': f'{method} not allowed on {API_PREFIX}'})
+                return
+
+            try:
+                task_id = int(task_id)
+            except ValueError:
+                raise TaskError(f"Invalid task id: {task_id}", status=404)
+
+            if method == 'GET':
+                self.send_json(200, store.get(task_id))
+            elif method == 'PATCH':
+                self.send_json(200, store.update(task_id, self.read_json(), partial=True))
+            elif method == 'PUT':
+                self.send_json(200, store.update(task_id, self.read_json(), partial=False))
+            elif method == 'DELETE':
+                store.delete(task_id)
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                self.send_json(405, {'error': f'{method} not allowed on a task'})
+        except TaskError as e:
+            self.send_json(e.status, {'error': str(e)})
+
+    def read_json(self):
+        """Parse the JSON object in the request body"""
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_SIZE:
+            # The body is left unread, so the connection can't carry another request
+            self.close_connection = True
+            if length < 0:
+                raise TaskError("Invalid Content-Length header")
+            raise TaskError("Request body too large", status=413)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise TaskError("Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise TaskError("Request body must be a JSON object")
+        return body
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def start_change_feed(self, url):
+        """
+        Open a Server-Sent Events stream of task changes. Resumes after the
+        Last-Event-ID the browser sends on reconnect, else after ?since=<seq>,
+        else from now. The socket is handed to the change hub once the
+        headers are out, freeing this request thread.
+        """
+        if self.change_hub is None:
+            raise TaskError("Change feed is not available", status=404)
+        since = self.headers.get('Last-Event-ID') or urllib.parse.parse_qs(url.query).get('since', [''])[0]
+        try:
+            last_seq = int(since) if since else self.task_store.seq
+        except ValueError:
+            raise TaskError(f"Invalid change sequence: {since}")
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-store')
+        # Stop reverse proxies from buffering the stream
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        self.wfile.write(f'retry: {SSE_RETRY_MS}\n\n'.encode('ascii'))
+        self.wfile.flush()
+
+        # The stream ends when the connection does
+        self.close_connection = True
+        self.server.detach(self.request, lambda sock: self.change_hub.subscribe(sock, last_seq))
+
+    def do_HEAD(self):
+        if not self.send_cached(head_only=True):
+            super().do_HEAD()
+
+    def send_cached(self, head_only):
+        """Serve a request from the asset cache; False if the path isn't cached"""
+        path = urllib.parse.unquote(self.path.split('?', 1)[0].split('#', 1)[0])
+        if path.endswith('/'):
+            path += 'index.html'
+        asset = self.asset_cache.get(path.lstrip('/')) if self.asset_cache else None
+        if asset is None:
+            return False
+
+        if asset.etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', asset.etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return True
+
+        accepted = self.headers.get('Accept-Encoding', '')
+        encoding = None
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and candidate in accepted:
+                encoding = candidate
+                break
+        body = asset.variants[encoding] if encoding else asset.body
+
+        self.send_response(200)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', asset.etag)
+        # Revalidate every time; a 304 costs one round trip and no body
+        self.send_header('Cache-Control', 'no-cache')
+        if asset.variants:
+            self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+        return True
+
+    def copyfile(self, source, outputfile):
+        """Send uncached files with sendfile() instead of a userspace copy"""
+        try:
+            self.connection.sendfile(source)
+        except (AttributeError, OSError, ValueError):
+            super().copyfile(source, outputfile)
+
+
+class TodoServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._detached = {}
+        self._detached_lock = threading.Lock()
+
+    def detach(self, request, take_over):
+        """Keep `request` open after its handler returns and pass it to `take_over`"""
+        with self._detached_lock:
+            self._detached[request] = take_over
+
+    def shutdown_request(self, request):
+        with self._detached_lock:
+            take_over = self._detached.pop(request, None)
+        if take_over is None:
+            super().shutdown_request(request)
+        else:
+            take_over(request)
+
+
+def run_server(port=PORT, web_dir=None, data_dir=None):
+    global WEB_DIR
+    if web_dir:
+        WEB_DIR = Path(web_dir).resolve()
+
+    print(f"Starting Todo List app server at port {port}")
     print(f"Serving files from: {WEB_DIR}")
-    
-    with socketserver.TCPServer(("", PORT), TodoHandler) as httpd:
-        print(f"Server running at: http://localhost:{PORT}")
-        httpd.serve_forever()
+
+    TodoHandler.asset_cache = AssetCache(WEB_DIR)
+    print(f"Cached {TodoHandler.asset_cache.preload()} static files in memory")
+
+    TodoHandler.task_store = TaskStore(data_dir) if data_dir else TaskStore()
+    print(f"Storing tasks in: {TodoHandler.task_store.data_dir}")
+    TodoHandler.change_hub = ChangeHub(TodoHandler.task_store)
+
+    try:
+        with TodoServer(("", port), TodoHandler) as httpd:
+            print(f"Server running at: http://localhost:{port}")
+            httpd.serve_forever()
+    finally:
+        TodoHandler.change_hub.close()
+        TodoHandler.task_store.close()
 
 if __name__ == "__main__":
-    run_server()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Todo List app server")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--dir', help="directory to serve (default: the todo-app directory)")
+    parser.add_argument('--data-dir', help="where task data is stored (default: ~/.openclaw/todo)")
+    args = parser.parse_args()
+    run_server(args.port, args.dir, args.data_dir)
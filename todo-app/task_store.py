@@ -0,0 +1,343 @@
+"""
+Server-side task storage for the todo app
+Tasks live in an in-memory index by id, so reads never touch disk. Every
+change is appended to a write-ahead log; concurrent writers share one
+fsync (group commit), and the log is periodically compacted into a
+snapshot so recovery stays fast.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+DATA_DIR = Path(os.environ.get('TODO_DATA_DIR', os.path.expanduser('~/.openclaw/todo')))
+
+SNAPSHOT_FILE = 'tasks.snapshot.json'
+WAL_FILE = 'tasks.wal'
+
+# How long the committer waits for more writers before an fsync
+GROUP_COMMIT_WINDOW = 0.002
+# Compact the log into a snapshot once it holds this many records
+COMPACT_AFTER_RECORDS = 1000
+# Durable records kept in memory so change-feed clients can resume
+CHANGE_HISTORY = 10000
+
+MAX_TEXT_LENGTH = 500
+TASK_FIELDS = ('id', 'text', 'completed', 'createdAt')
+
+
+class TaskError(Exception):
+    """Invalid task data or unknown task; carries an HTTP status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _validate(fields, partial):
+    """Check and normalise client-supplied task fields"""
+    unknown = set(fields) - set(TASK_FIELDS)
+    if unknown:
+        raise TaskError(f"Unknown task fields: {', '.join(sorted(unknown))}")
+
+    task = {}
+    if 'text' in fields or not partial:
+        text = fields.get('text')
+        if not isinstance(text, str) or not text.strip():
+            raise TaskError("Task text must be a non-empty string")
+        if len(text) > MAX_TEXT_LENGTH:
+            raise TaskError(f"Task text is longer than {MAX_TEXT_LENGTH} characters")
+        task['text'] = text.strip()
+    if 'completed' in fields:
+        if not isinstance(fields['completed'], bool):
+            raise TaskError("Task completed flag must be true or false")
+        task['completed'] = fields['completed']
+    if 'createdAt' in fields:
+        if not isinstance(fields['createdAt'], str):
+            raise TaskError("Task createdAt must be an ISO timestamp string")
+        task['createdAt'] = fields['createdAt']
+    return task
+
+
+class TaskStore:
+    """In-memory task index backed by a group-committed write-ahead log"""
+
+    def __init__(self, data_dir=DATA_DIR, compact_after=COMPACT_AFTER_RECORDS):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.data_dir / SNAPSHOT_FILE
+        self.wal_path = self.data_dir / WAL_FILE
+        self.compact_after = compact_after
+
+        # id -> task, in creation order
+        self.tasks = {}
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._durable = threading.Condition(self._lock)
+        self._pending = []
+        self._durable_seq = 0
+        self._wal_records = 0
+        self._running = True
+        # Bumped when a batch fails to reach disk; writers of that generation get a 503
+        self._generation = 0
+        self._commit_error = None
+        self._history = deque(maxlen=CHANGE_HISTORY)
+        self._listeners = []
+
+        self._recover()
+        self._wal = open(self.wal_path, 'ab')
+        self._committer = threading.Thread(target=self._commit_loop, name='task-wal-commit',
+                                           daemon=True)
+        self._committer.start()
+
+    def _recover(self):
+        """Load the snapshot and replay log records written after it"""
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.seq = snapshot['seq']
+            self.tasks = {task['id']: task for task in snapshot['tasks']}
+
+        if self.wal_path.exists():
+            good_offset = 0
+            with open(self.wal_path, 'r+b') as f:
+                for line in f:
+                    try:
+                        # A line without its newline was never acknowledged
+                        record = json.loads(line) if line.endswith(b'\n') else None
+                    except ValueError:
+                        record = None
+                    if record is None:
+                        # Torn final write from a crash; everything after is lost anyway
+                        break
+                    if record['seq'] > self.seq:
+                        self._apply(record)
+                        self.seq = record['seq']
+                    self._wal_records += 1
+                    good_offset += len(line)
+                if good_offset < f.seek(0, os.SEEK_END):
+                    # Cut the torn tail off, or new records appended after it
+                    # would be unreachable on the next replay
+                    f.truncate(good_offset)
+                    f.flush()
+                    os.fsync(f.fileno())
+        self._durable_seq = self.seq
+
+    def _apply(self, record):
+        if record['op'] == 'put':
+            task = record['task']
+            self.tasks[task['id']] = task
+        elif record['op'] == 'delete':
+            self.tasks.pop(record['id'], None)
+
+    def _log(self, records):
+        """
+        Apply records in memory and queue them for the log; blocks until
+        they are durable. Must be called with the lock held.
+        """
+        if self._generation < 0:
+            raise TaskError(f"Task storage unavailable: {self._commit_error}", status=503)
+        for record in records:
+            self.seq += 1
+            record['seq'] = self.seq
+            self._apply(record)
+            self._pending.append(record)
+        target = self.seq
+        generation = self._generation
+        self._durable.notify_all()
+        # The committer drains everything queued, even while shutting down
+        while self._durable_seq < target:
+            if self._generation != generation:
+                raise TaskError(f"Task could not be saved: {self._commit_error}", status=503)
+            self._durable.wait()
+        return target
+
+    def _commit_loop(self):
+        """Write queued records with one fsync per batch, then compact if due"""
+        while True:
+            with self._lock:
+                while not self._pending and self._running:
+                    self._durable.wait()
+                if not self._pending and not self._running:
+                    return
+            # Give concurrent writers a moment to join this batch
+            time.sleep(GROUP_COMMIT_WINDOW)
+
+            with self._lock:
+                batch, self._pending = self._pending, []
+            data = b''.join(
+                json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+                for record in batch
+            )
+            offset = None
+            try:
+                offset = self._wal.tell()
+                self._wal.write(data)
+                self._wal.flush()
+                os.fsync(self._wal.fileno())
+            except (OSError, ValueError) as e:
+                self._fail_batch(offset, e)
+                continue
+
+            with self._lock:
+                self._durable_seq = batch[-1]['seq']
+                self._wal_records += len(batch)
+                self._history.extend(batch)
+                self._commit_error = None
+                self._durable.notify_all()
+                if self._wal_records >= self.compact_after and not self._pending:
+                    try:
+                        self._compact()
+                    except (OSError, ValueError) as e:
+                        # The batch is durable in the log; compaction is retried after the next one
+                        print(f"Task log compaction failed: {e}", file=sys.stderr)
+                listeners = list(self._listeners)
+            for listener in listeners:
+                listener(batch)
+
+    def _fail_batch(self, offset, error):
+        """
+        A batch did not reach disk (disk full, EIO): cut the log back to
+        where the batch started, reload the durable state into memory and
+        fail every writer still waiting, including those queued meanwhile
+        """
+        print(f"Task log write failed: {error}", file=sys.stderr)
+        with self._lock:
+            self._pending = []
+            self._commit_error = error
+            try:
+                self._wal.close()
+                if offset is not None:
+                    with open(self.wal_path, 'r+b') as f:
+                        f.truncate(offset)
+                        os.fsync(f.fileno())
+                self.tasks = {}
+                self.seq = 0
+                self._wal_records = 0
+                self._recover()
+                self._wal = open(self.wal_path, 'ab')
+                self._generation += 1
+            except (OSError, ValueError) as e:
+                # The on-disk state can't be trusted any more; refuse writes until restart
+                print(f"Task store recovery failed, writes disabled: {e}", file=sys.stderr)
+                self._commit_error = e
+                self._generation = -1
+            self._durable.notify_all()
+
+    def _compact(self):
+        """Write a snapshot of the current state and start an empty log; lock held"""
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'seq': self._durable_seq, 'tasks': list(self.tasks.values())}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        self._wal.close()
+        self._wal = open(self.wal_path, 'wb')
+        os.fsync(self._wal.fileno())
+        self._wal_records = 0
+
+    @property
+    def durable_seq(self):
+        """Sequence number of the last record on disk"""
+        with self._lock:
+            return self._durable_seq
+
+    def add_listener(self, listener):
+        """Call `listener(records)` from the committer after each durable batch"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def changes_since(self, seq):
+        """
+        Durable records after `seq`, oldest first; None if some of them are
+        no longer retained (or `seq` is from another log) and the client has
+        to reload the full list
+        """
+        with self._lock:
+            if self._durable_seq <= seq <= self.seq:
+                # Anything newer is still being committed and will be published
+                return []
+            if seq > self.seq or not self._history or self._history[0]['seq'] > seq + 1:
+                return None
+            return [record for record in self._history if record['seq'] > seq]
+
+    def close(self):
+        """Flush outstanding writes and stop the committer"""
+        with self._lock:
+            self._running = False
+            self._durable.notify_all()
+        self._committer.join()
+        self._wal.close()
+
+    def list(self):
+        """All tasks, newest first"""
+        with self._lock:
+            return list(reversed(self.tasks.values()))
+
+    def list_with_seq(self):
+        """All tasks, newest first, with the sequence number they reflect"""
+        with self._lock:
+            return self.seq, list(reversed(self.tasks.values()))
+
+    def get(self, task_id):
+        with self._lock:
+            task = self.tasks.get(task_id)
+        if task is None:
+            raise TaskError(f"Task {task_id} not found", status=404)
+        return task
+
+    def create(self, fields):
+        """Add a task; the client may choose its id (the app uses Date.now())"""
+        task = _validate(fields, partial=False)
+        with self._lock:
+            task_id = fields.get('id')
+            if task_id is None:
+                task_id = int(time.time() * 1000)
+                while task_id in self.tasks:
+                    task_id += 1
+            elif not isinstance(task_id, int) or isinstance(task_id, bool):
+                raise TaskError("Task id must be an integer")
+            elif task_id in self.tasks:
+                raise TaskError(f"Task {task_id} already exists", status=409)
+
+            task = {
+                'id': task_id,
+                'text': task['text'],
+                'completed': task.get('completed', False),
+                'createdAt': task.get('createdAt') or time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            }
+            self._log([{'op': 'put', 'task': task}])
+            return task
+
+    def update(self, task_id, fields, partial=True):
+        """Change a task: PATCH semantics when partial, PUT otherwise"""
+        changes = _validate({k: v for k, v in fields.items() if k != 'id'}, partial=partial)
+        with self._lock:
+            current = self.tasks.get(task_id)
+            if current is None:
+                raise TaskError(f"Task {task_id} not found", status=404)
+            task = dict(current, **changes)
+            if not partial and 'completed' not in changes:
+                task['completed'] = False
+            self._log([{'op': 'put', 'task': task}])
+            return task
+
+    def delete(self, task_id):
+        with self._lock:
+            if task_id not in self.tasks:
+                raise TaskError(f"Task {task_id} not found", status=404)
+            self._log([{'op': 'delete', 'id': task_id}])
+
+    def delete_completed(self):
+        """Remove every completed task in one log batch; returns their ids"""
+        with self._lock:
+            ids = [task_id for task_id, task in self.tasks.items() if task['completed']]
+            if ids:
+                self._log([{'op': 'delete', 'id': task_id} for task_id in ids])
+            return ids